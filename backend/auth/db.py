@@ -8,10 +8,13 @@ from fastapi_users_db_sqlalchemy import (
     SQLAlchemyBaseOAuthAccountTableUUID,
     SQLAlchemyUserDatabase,
 )
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, Mapped, relationship
 
-DATABASE_URL = "sqlite+aiosqlite:///./ppt_generator.db"
+from core.config import Config
+from core.dbconfig import make_async_engine
+
+DATABASE_URL = Config.AUTH_DATABASE_URL
 
 
 class Base(DeclarativeBase):
@@ -30,7 +33,8 @@ class User(SQLAlchemyBaseUserTableUUID, Base):
     )
 
 
-engine = create_async_engine(DATABASE_URL, echo=False)
+# same pragmas / pool settings as the business engine (core/dbconfig.py)
+engine = make_async_engine(DATABASE_URL, echo=False)
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
 
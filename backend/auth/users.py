@@ -1,7 +1,7 @@
 # backend/auth/users.py
 import os
 import uuid
-from typing import AsyncGenerator, Optional
+from typing import Any, AsyncGenerator, Dict, Optional
 
 from fastapi import Depends, Request
 from fastapi_users import BaseUserManager, FastAPIUsers, UUIDIDMixin, models
@@ -14,6 +14,8 @@ from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
 from httpx_oauth.clients.github import GitHubOAuth2
 from httpx_oauth.clients.google import GoogleOAuth2
 
+from services.user_cache import user_cache
+
 from .db import User, get_user_db
 
 # ----------------- CORE CONFIG -----------------
@@ -56,6 +58,18 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
         # Just log to console so you see when a user registers.
         print(f"User {user.id} registered with email {user.email}")
 
+    async def on_after_update(
+        self, user: User, update_dict: Dict[str, Any], request: Optional[Request] = None
+    ) -> None:
+        # email / is_active may have changed -> drop the auth bridge entry
+        user_cache.invalidate(user.id)
+
+    async def on_after_delete(
+        self, user: User, request: Optional[Request] = None
+    ) -> None:
+        # the cached entry would keep the deleted user's tokens working until TTL
+        user_cache.invalidate(user.id)
+
 
 async def get_user_manager(
     user_db: SQLAlchemyUserDatabase = Depends(get_user_db),
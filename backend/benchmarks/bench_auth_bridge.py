@@ -0,0 +1,76 @@
+# backend/benchmarks/bench_auth_bridge.py
+"""
+GET-heavy benchmark for the auth bridge cache (services/user_cache.py).
+
+Logs in once, then issues authenticated GETs against the real app on a
+throwaway SQLite file:
+- cold: the user cache is cleared before every request (auth user load +
+  local users lookup, i.e. the old per-request cost)
+- warm: the cache is left alone (one JWT decode per request)
+
+Run from backend/:
+    python -m benchmarks.bench_auth_bridge [--requests 2000] [--path /api/v1/dashboard/debug]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+
+def _p(lat, q):
+    lat = sorted(lat)
+    return lat[min(len(lat) - 1, int(len(lat) * q))] * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--path", default="/api/v1/dashboard/debug")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    db_path = os.path.join(tmp, "bench.db")
+    # must be set before the app (and Config) is imported
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["AUTH_DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+
+    from fastapi.testclient import TestClient
+
+    import main as app_main
+    from services.user_cache import user_cache
+
+    with TestClient(app_main.app) as client:
+        creds = {"email": "bench@example.com", "password": "bench-password"}
+        client.post("/auth/register", json=creds)
+        token = client.post(
+            "/auth/jwt/login", data={"username": creds["email"], "password": creds["password"]}
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        results = {}
+        for label, clear in (("cold (no cache)", True), ("warm (cached)", False)):
+            user_cache.clear()
+            for _ in range(50):  # warm-up: connections, first local user insert
+                client.get(args.path, headers=headers)
+            lat = []
+            for _ in range(args.requests):
+                if clear:
+                    user_cache.clear()
+                t0 = time.perf_counter()
+                r = client.get(args.path, headers=headers)
+                lat.append(time.perf_counter() - t0)
+                assert r.status_code == 200, r.text
+            results[label] = lat
+            print(
+                f"{label:16s} p50={_p(lat, 0.5):.3f}ms p90={_p(lat, 0.9):.3f}ms "
+                f"mean={statistics.mean(lat) * 1000:.3f}ms"
+            )
+
+        saved = _p(results["cold (no cache)"], 0.5) - _p(results["warm (cached)"], 0.5)
+        print(f"p50 saved per request: {saved:.3f}ms  cache={user_cache.snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
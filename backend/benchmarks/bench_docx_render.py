@@ -0,0 +1,115 @@
+# backend/benchmarks/bench_docx_render.py
+"""
+DOCX render benchmark: the export's package writer (services/docx_export.py)
+with render_mode "runs" (font size on every run) vs "styles" (named styles in
+styles.xml, referenced per paragraph).
+
+Reports build time, word/document.xml size and file size for documents of
+growing page counts, and checks that every paragraph ends up with the same
+text and effective font size / outline level in both modes.
+
+Run from backend/:
+    python -m benchmarks.bench_docx_render [--pages 10 100 300] [--repeat 3]
+"""
+import argparse
+import random
+import os
+import statistics
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from docx import Document
+from docx.shared import Pt
+
+from services.docx_fragments import PAGE_BREAK, section_fragment
+from services.docx_generator import DocxPackageWriter, docx_skeleton
+
+WORDS = "market growth policy battery charging demand supply vehicle price range".split()
+
+
+def _pages(rng: random.Random, num_pages: int) -> dict:
+    pages = {}
+    for p in range(1, num_pages + 1):
+        pages[p] = [
+            {
+                "heading": f"Section {p}.{s}",
+                "content": "\n".join(
+                    " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 90))) for _ in range(rng.randint(2, 5))
+                ),
+            }
+            for s in range(rng.randint(1, 3))
+        ]
+    return pages
+
+
+def _effective(paragraph, default_size):
+    """(text, font size, outline level) as Word resolves them through the style chain."""
+    size = next((r.font.size for r in paragraph.runs if r.font.size), None)
+    style, outline = paragraph.style, None
+    while style is not None:
+        size = size or style.font.size
+        if outline is None:
+            found = style.element.xpath("w:pPr/w:outlineLvl/@w:val")
+            outline = found[0] if found else None
+        style = style.base_style
+    return paragraph.text, size or default_size, outline
+
+
+def _looks(path) -> list:
+    doc = Document(str(path))
+    default = doc.styles.element.xpath("w:docDefaults/w:rPrDefault/w:rPr/w:sz/@w:val")
+    default_size = Pt(int(default[0]) / 2) if default else None
+    return [_effective(p, default_size) for p in doc.paragraphs]
+
+
+def _write(pages: dict, mode: str) -> Path:
+    """Same loop as services/docx_export.write_project_docx, without the DB."""
+    ordered = [pages[p] for p in sorted(pages)]
+    doc, styles = docx_skeleton("Benchmark document", [len(secs) for secs in ordered], mode)
+    fd, name = tempfile.mkstemp(suffix=".docx")
+    with os.fdopen(fd, "wb") as fh:
+        writer = DocxPackageWriter(doc, fh)
+        for index, (page_sections, style) in enumerate(zip(ordered, styles)):
+            if index:
+                writer.write(PAGE_BREAK)
+            for section in page_sections:
+                writer.write(section_fragment(section["heading"], section["content"], style))
+        writer.close()
+    return Path(name)
+
+
+def _build(pages: dict, mode: str):
+    t0 = time.perf_counter()
+    path = _write(pages, mode)
+    elapsed = time.perf_counter() - t0
+    with zipfile.ZipFile(path) as zf:
+        xml = zf.getinfo("word/document.xml").file_size
+    return elapsed, xml, path.stat().st_size, path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 300])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    rng = random.Random(3)
+
+    print(f"{'pages':>6} {'mode':>7} {'build ms':>9} {'document.xml':>13} {'.docx bytes':>12} {'same look':>10}")
+    for num_pages in args.pages:
+        pages = _pages(rng, num_pages)
+        looks = {}
+        for mode in ("runs", "styles"):
+            runs = [_build(pages, mode) for _ in range(args.repeat)]
+            elapsed = statistics.median(r[0] for r in runs) * 1000
+            _, xml, size, path = runs[-1]
+            looks[mode] = _looks(path)
+            for run in runs:
+                run[3].unlink()
+            same = "" if mode == "runs" else str(looks["runs"] == looks["styles"])
+            print(f"{num_pages:>6} {mode:>7} {elapsed:>9.1f} {xml:>13} {size:>12} {same:>10}")
+
+
+if __name__ == "__main__":
+    main()
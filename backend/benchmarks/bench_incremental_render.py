@@ -0,0 +1,121 @@
+# backend/benchmarks/bench_incremental_render.py
+"""
+Incremental re-render benchmark: after one slide of a deck is edited,
+services/pptx_decks.DeckStore.render() (copies the unchanged slides from
+the deck's last build) vs a full render_pptx() of the edited deck.
+
+Decks mix every layout (pictures from the bundled templates, so no network).
+Reports both times for growing decks, and checks that the patched deck
+opens with python-pptx and has the same slides as the full build: same
+slide XML, same layouts, same picture bytes.
+
+Run from backend/:
+    python -m benchmarks.bench_incremental_render [--repeat 5] [--template ppt1]
+"""
+import argparse
+import copy
+import hashlib
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+import zipfile
+
+from lxml import etree
+from pptx import Presentation
+
+from services.pptx_cache import key_for
+from services.pptx_decks import DeckStore
+from services.pptx_generator import TEMPLATE_MAP, render_pptx
+
+WORDS = "market growth policy battery charging demand supply vehicle price range".split()
+
+
+def _sample_images(directory: str) -> list:
+    """The PNG / JPEG media of the bundled templates, as local files."""
+    paths = []
+    with zipfile.ZipFile(TEMPLATE_MAP["ppt1"]) as zf:
+        for name in zf.namelist():
+            if name.startswith("ppt/media/") and name.endswith((".png", ".jpeg", ".jpg")):
+                path = os.path.join(directory, os.path.basename(name))
+                with open(path, "wb") as fh:
+                    fh.write(zf.read(name))
+                paths.append(path)
+    return paths
+
+
+def _deck(rng: random.Random, count: int, images: list) -> list:
+    def words(n):
+        return " ".join(rng.choice(WORDS) for _ in range(n))
+
+    slides = []
+    for i in range(count):
+        kind = i % 5
+        if kind == 0:
+            slides.append({"layout": "title", "title": words(4)})
+        elif kind == 1:
+            slides.append({"layout": "bullet", "title": words(3), "bullets": [words(8) for _ in range(5)]})
+        elif kind == 2:
+            slides.append({"layout": "two_column", "title": words(3), "left": words(12), "right": words(12)})
+        elif kind == 3:
+            slides.append({"layout": "image", "title": words(3), "caption": words(10), "image_url": rng.choice(images)})
+        else:
+            slides.append({"layout": "table", "title": words(3), "columns": ["A", "B", "C"],
+                           "rows": [[words(2) for _ in range(3)] for _ in range(6)]})
+    return slides
+
+
+def _slides_of(fileobj) -> list:
+    out = []
+    for slide in Presentation(fileobj).slides:
+        rels = sorted(
+            (rel.reltype, hashlib.sha1(rel.target_part.blob).hexdigest()) for rel in slide.part.rels.values()
+        )
+        out.append((etree.tostring(slide._element), rels))
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--template", default="ppt1")
+    args = parser.parse_args()
+    rng = random.Random(3)
+    config = {"theme_id": args.template}
+    workdir = tempfile.mkdtemp()
+    try:
+        images = _sample_images(workdir)
+        print(f"{'slides':>7} {'full ms':>8} {'incremental ms':>15} {'same slides':>12}")
+        for count in (10, 50, 200):
+            deck = _deck(rng, count, images)
+            full_samples, patch_samples = [], []
+            for _ in range(args.repeat):
+                store = DeckStore(tempfile.mkdtemp(dir=workdir), max_bytes=1 << 30)
+                store.render(1, deck, config, key_for(deck, config)).close()
+                edited = copy.deepcopy(deck)
+                edited[count // 2]["title"] += " (edited)"
+                key = key_for(edited, config)
+
+                t0 = time.perf_counter()
+                render_pptx(1, edited, config).close()
+                full_samples.append(time.perf_counter() - t0)
+
+                t0 = time.perf_counter()
+                patched = store.render(1, edited, config, key)
+                patch_samples.append(time.perf_counter() - t0)
+
+            full = render_pptx(1, edited, config)
+            same = _slides_of(patched) == _slides_of(full)
+            patched.close()
+            full.close()
+            full_ms = statistics.median(full_samples) * 1000
+            patch_ms = statistics.median(patch_samples) * 1000
+            print(f"{count:>7} {full_ms:>8.1f} {patch_ms:>15.1f} {str(same):>12}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
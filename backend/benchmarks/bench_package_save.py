@@ -0,0 +1,75 @@
+# backend/benchmarks/bench_package_save.py
+"""
+Package save benchmark: Presentation.save() (every part deflated at zlib's
+default level) vs services/ooxml_package.save_pptx (media stored, XML at a
+fast level), for every template in services/ppt_templates.
+
+Each template is loaded as shipped (its sample slides keep their media) and
+saved to memory. Reports median save time and output size per DEFLATE level,
+and checks that every part unzips to the same bytes.
+
+Run from backend/:
+    python -m benchmarks.bench_package_save [--levels 1 3 6] [--repeat 5]
+"""
+import argparse
+import io
+import statistics
+import time
+import zipfile
+from pathlib import Path
+
+from pptx import Presentation
+
+from services.ooxml_package import save_pptx
+from services.pptx_generator import TEMPLATE_DIR
+
+
+def _save(save, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        out = io.BytesIO()
+        t0 = time.perf_counter()
+        save(out)
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000, out.getvalue()
+
+
+def _parts(data: bytes) -> dict:
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 3, 6])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    templates = sorted(Path(TEMPLATE_DIR).glob("*.pptx"), key=lambda p: int(p.stem[3:]) if p.stem[3:].isdigit() else 0)
+    header = f"{'template':>10} {'default ms':>11} {'bytes':>9}"
+    for level in args.levels:
+        header += f" {f'L{level} ms':>8} {'bytes':>9}"
+    print(header + f" {'same parts':>11}")
+
+    totals = {"default": 0.0, **{level: 0.0 for level in args.levels}}
+    for path in templates:
+        prs = Presentation(str(path))
+        elapsed, baseline = _save(prs.save, args.repeat)
+        totals["default"] += elapsed
+        row = f"{path.name:>10} {elapsed:>11.1f} {len(baseline):>9}"
+        same = True
+        for level in args.levels:
+            elapsed, data = _save(lambda out: save_pptx(prs, out, level), args.repeat)
+            totals[level] += elapsed
+            same = same and _parts(data) == _parts(baseline)
+            row += f" {elapsed:>8.1f} {len(data):>9}"
+        print(row + f" {str(same):>11}")
+
+    row = f"{'total':>10} {totals['default']:>11.1f} {'':>9}"
+    for level in args.levels:
+        row += f" {totals[level]:>8.1f} {'':>9}"
+    print(row)
+
+
+if __name__ == "__main__":
+    main()
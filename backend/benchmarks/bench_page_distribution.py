@@ -0,0 +1,109 @@
+# backend/benchmarks/bench_page_distribution.py
+"""
+Page distribution benchmark: services/docx_generator.distribute_sections_across_pages
+vs the previous implementation (kept below as `legacy_distribute`), which
+rescanned every page and recounted words with a regex on each split.
+
+Documents of growing size with few, long sections (the split path) and with
+more sections than pages (the balancing path). Also checks that both give the
+same pages for the same input.
+
+Run from backend/:
+    python -m benchmarks.bench_page_distribution [--repeat 5]
+"""
+import argparse
+import random
+import re
+import statistics
+import time
+from typing import Dict, List
+
+from services.docx_generator import distribute_sections_across_pages, split_section_into_parts
+from services.section_text import normalise
+
+WORDS = "market growth policy battery charging demand supply vehicle price range".split()
+
+
+def _section(rng: random.Random, heading: str, paragraphs: int) -> Dict:
+    text = "\n\n".join(
+        ". ".join(" ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(rng.randint(2, 5))) + "."
+        for _ in range(paragraphs)
+    )
+    values = normalise("", heading, text)
+    return {"heading": heading, "content": values.pop("clean_content"), **values}
+
+
+def legacy_distribute(sections: List[Dict], num_pages: int) -> Dict[int, List[Dict]]:
+    """The pre-heap algorithm (regex word counts, full page scan per split)."""
+    def word_count(s):
+        return len(re.findall(r"\w+", s.get("content", "") or ""))
+
+    pages_list: List[List[Dict]] = [[] for _ in range(num_pages)]
+    for i, sec in enumerate(sorted(sections, key=word_count, reverse=True)):
+        pages_list[i].append(sec)
+    empty_slots = num_pages - sum(1 for p in pages_list if p)
+    while empty_slots > 0:
+        longest_page_idx, longest_wc = None, 0
+        for i, page in enumerate(pages_list):
+            if not page:
+                continue
+            wc = sum(word_count(sec) for sec in page)
+            if wc > longest_wc:
+                longest_wc, longest_page_idx = wc, i
+        if longest_page_idx is None:
+            break
+        parts = split_section_into_parts(pages_list[longest_page_idx].pop(0), 2)
+        pages_list[longest_page_idx].append(parts[0])
+        next_empty = next(j for j, pg in enumerate(pages_list) if not pg)
+        pages_list[next_empty].append(parts[1])
+        empty_slots -= 1
+    return {i + 1: page for i, page in enumerate(pages_list)}
+
+
+def _shape(pages: Dict[int, List[Dict]]) -> list:
+    return [(p, [(s["heading"], s["content"]) for s in secs]) for p, secs in sorted(pages.items())]
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    print("split path (fewer sections than pages)")
+    print(f"{'pages':>6} {'sections':>9} {'words':>8} {'legacy ms':>10} {'heap ms':>9} {'same':>5}")
+    for num_pages, num_sections, paragraphs in ((10, 3, 20), (50, 5, 60), (200, 8, 150), (500, 10, 300)):
+        sections = [_section(rng, f"Section {i}", paragraphs) for i in range(num_sections)]
+        words = sum(s["word_count"] for s in sections)
+        same = _shape(legacy_distribute(sections, num_pages)) == _shape(
+            distribute_sections_across_pages(sections, num_pages)
+        )
+        legacy = _time(lambda: legacy_distribute(sections, num_pages), args.repeat)
+        heap = _time(lambda: distribute_sections_across_pages(sections, num_pages), args.repeat)
+        print(f"{num_pages:>6} {num_sections:>9} {words:>8} {legacy:>10.1f} {heap:>9.1f} {str(same):>5}")
+
+    print("\nbalancing path (more sections than pages)")
+    print(f"{'pages':>6} {'sections':>9} {'by count ms':>12} {'by words ms':>12} {'max/min words (count)':>22} {'(words)':>8}")
+    for num_pages, num_sections in ((10, 30), (50, 200), (200, 1000)):
+        sections = [_section(rng, f"Section {i}", rng.randint(1, 12)) for i in range(num_sections)]
+        spread = []
+        for balance in ("sections", "words"):
+            pages = distribute_sections_across_pages(sections, num_pages, balance)
+            totals = [sum(s["word_count"] for s in secs) for secs in pages.values()]
+            spread.append(max(totals) / max(min(totals), 1))
+        by_count = _time(lambda: distribute_sections_across_pages(sections, num_pages), args.repeat)
+        by_words = _time(lambda: distribute_sections_across_pages(sections, num_pages, "words"), args.repeat)
+        print(f"{num_pages:>6} {num_sections:>9} {by_count:>12.2f} {by_words:>12.2f} {spread[0]:>22.2f} {spread[1]:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
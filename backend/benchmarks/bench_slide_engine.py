@@ -0,0 +1,100 @@
+# backend/benchmarks/bench_slide_engine.py
+"""
+Slide engine micro-benchmark: per-slide cost of every registered layout
+strategy (services/pptx_builder), on each template.
+
+For each layout, N slides are added to a fresh copy of the template:
+- clone: python-pptx's add_slide() on the layout alone (the floor)
+- engine: strategy.add_slide() with the manifest entry and prefetched
+  assets, i.e. clone + placeholder lookup + filling the text / picture
+The difference is what the strategy itself costs per slide.
+
+Run from backend/:
+    python -m benchmarks.bench_slide_engine [--slides 200] [--templates ppt1 ppt9]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import zipfile
+
+from pptx import Presentation
+
+from services.pptx_builder.registry import SlideContext, layouts, strategy_for
+from services.pptx_generator import TEMPLATE_MAP, _remove_all_slides
+from services.template_manifest import template_entry
+
+SAMPLE = {
+    "title": {"layout": "title", "title": "Electric vehicles in 2030"},
+    "bullet": {"layout": "bullet", "title": "Drivers", "bullets": ["Battery prices", "Charging", "Policy", "Range"]},
+    "two_column": {"layout": "two_column", "title": "Pros / cons", "left": "Cheaper to run", "right": "Upfront cost"},
+    "default": {"layout": "default", "title": "Anything else"},
+}
+
+
+def _sample_image() -> str:
+    """A PNG from a bundled template, so the image layout needs no network."""
+    with zipfile.ZipFile(TEMPLATE_MAP["ppt1"]) as zf:
+        name = next(n for n in zf.namelist() if n.startswith("ppt/media/") and n.endswith(".png"))
+        fd, path = tempfile.mkstemp(suffix=".png")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(zf.read(name))
+    return path
+
+
+def _fresh(theme_id: str):
+    prs = Presentation(TEMPLATE_MAP[theme_id])
+    _remove_all_slides(prs)
+    return prs
+
+
+def _per_slide(fn, count: int, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        step = fn()
+        t0 = time.perf_counter()
+        for _ in range(count):
+            step()
+        samples.append((time.perf_counter() - t0) / count)
+    return statistics.median(samples) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--slides", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--templates", nargs="+", default=["ppt1", "ppt9", "ppt10"])
+    args = parser.parse_args()
+
+    image = _sample_image()
+    samples = dict(SAMPLE, image={"layout": "image", "title": "Chart", "caption": "One. Two. Three.", "image_url": image})
+
+    print(f"{'template':>9} {'layout':>11} {'clone us':>9} {'engine us':>10} {'strategy us':>12}")
+    try:
+        for theme_id in args.templates:
+            entry = template_entry(theme_id)
+            for name in layouts():
+                strategy = strategy_for(name)
+                slide_data = samples.get(name, {"layout": name, "title": name})
+                assets = {url: url for url in strategy.image_urls(slide_data)}
+                index = entry["layouts"][entry["roles"][strategy.role]]["index"]
+
+                def clone():
+                    prs = _fresh(theme_id)
+                    layout = prs.slide_layouts[index]
+                    return lambda: prs.slides.add_slide(layout)
+
+                def engine():
+                    ctx = SlideContext(_fresh(theme_id), entry, assets)
+                    return lambda: strategy.add_slide(ctx, slide_data)
+
+                floor = _per_slide(clone, args.slides, args.repeat)
+                total = _per_slide(engine, args.slides, args.repeat)
+                print(f"{theme_id:>9} {name:>11} {floor:>9.0f} {total:>10.0f} {total - floor:>12.0f}")
+    finally:
+        os.unlink(image)
+
+
+if __name__ == "__main__":
+    main()
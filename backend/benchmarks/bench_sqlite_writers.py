@@ -0,0 +1,138 @@
+# backend/benchmarks/bench_sqlite_writers.py
+"""
+Concurrent-writer benchmark: default SQLAlchemy engine vs core/dbconfig.make_engine.
+
+Simulates the API under load on one SQLite file:
+- writer threads doing what update_slide / create_word_project do
+  (read the deck row, rewrite its JSON content, insert section rows, commit)
+- reader threads doing dashboard-style scans at the same time
+
+Run from backend/:
+    python -m benchmarks.bench_sqlite_writers [--writers 16] [--readers 4] [--seconds 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from core.dbconfig import make_engine
+
+SCHEMA = [
+    "CREATE TABLE decks (id INTEGER PRIMARY KEY, owner_id INTEGER, content TEXT, updated_at REAL)",
+    "CREATE TABLE sections (id INTEGER PRIMARY KEY, deck_id INTEGER, content TEXT)",
+]
+CONTENT = json.dumps([{"layout": "bullet", "title": f"Slide {i}", "bullets": ["x" * 120] * 5} for i in range(20)])
+
+
+def _setup(url: str, decks: int) -> None:
+    eng = create_engine(url)
+    with eng.begin() as conn:
+        for stmt in SCHEMA:
+            conn.execute(text(stmt))
+        conn.execute(
+            text("INSERT INTO decks (id, owner_id, content, updated_at) VALUES (:id, :o, :c, 0)"),
+            [{"id": i, "o": i % 8, "c": CONTENT} for i in range(1, decks + 1)],
+        )
+    eng.dispose()
+
+
+def _run(engine, writers: int, readers: int, seconds: float, decks: int, hold: float) -> dict:
+    stop = time.monotonic() + seconds
+    lock = threading.Lock()
+    stats = {"commits": 0, "locked": 0, "reads": 0, "latencies": []}
+
+    def writer(n: int) -> None:
+        i = 0
+        while time.monotonic() < stop:
+            deck_id = (n * 7 + i) % decks + 1
+            i += 1
+            t0 = time.monotonic()
+            try:
+                with engine.begin() as conn:
+                    row = conn.execute(text("SELECT content FROM decks WHERE id = :id"), {"id": deck_id}).first()
+                    slides = json.loads(row[0])
+                    slides[0]["title"] = f"edit {n}-{i}"
+                    conn.execute(
+                        text("UPDATE decks SET content = :c, updated_at = :t WHERE id = :id"),
+                        {"c": json.dumps(slides), "t": time.time(), "id": deck_id},
+                    )
+                    conn.execute(
+                        text("INSERT INTO sections (deck_id, content) VALUES (:d, :c)"),
+                        [{"d": deck_id, "c": "lorem ipsum " * 40} for _ in range(3)],
+                    )
+                    # request work done while the write transaction is open
+                    time.sleep(hold)
+                with lock:
+                    stats["commits"] += 1
+                    stats["latencies"].append(time.monotonic() - t0)
+            except OperationalError as e:
+                if "locked" not in str(e) and "busy" not in str(e):
+                    raise
+                with lock:
+                    stats["locked"] += 1
+
+    def reader(n: int) -> None:
+        while time.monotonic() < stop:
+            try:
+                with engine.connect() as conn:
+                    conn.execute(
+                        text("SELECT id, content FROM decks WHERE owner_id = :o ORDER BY updated_at DESC"),
+                        {"o": n % 8},
+                    ).all()
+                with lock:
+                    stats["reads"] += 1
+            except OperationalError as e:
+                if "locked" not in str(e) and "busy" not in str(e):
+                    raise
+                with lock:
+                    stats["locked"] += 1
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    threads += [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    lat = sorted(stats["latencies"]) or [0.0]
+    return {
+        "commits/s": round(stats["commits"] / seconds, 1),
+        "reads/s": round(stats["reads"] / seconds, 1),
+        "locked_errors": stats["locked"],
+        "p50_ms": round(statistics.median(lat) * 1000, 1),
+        "p99_ms": round(lat[int(len(lat) * 0.99) - 1 if len(lat) > 1 else 0] * 1000, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--decks", type=int, default=50)
+    parser.add_argument("--hold-ms", type=float, default=2.0, help="work inside each write transaction")
+    args = parser.parse_args()
+
+    # same pool size for both, so only the connection setup differs
+    pool_size = args.writers + args.readers
+    for label, factory in (
+        ("default create_engine", lambda url: create_engine(url, pool_size=pool_size)),
+        ("dbconfig.make_engine", lambda url: make_engine(url, pool_size=pool_size)),
+    ):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            _setup(url, args.decks)
+            engine = factory(url)
+            result = _run(engine, args.writers, args.readers, args.seconds, args.decks, args.hold_ms / 1000)
+            engine.dispose()
+        print(f"{label:24s} {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# backend/benchmarks/bench_table_slides.py
+"""
+Table slide benchmark: the "table" strategy (services/pptx_builder/slides/table.py,
+one XML parse per slide) vs python-pptx's add_table() filled cell by cell
+(`legacy_table` below) on one slide.
+
+Reports render time for growing tables, how many slides the strategy split
+the rows over, and checks that reading the cells back through python-pptx
+gives the header plus every row, in order.
+
+Run from backend/:
+    python -m benchmarks.bench_table_slides [--repeat 5]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from pptx import Presentation
+from pptx.util import Pt
+
+from services.pptx_builder.registry import SlideContext, strategy_for
+from services.pptx_generator import TEMPLATE_MAP, _remove_all_slides
+from services.template_manifest import template_entry
+
+WORDS = "market growth policy battery charging demand supply vehicle price range".split()
+
+
+def _fresh(theme_id: str):
+    prs = Presentation(TEMPLATE_MAP[theme_id])
+    _remove_all_slides(prs)
+    return prs
+
+
+def legacy_table(prs, entry: dict, slide_data: dict) -> None:
+    layout = entry["layouts"][entry["roles"]["table"]]
+    slide = prs.slides.add_slide(prs.slide_layouts[layout["index"]])
+    slide.shapes.title.text = slide_data["title"]
+    rows = [slide_data["columns"], *slide_data["rows"]]
+    table = slide.shapes.add_table(
+        len(rows), len(rows[0]), int(prs.slide_width * 0.08), int(prs.slide_height * 0.25),
+        int(prs.slide_width * 0.84), int(prs.slide_height * 0.65),
+    ).table
+    for r, row in enumerate(rows):
+        for c, value in enumerate(row):
+            cell = table.cell(r, c)
+            cell.text = value
+            for p in cell.text_frame.paragraphs:
+                for run in p.runs:
+                    run.font.size = Pt(12)
+
+
+def _read_back(prs) -> list:
+    rows = []
+    for slide in prs.slides:
+        for shape in slide.shapes:
+            if shape.has_table:
+                table_rows = [[cell.text for cell in row.cells] for row in shape.table.rows]
+                rows.extend(table_rows if not rows else table_rows[1:])
+    return rows
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--template", default="ppt1")
+    args = parser.parse_args()
+    rng = random.Random(5)
+    entry = template_entry(args.template)
+    strategy = strategy_for("table")
+
+    print(f"{'rows x cols':>12} {'cell-by-cell ms':>16} {'bulk ms':>8} {'slides':>7} {'all cells':>10}")
+    for num_rows, num_cols in ((10, 4), (50, 8), (200, 6), (1000, 5)):
+        slide_data = {
+            "layout": "table",
+            "title": "Benchmark",
+            "columns": [f"Column {c}" for c in range(num_cols)],
+            "rows": [
+                [" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))) for _ in range(num_cols)]
+                for _ in range(num_rows)
+            ],
+        }
+
+        def bulk():
+            prs = _fresh(args.template)
+            strategy.add_slide(SlideContext(prs, entry, {}), slide_data)
+            return prs
+
+        def legacy():
+            legacy_table(_fresh(args.template), entry, slide_data)
+
+        # template load is the same on both sides; time it separately and take it off
+        load = _time(lambda: _fresh(args.template), args.repeat)
+        bulk_ms = _time(bulk, args.repeat) - load
+        legacy_ms = _time(legacy, args.repeat) - load
+        prs = bulk()
+        complete = _read_back(prs) == [slide_data["columns"], *slide_data["rows"]]
+        print(
+            f"{f'{num_rows} x {num_cols}':>12} {legacy_ms:>16.1f} {bulk_ms:>8.1f} "
+            f"{len(prs.slides):>7} {str(complete):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# backend/benchmarks/bench_text_frames.py
+"""
+Text frame benchmark: services/pptx_builder/text.write_paragraphs (one lxml
+parse per frame) vs python-pptx's paragraph API (`legacy_fill` below, what
+the bullet / two-column / image strategies did before).
+
+Bullet slides with growing list lengths are filled both ways on the same
+fresh slides; reports the fill time per deck and checks that every text
+frame serialises to the same XML.
+
+Run from backend/:
+    python -m benchmarks.bench_text_frames [--slides 100] [--repeat 5]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from lxml import etree
+from pptx import Presentation
+
+from services.pptx_builder.text import write_paragraphs
+from services.pptx_generator import TEMPLATE_MAP, _remove_all_slides
+from services.template_manifest import template_entry
+
+WORDS = "market growth policy battery charging demand supply vehicle price range".split()
+
+
+def legacy_fill(tf, texts) -> None:
+    tf.clear()
+    for i, text in enumerate(texts):
+        p = tf.paragraphs[0] if i == 0 else tf.add_paragraph()
+        p.text = text
+
+
+def _frames(theme_id: str, count: int):
+    """Body text frames of `count` fresh bullet slides."""
+    prs = Presentation(TEMPLATE_MAP[theme_id])
+    _remove_all_slides(prs)
+    entry = template_entry(theme_id)
+    layout = entry["layouts"][entry["roles"]["bullet"]]
+    frames = []
+    for _ in range(count):
+        slide = prs.slides.add_slide(prs.slide_layouts[layout["index"]])
+        frames.append(list(slide.shapes)[layout["content"][0]].text_frame)
+    return frames
+
+
+def _time(fill, theme_id: str, decks: list, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        frames = _frames(theme_id, len(decks))
+        t0 = time.perf_counter()
+        for tf, texts in zip(frames, decks):
+            fill(tf, texts)
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000, [etree.tostring(tf._txBody) for tf in frames]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--slides", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--template", default="ppt1")
+    args = parser.parse_args()
+    rng = random.Random(11)
+
+    print(f"{'bullets':>8} {'slides':>7} {'python-pptx ms':>15} {'bulk ms':>8} {'speed-up':>9} {'same xml':>9}")
+    for bullets in (4, 10, 30, 100):
+        decks = [
+            [" ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 14))) for _ in range(bullets)]
+            for _ in range(args.slides)
+        ]
+        legacy, legacy_xml = _time(legacy_fill, args.template, decks, args.repeat)
+        bulk, bulk_xml = _time(write_paragraphs, args.template, decks, args.repeat)
+        same = legacy_xml == bulk_xml
+        print(f"{bullets:>8} {args.slides:>7} {legacy:>15.1f} {bulk:>8.1f} {legacy / bulk:>8.1f}x {str(same):>9}")
+
+
+if __name__ == "__main__":
+    main()
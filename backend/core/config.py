@@ -5,4 +5,84 @@ load_dotenv()
 
 class Config:
     DATABASE_URL = os.getenv("DATABASE_URL")
-    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
\ No newline at end of file
+    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+    # ---- scheduler (priority lanes in front of Gemini + render jobs) ----
+    # total concurrent Gemini calls / render jobs allowed in this process
+    MODEL_CONCURRENCY = int(os.getenv("MODEL_CONCURRENCY", "4"))
+    RENDER_CONCURRENCY = int(os.getenv("RENDER_CONCURRENCY", "2"))
+    # slots that bulk work can never take, so interactive edits never wait behind a batch
+    # (added on top of the concurrency above when it is too small to hold them)
+    INTERACTIVE_RESERVED_SLOTS = int(os.getenv("INTERACTIVE_RESERVED_SLOTS", "1"))
+    # weighted fair share between lanes when both have waiters
+    INTERACTIVE_WEIGHT = int(os.getenv("INTERACTIVE_WEIGHT", "4"))
+    BULK_WEIGHT = int(os.getenv("BULK_WEIGHT", "1"))
+
+    # ---- Gemini circuit breaker ----
+    # consecutive failures before the breaker opens and calls fail fast
+    GEMINI_BREAKER_FAILURES = int(os.getenv("GEMINI_BREAKER_FAILURES", "5"))
+    # seconds the breaker stays open before letting one probe call through
+    GEMINI_BREAKER_RESET_SECONDS = float(os.getenv("GEMINI_BREAKER_RESET_SECONDS", "30"))
+    # per-call timeout handed to the Gemini SDK
+    GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "60"))
+
+    # ---- Idempotency-Key handling for the create endpoints ----
+    # how long a stored result can be replayed
+    IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    # how long a retry waits for the original in-flight call before giving up with 409
+    IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "300"))
+    # an in_progress marker older than this belongs to a crashed worker and is taken over;
+    # keep it well above the slowest create, or a long call could run twice
+    IDEMPOTENCY_STALE_SECONDS = float(os.getenv("IDEMPOTENCY_STALE_SECONDS", "3600"))
+
+    # ---- DB engines (see core/dbconfig.py) ----
+    # FastAPI-Users tables; same SQLite file as the business tables by default
+    AUTH_DATABASE_URL = os.getenv("AUTH_DATABASE_URL", "sqlite+aiosqlite:///./ppt_generator.db")
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "15000"))
+    SQLITE_CACHE_KIB = int(os.getenv("SQLITE_CACHE_KIB", "65536"))
+    SQLITE_MMAP_BYTES = int(os.getenv("SQLITE_MMAP_BYTES", str(256 * 1024 * 1024)))
+
+    # ---- auth bridge cache (services/user_cache.py) ----
+    AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "300"))
+    # unknown / inactive users; short so a new account is not locked out for long
+    AUTH_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_NEGATIVE_TTL_SECONDS", "30"))
+    AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+
+    # ---- DOCX export ----
+    # how sections are spread over pages when there are enough of them:
+    # "sections" (equal section counts) or "words" (equal word counts)
+    DOCX_PAGE_BALANCE = os.getenv("DOCX_PAGE_BALANCE", "sections")
+    # "styles": page font sizes via named styles defined once in styles.xml;
+    # "runs": the size written on every run (larger, slower files)
+    DOCX_RENDER_MODE = os.getenv("DOCX_RENDER_MODE", "styles")
+    # rendered section XML kept for re-exports (services/docx_fragments.py)
+    DOCX_FRAGMENT_CACHE_BYTES = int(os.getenv("DOCX_FRAGMENT_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+    # ---- PPTX download (services/pptx_cache.py) ----
+    # a deck is built into memory up to this size, then into an anonymous temp file
+    PPTX_SPOOL_BYTES = int(os.getenv("PPTX_SPOOL_BYTES", str(16 * 1024 * 1024)))
+    # finished decks kept on disk for repeat downloads; empty dir -> storage/cache/pptx, 0 bytes -> off
+    PPTX_CACHE_DIR = os.getenv("PPTX_CACHE_DIR", "")
+    PPTX_CACHE_BYTES = int(os.getenv("PPTX_CACHE_BYTES", str(256 * 1024 * 1024)))
+    # remote images are cached by URL, so this also bounds how stale one can get
+    PPTX_CACHE_TTL_SECONDS = int(os.getenv("PPTX_CACHE_TTL_SECONDS", "3600"))
+    # last build of every deck with per-slide fingerprints, so a download after an edit only
+    # re-renders the changed slides (services/pptx_decks.py); empty dir -> storage/cache/decks,
+    # 0 bytes -> off (every download is a full build in memory)
+    PPTX_DECKS_DIR = os.getenv("PPTX_DECKS_DIR", "")
+    PPTX_DECKS_BYTES = int(os.getenv("PPTX_DECKS_BYTES", str(512 * 1024 * 1024)))
+    # decks are rendered in the background this long after their last edit, so the download that
+    # follows is served from the deck store (services/prerender.py); < 0 -> off
+    PRERENDER_DELAY_SECONDS = float(os.getenv("PRERENDER_DELAY_SECONDS", "3"))
+    PRERENDER_WORKERS = int(os.getenv("PRERENDER_WORKERS", "2"))
+    # deck images are fetched in parallel before the slides are built (services/pptx_builder/assets.py)
+    PPTX_IMAGE_FETCH_WORKERS = int(os.getenv("PPTX_IMAGE_FETCH_WORKERS", "8"))
+    PPTX_IMAGE_TIMEOUT_SECONDS = float(os.getenv("PPTX_IMAGE_TIMEOUT_SECONDS", "15"))
+
+    # ---- .pptx / .docx zip packages (services/ooxml_package.py) ----
+    # DEFLATE level for XML parts (1 fastest .. 9 smallest); JPEG / PNG media is stored as is
+    PACKAGE_DEFLATE_LEVEL = int(os.getenv("PACKAGE_DEFLATE_LEVEL", "1"))
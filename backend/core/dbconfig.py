@@ -0,0 +1,109 @@
+# backend/core/dbconfig.py
+"""
+One place that creates DB engines, so every engine (business sync engine,
+FastAPI-Users async engine, ...) gets the same connection setup:
+
+- SQLite: WAL journal, synchronous=NORMAL, busy timeout, page cache and mmap
+  pragmas applied on every new connection, so concurrent writers wait for the
+  lock instead of failing with "database is locked"
+- pool size / overflow / timeout from Config; pre-ping + recycle for servers
+"""
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from core.config import Config
+
+
+# async driver used for each backend when the configured URL names a sync one
+_ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+
+def async_url(url: str) -> str:
+    """sqlite:///x.db -> sqlite+aiosqlite:///x.db, postgresql://.. -> postgresql+asyncpg://.."""
+    u = make_url(url)
+    backend = u.get_backend_name()
+    driver = _ASYNC_DRIVERS.get(backend)
+    if driver is None or u.get_driver_name() == driver:
+        return url
+    return u.set(drivername=f"{backend}+{driver}").render_as_string(hide_password=False)
+
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    database = make_url(url).database
+    return not database or database == ":memory:" or "mode=memory" in str(url)
+
+
+def sqlite_pragmas() -> dict:
+    return {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": Config.SQLITE_BUSY_TIMEOUT_MS,
+        # negative cache_size = KiB instead of pages
+        "cache_size": -Config.SQLITE_CACHE_KIB,
+        "mmap_size": Config.SQLITE_MMAP_BYTES,
+        "temp_store": "MEMORY",
+    }
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def engine_options(url: str) -> dict:
+    """Pool / connect kwargs for create_engine / create_async_engine."""
+    if is_sqlite(url):
+        if _is_memory_sqlite(url):
+            # in-memory DBs use SingletonThreadPool / StaticPool: no pool sizing
+            return {"connect_args": {"check_same_thread": False}}
+        return {
+            "pool_size": Config.DB_POOL_SIZE,
+            "max_overflow": Config.DB_MAX_OVERFLOW,
+            "pool_timeout": Config.DB_POOL_TIMEOUT,
+            # the driver's own busy wait, on top of the busy_timeout pragma
+            "connect_args": {
+                "check_same_thread": False,
+                "timeout": Config.SQLITE_BUSY_TIMEOUT_MS / 1000,
+            },
+        }
+    return {
+        "pool_size": Config.DB_POOL_SIZE,
+        "max_overflow": Config.DB_MAX_OVERFLOW,
+        "pool_timeout": Config.DB_POOL_TIMEOUT,
+        "pool_pre_ping": True,
+        "pool_recycle": Config.DB_POOL_RECYCLE,
+    }
+
+
+def configure_engine(engine: Engine) -> Engine:
+    """Attach the per-connection setup (pragmas) to a sync engine."""
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _apply_sqlite_pragmas)
+    return engine
+
+
+def make_engine(url: str, **kwargs) -> Engine:
+    options = engine_options(url)
+    options.update(kwargs)
+    return configure_engine(create_engine(url, **options))
+
+
+def make_async_engine(url: str, **kwargs) -> AsyncEngine:
+    options = engine_options(url)
+    options.update(kwargs)
+    engine = create_async_engine(url, **options)
+    # pool events live on the sync facade of the async engine
+    configure_engine(engine.sync_engine)
+    return engine
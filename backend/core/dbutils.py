@@ -1,16 +1,27 @@
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from core.config import Config
+from core.dbconfig import async_url, make_async_engine, make_engine
 
-engine = create_engine(Config.DATABASE_URL)
+# WAL / busy timeout / pool settings are applied in core/dbconfig.py
+engine = make_engine(Config.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush = False, bind=engine)
 Base = declarative_base()
 
+# async engine on the same database, used by the API routers
+async_engine = make_async_engine(async_url(Config.DATABASE_URL))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
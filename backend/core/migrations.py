@@ -0,0 +1,184 @@
+# backend/core/migrations.py
+"""
+Tiny schema upgrades for existing databases.
+
+`Base.metadata.create_all` only creates missing tables: a new index or
+column on a table that already exists is skipped. `upgrade(engine)` runs
+right after create_all in main.py and fills those gaps idempotently, then
+backfills data that new columns / tables derive from existing rows.
+"""
+import json
+import logging
+
+from sqlalchemy import func, insert, inspect, null, select, update
+from sqlalchemy.engine import Connection, Engine
+
+from core.dbutils import Base
+from services.summaries import presentation_summary, project_summary
+
+logger = logging.getLogger(__name__)
+
+
+def add_missing_columns(engine: Engine) -> None:
+    """
+    ALTER TABLE ... ADD COLUMN for model columns the DB table lacks.
+    Columns must be nullable or carry a server_default (existing rows get it).
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present:
+                    continue
+                ddl = column.type.compile(dialect=engine.dialect)
+                if column.server_default is not None:
+                    ddl += f" DEFAULT {column.server_default.arg}"
+                    if not column.nullable:
+                        ddl += " NOT NULL"
+                logger.info("Adding column %s.%s (%s)", table.name, column.name, ddl)
+                conn.exec_driver_sql(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {ddl}')
+
+
+def create_missing_indexes(engine: Engine) -> None:
+    """Create every Index declared on the models that the DB does not have yet."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+def backfill_summaries(conn: Connection) -> None:
+    from models.models import Presentation, Project
+
+    P, D = Presentation.__table__, Project.__table__
+    for pid, topic, content in conn.execute(
+        select(P.c.presentation_id, P.c.topic, P.c.content).where(P.c.summary.is_(None))
+    ):
+        conn.execute(
+            update(P).where(P.c.presentation_id == pid).values(summary=presentation_summary(topic, content))
+        )
+    for did, title in conn.execute(select(D.c.id, D.c.title).where(D.c.summary.is_(None))):
+        conn.execute(update(D).where(D.c.id == did).values(summary=project_summary(title)))
+
+
+def backfill_user_counters(conn: Connection) -> None:
+    from models.models import Presentation, Project, User, UserCounter
+
+    U, C = User.__table__, UserCounter.__table__
+    has_row = select(C.c.user_id).where(C.c.user_id == U.c.id).exists()
+    conn.execute(
+        insert(C).from_select(
+            ["user_id", "presentations", "projects"],
+            select(
+                U.c.id,
+                select(func.count()).select_from(Presentation).where(Presentation.owner_id == U.c.id).scalar_subquery(),
+                select(func.count()).select_from(Project).where(Project.owner_id == U.c.id).scalar_subquery(),
+            ).where(~has_row),
+        )
+    )
+
+
+def migrate_presentation_content(conn: Connection) -> None:
+    """
+    Move the legacy Presentation.content JSON into `slides` rows, then clear it.
+    Content that isn't a slide list becomes slides all the same (nothing reads
+    the column any more): a dict is one slide, a scalar one bullet slide.
+    """
+    from models.models import Presentation, Slide
+    from services.slides import split_slide
+
+    P, S = Presentation.__table__, Slide.__table__
+    rows = conn.execute(select(P.c.presentation_id, P.c.content).where(P.c.content.is_not(None))).all()
+    moved = 0
+    for pid, content in rows:
+        if isinstance(content, str):
+            # some old rows hold the slide list as a JSON string
+            try:
+                content = json.loads(content)
+            except ValueError:
+                pass
+        if isinstance(content, dict) and isinstance(content.get("slides"), list):
+            # {"slides": [...], ...} as the old generator returned it
+            content = content["slides"]
+        elif not isinstance(content, list):
+            # a dict is one slide, a scalar one bullet slide (split_slide)
+            content = [content] if content not in (None, "", {}) else []
+        already = conn.execute(select(func.count()).select_from(S).where(S.c.presentation_id == pid)).scalar()
+        if not already and content:
+            slides = []
+            for position, slide in enumerate(content, start=1):
+                layout, payload = split_slide(slide)
+                slides.append({"presentation_id": pid, "position": float(position), "layout": layout, "payload": payload})
+            conn.execute(insert(S), slides)
+            moved += 1
+        conn.execute(update(P).where(P.c.presentation_id == pid).values(content=null()))
+    if moved:
+        logger.info("Moved %d presentation(s) to the slides table", moved)
+
+
+def migrate_section_history(conn: Connection) -> None:
+    """Move the legacy inline Section.history (full copies) into section_versions, then clear it."""
+    from models.models import Section, SectionVersion
+    from services.section_history import encode
+
+    S, V = Section.__table__, SectionVersion.__table__
+    rows = conn.execute(select(S.c.id, S.c.history, S.c.created_at).where(S.c.history.is_not(None))).all()
+    for section_id, history, created_at in rows:
+        entries = sorted(
+            (e for e in (history or []) if isinstance(e, dict)),
+            key=lambda e: e.get("version") or 0,
+        )
+        already = conn.execute(select(func.count()).select_from(V).where(V.c.section_id == section_id)).scalar()
+        if entries and not already:
+            versions, previous = [], None
+            for number, entry in enumerate(entries, start=1):
+                text = entry.get("content") or ""
+                snapshot, delta = encode(number, previous, text)
+                versions.append(
+                    {
+                        "section_id": section_id,
+                        "version": number,
+                        "prompt": entry.get("prompt"),
+                        "snapshot": snapshot,
+                        "delta": delta,
+                        "created_at": created_at,
+                    }
+                )
+                previous = text
+            conn.execute(insert(V), versions)
+            conn.execute(update(S).where(S.c.id == section_id).values(version=len(versions)))
+        conn.execute(update(S).where(S.c.id == section_id).values(history=null()))
+    if rows:
+        logger.info("Moved the history of %d section(s) to section_versions", len(rows))
+
+
+def backfill_section_text(conn: Connection) -> None:
+    """Stored export text / counts for sections written before they were kept."""
+    from models.models import Project, Section
+    from services.section_text import normalise
+
+    S, D = Section.__table__, Project.__table__
+    rows = conn.execute(
+        select(S.c.id, S.c.title, S.c.content, D.c.title)
+        .join(D, S.c.project_id == D.c.id)
+        .where(S.c.word_count.is_(None))
+    ).all()
+    for section_id, heading, content, doc_title in rows:
+        conn.execute(update(S).where(S.c.id == section_id).values(**normalise(doc_title, heading, content)))
+    if rows:
+        logger.info("Normalised the content of %d section(s)", len(rows))
+
+
+def upgrade(engine: Engine) -> None:
+    add_missing_columns(engine)
+    create_missing_indexes(engine)
+    with engine.begin() as conn:
+        # summaries first: old rows are summarised from their content JSON
+        backfill_summaries(conn)
+        backfill_user_counters(conn)
+        migrate_presentation_content(conn)
+        migrate_section_history(conn)
+        backfill_section_text(conn)
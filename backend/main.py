@@ -5,8 +5,13 @@ from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from core.dbutils import engine
+from core.migrations import upgrade
 from models import models
 from routers import presentations, documents, dashboard_auth
+from services import idempotency
+from services.circuit_breaker import gemini_breaker, CLOSED
+from services.prerender import prerenderer
+from services.scheduler import model_scheduler, render_scheduler
 
 # 🔐 auth imports
 from auth.db import create_db_and_tables
@@ -27,6 +32,8 @@ app = FastAPI(title="AI PPT & Document Generator API")
 
 # ========= 🗄 EXISTING SQLALCHEMY TABLES (PPT/DOC PART) =========
 models.Base.metadata.create_all(bind=engine)
+# new indexes / columns on tables that already existed
+upgrade(engine)
 
 # ========= 🌐 CORS =========
 app.add_middleware(
@@ -43,6 +50,21 @@ def read_root():
     return {"message": "Welcome to PPT & Document Generator API"}
 
 
+@app.get("/health")
+def health():
+    """Liveness + Gemini circuit breaker state, scheduler queue depth and background renders."""
+    breaker = gemini_breaker.snapshot()
+    return {
+        "status": "ok" if breaker["state"] == CLOSED else "degraded",
+        "gemini": breaker,
+        "scheduler": {
+            "model": model_scheduler.snapshot(),
+            "render": render_scheduler.snapshot(),
+        },
+        "prerender": prerenderer.snapshot(),
+    }
+
+
 # ========= 🔐 AUTH ROUTES =========
 
 # 1) Email/password JWT login
@@ -126,6 +148,7 @@ app.include_router(
 async def on_startup():
     # create auth tables (User + OAuthAccount) in ppt_generator.db (async engine)
     await create_db_and_tables()
+    await idempotency.purge_expired()
 
 
 if __name__ == "__main__":
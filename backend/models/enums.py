@@ -5,6 +5,7 @@ class SlideLayout(str, Enum):
     bullet = "bullet"
     two_column = "two_column"
     image = "image"
+    table = "table"
 
 class DocumentType(str, Enum):
     DOCX = "docx"
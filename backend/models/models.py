@@ -1,8 +1,13 @@
-from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, ForeignKey
+from sqlalchemy import (
+    Column, Float, Integer, String, Text, JSON, DateTime, ForeignKey, Index, UniqueConstraint,
+    event, func, select, update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from core.dbutils import Base
-from sqlalchemy.orm import declarative_mixin, relationship
+from sqlalchemy.orm import declarative_mixin, deferred, relationship
 from datetime import datetime
 from models.enums import DocumentType
+from services.summaries import project_summary
 
 
 @declarative_mixin
@@ -19,6 +24,10 @@ class Timestamp:
 # ------------------- PRESENTATION MODEL (PPT) -------------------
 class Presentation(Timestamp, Base):
     __tablename__ = "presentations"
+    __table_args__ = (
+        # dashboard listing: WHERE owner_id = ? ORDER BY created_at DESC
+        Index("ix_presentations_owner_created", "owner_id", "created_at"),
+    )
 
     presentation_id = Column(Integer, primary_key=True, autoincrement=True)
 
@@ -26,14 +35,41 @@ class Presentation(Timestamp, Base):
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     topic = Column(String)
+    # legacy whole-deck JSON: slides now live in the `slides` table
+    # (core/migrations.py moves old rows over and clears this column)
     content = Column(JSON)
     configuration = Column(JSON, nullable=True)
     pptx_path = Column(String, nullable=True)
+    # dashboard text, kept in sync with topic / first slide by services/slides.py
+    summary = Column(String, nullable=True)
+    # bumped on every change; PATCH only applies against the version the client saw
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     # relationship back to User
     owner = relationship("User", back_populates="presentations")
 
 
+# ---------------------- SLIDE MODEL ----------------------
+class Slide(Base):
+    """
+    One slide of a presentation. The deck is the presentation's rows ordered by
+    `position` (a float, so inserts / moves only write one row; see services/slides.py).
+    """
+    __tablename__ = "slides"
+    __table_args__ = (
+        Index("ix_slides_presentation_position", "presentation_id", "position"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    presentation_id = Column(
+        Integer, ForeignKey("presentations.presentation_id", ondelete="CASCADE"), nullable=False
+    )
+    position = Column(Float, nullable=False)
+    layout = Column(String, nullable=False)
+    # the slide dict without "layout" (title, bullets, left, right, image_url, ...)
+    payload = Column(JSON, nullable=False)
+
+
 # ---------------------- USER MODEL ----------------------
 class User(Timestamp, Base):
     __tablename__ = "users"
@@ -60,6 +96,10 @@ class User(Timestamp, Base):
 # ---------------------- PROJECT MODEL (DOCX) ----------------------
 class Project(Timestamp, Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        # dashboard listing: WHERE owner_id = ? ORDER BY created_at DESC
+        Index("ix_projects_owner_created", "owner_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -72,6 +112,8 @@ class Project(Timestamp, Base):
 
     # total number of pages for this Word document (optional for old data)
     num_pages = Column(Integer, nullable=True)
+    # dashboard text, kept in sync with title by the hooks at the bottom
+    summary = Column(String, nullable=True)
 
     owner = relationship("User", back_populates="projects")
     sections = relationship(
@@ -93,7 +135,14 @@ class Section(Timestamp, Base):
     content = Column(Text, nullable=True)
     feedback = Column(String, nullable=True)
     comment = Column(Text, nullable=True)
-    history = Column(JSON, nullable=True)
+    # legacy inline history (full copies): moved to section_versions by core/migrations.py
+    history = deferred(Column(JSON, nullable=True))
+    # latest version recorded in section_versions (NULL: none yet)
+    version = Column(Integer, nullable=True)
+    # content as exported (services/section_text.py), computed whenever content is written
+    clean_content = deferred(Column(Text, nullable=True))
+    paragraph_count = Column(Integer, nullable=True)
+    word_count = Column(Integer, nullable=True)
 
     # page-wise positioning
     # page_number: which page this section belongs to (1-based)
@@ -102,3 +151,117 @@ class Section(Timestamp, Base):
     section_index = Column(Integer, nullable=True)
 
     project = relationship("Project", back_populates="sections")
+
+
+# ---------------------- SECTION VERSIONS ----------------------
+class SectionVersion(Base):
+    """
+    One version of a section's text: a full `snapshot`, or a `delta` against the
+    previous version (see services/section_history.py). Never loaded with the project.
+    """
+    __tablename__ = "section_versions"
+    __table_args__ = (
+        UniqueConstraint("section_id", "version", name="uq_section_versions_section_version"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    section_id = Column(Integer, ForeignKey("sections.id", ondelete="CASCADE"), nullable=False)
+    version = Column(Integer, nullable=False)
+    prompt = Column(Text, nullable=True)
+    snapshot = Column(Text, nullable=True)
+    delta = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
+
+    section = relationship("Section")
+
+
+# ---------------------- IDEMPOTENCY KEYS ----------------------
+class IdempotencyKey(Base):
+    """
+    Stored result of an expensive create call, per (user, Idempotency-Key header).
+    A retry with the same key replays `response` instead of generating again.
+    """
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("owner_id", "key", name="uq_idempotency_owner_key"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    key = Column(String(255), nullable=False)
+
+    # "POST /presentations" etc. + hash of the request body, so a reused key
+    # with a different payload is rejected instead of replaying the wrong result
+    endpoint = Column(String, nullable=False)
+    request_hash = Column(String(64), nullable=False)
+
+    status = Column(String, nullable=False, default="in_progress")  # in_progress | completed
+    response = Column(JSON, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+# ---------------------- PER-USER COUNTERS ----------------------
+class UserCounter(Base):
+    """
+    Number of presentations / projects per user, maintained by the insert /
+    delete hooks below in the same transaction as the row change.
+    """
+    __tablename__ = "user_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    presentations = Column(Integer, nullable=False, default=0)
+    projects = Column(Integer, nullable=False, default=0)
+
+
+# ---------------------- WRITE HOOKS ----------------------
+
+@event.listens_for(Project, "before_insert")
+@event.listens_for(Project, "before_update")
+def _project_summary(mapper, connection, target):
+    target.summary = project_summary(target.title)
+
+
+_COUNTER_COLUMNS = {Presentation: "presentations", Project: "projects"}
+
+
+def _count_query(model, owner_id):
+    return select(func.count()).select_from(model).where(model.owner_id == owner_id).scalar_subquery()
+
+
+# INSERT .. ON CONFLICT DO NOTHING per backend (core/dbconfig.py)
+_UPSERT_INSERT = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def _bump_counter(connection, model, owner_id: int, delta: int) -> None:
+    counters = UserCounter.__table__
+    name = _COUNTER_COLUMNS[model]
+    column = counters.c[name]
+    bump = update(counters).where(counters.c.user_id == owner_id).values({column: column + delta})
+    if connection.execute(bump).rowcount:
+        return
+    # no counters row yet: seed it from the real counts, which already include
+    # this flush (visible on this connection), so less the delta applied next.
+    # A concurrent first create may seed it meanwhile: then this insert is a no-op.
+    seed = {c: _count_query(m, owner_id) for m, c in _COUNTER_COLUMNS.items()}
+    seed[name] = seed[name] - delta
+    connection.execute(
+        _UPSERT_INSERT[connection.dialect.name](counters)
+        .values(user_id=owner_id, **seed)
+        .on_conflict_do_nothing(index_elements=[counters.c.user_id])
+    )
+    connection.execute(bump)
+
+
+def _counter_after_insert(mapper, connection, target):
+    _bump_counter(connection, mapper.class_, target.owner_id, 1)
+
+
+def _counter_after_delete(mapper, connection, target):
+    _bump_counter(connection, mapper.class_, target.owner_id, -1)
+
+
+for _model in _COUNTER_COLUMNS:
+    event.listen(_model, "after_insert", _counter_after_insert)
+    event.listen(_model, "after_delete", _counter_after_delete)
@@ -30,7 +30,15 @@ class ImageSlide(BaseModel):
     image_url: str
 
 
-SlideContent = Union[TitleSlide, BulletSlide, TwoColumnSlide, ImageSlide]
+class TableSlide(BaseModel):
+    layout: SlideLayout
+    title: str
+    columns: List[str]
+    # one list of cells per row, in column order
+    rows: List[List[str]]
+
+
+SlideContent = Union[TitleSlide, BulletSlide, TwoColumnSlide, ImageSlide, TableSlide]
 
 
 class PresentationCreate(BaseModel):
@@ -106,6 +114,8 @@ class PresentationOut(BaseModel):
     topic: str
     content: List[SlideContent]
     configuration: Optional[Dict]
+    # send back as `version` / If-Match on PATCH
+    version: Optional[int] = None
 
     class Config:
         orm_mode = True
@@ -1,16 +1,37 @@
 # backend/routers/auth_bridge.py
 
+from typing import Optional
+
+import jwt
 from fastapi import Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi_users.exceptions import InvalidID
+from fastapi_users.jwt import decode_jwt
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.dbutils import get_db
+from core.dbutils import get_async_db
 from models import models
-from auth.users import current_active_user
+from auth.users import UserManager, bearer_transport, get_jwt_strategy, get_user_manager
+from services.user_cache import CachedUser, user_cache
+
 
+def _token_subject(token: Optional[str], user_manager: UserManager):
+    """Verify the JWT (signature, audience, expiry) and return the parsed auth user id."""
+    if token is None:
+        return None
+    strategy = get_jwt_strategy()
+    try:
+        data = decode_jwt(token, strategy.decode_key, strategy.token_audience, algorithms=[strategy.algorithm])
+        return user_manager.parse_id(data.get("sub"))
+    except (jwt.PyJWTError, InvalidID):
+        return None
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    auth_user = Depends(current_active_user),
+
+async def get_current_user(
+    token: Optional[str] = Depends(bearer_transport.scheme),
+    user_manager: UserManager = Depends(get_user_manager),
+    db: AsyncSession = Depends(get_async_db),
 ) -> models.User:
     """
     Bridge between FastAPI-Users auth user and local SQLAlchemy User.
@@ -18,14 +39,34 @@ def get_current_user(
     - Uses the email from FastAPI-Users user (auth_user.email)
     - Finds/creates a local models.User row with that email
     - Returns the local models.User (with integer id)
+
+    The auth user id -> local user mapping is cached (services/user_cache.py),
+    so a known token costs one JWT decode and no DB round trips. The returned
+    User is then a detached instance carrying only id + email.
     """
 
+    auth_id = _token_subject(token, user_manager)
+    if auth_id is None:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    found, cached = user_cache.get(auth_id)
+    if found:
+        if cached is None:
+            raise HTTPException(status_code=401, detail="Unauthorized")
+        return models.User(id=cached.id, email=cached.email)
+
+    # same checks as fastapi_users.current_user(active=True)
+    auth_user = await get_jwt_strategy().read_token(token, user_manager)
+    if auth_user is None or not auth_user.is_active:
+        user_cache.put_missing(auth_id)
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
     email = getattr(auth_user, "email", None)
     if not email:
         raise HTTPException(status_code=401, detail="Authenticated user has no email")
 
     # Look up local user by email
-    user = db.query(models.User).filter(models.User.email == email).first()
+    user = await db.scalar(select(models.User).where(models.User.email == email))
 
     # If no local row yet, create one
     if not user:
@@ -34,7 +75,14 @@ def get_current_user(
             hashed_password="not_used",  # not used here; FastAPI-Users manages real auth
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # a concurrent first request created the row in the meantime
+            await db.rollback()
+            user = await db.scalar(select(models.User).where(models.User.email == email))
+        else:
+            await db.refresh(user)
 
+    user_cache.put(auth_id, CachedUser(id=user.id, email=user.email))
     return user
@@ -1,137 +1,162 @@
 # backend/routers/dashboard_auth.py
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from core.dbutils import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, false, or_, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.dbutils import get_async_db
 from models import models
+from services import slides
 from .auth_bridge import get_current_user  # 👈 use the bridge
+import base64
 import json
+from datetime import datetime
+from typing import Literal, Optional, Tuple
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
 
-def _make_summary_from_presentation(presentation_obj, char_limit=280):
-    try:
-        topic = (getattr(presentation_obj, "topic", "") or "").strip()
-    except Exception:
-        topic = ""
+# kind rank breaks created_at ties between the two tables: the merged stream is
+# ordered by (created_at, kind, id) descending
+_KIND_PRESENTATION = 1
+_KIND_PROJECT = 0
+DASHBOARD_MAX_LIMIT = 200
+
+
+def _encode_cursor(created_at: datetime, kind: int, item_id: int) -> str:
+    raw = json.dumps({"t": created_at.isoformat(), "k": kind, "id": item_id})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
 
-    content = getattr(presentation_obj, "content", None)
-    short = ""
 
+def _decode_cursor(cursor: str) -> Tuple[datetime, int, int]:
     try:
-        if isinstance(content, list) and len(content) > 0:
-            first = content[0]
-            if isinstance(first, dict):
-                title = (first.get("title") or "").strip()
-                if title:
-                    short = title
-                else:
-                    bullets = first.get("bullets") or []
-                    if isinstance(bullets, list) and len(bullets) > 0:
-                        first_b = str(bullets[0]).strip()
-                        if first_b:
-                            short = first_b
-                    else:
-                        desc = (first.get("description") or "").strip()
-                        if desc:
-                            short = desc
-            elif isinstance(first, str) and first.strip():
-                short = first.strip()
-        elif isinstance(content, str) and content.strip():
-            try:
-                parsed = json.loads(content)
-                if isinstance(parsed, list) and parsed:
-                    f = parsed[0]
-                    if isinstance(f, dict):
-                        title = (f.get("title") or "").strip()
-                        if title:
-                            short = title
-                        else:
-                            bullets = f.get("bullets") or []
-                            if bullets and isinstance(bullets, list) and len(bullets) > 0:
-                                short = str(bullets[0]).strip()
-            except Exception:
-                short = content.strip()[:char_limit]
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return datetime.fromisoformat(data["t"]), int(data["k"]), int(data["id"])
     except Exception:
-        short = ""
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-    candidate = (short or topic or "").strip()
-    if not candidate:
-        candidate = f"Presentation #{getattr(presentation_obj, 'presentation_id', '')}"
 
-    if len(candidate) > char_limit:
-        cut = candidate[:char_limit]
-        last_space = cut.rfind(" ")
-        if last_space > int(char_limit * 0.5):
-            cut = cut[:last_space]
-        candidate = cut + "..."
-    return candidate
+def _after_cursor(created_col, id_col, kind: int, cursor: Optional[Tuple[datetime, int, int]]):
+    """WHERE clause for rows strictly after `cursor` in (created_at, kind, id) DESC order."""
+    if cursor is None:
+        return true()
+    c_created, c_kind, c_id = cursor
+    if kind < c_kind:
+        same_time = true()
+    elif kind == c_kind:
+        same_time = id_col < c_id
+    else:
+        same_time = false()
+    return or_(created_col < c_created, and_(created_col == c_created, same_time))
 
 
 @router.get("/items")
-def get_dashboard_items(
+async def get_dashboard_items(
+    type: Optional[Literal["pptx", "docx"]] = Query(None, description="only presentations or only documents"),
+    limit: int = Query(50, ge=1, le=DASHBOARD_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    include_content: bool = Query(False, description="include full slide JSON for presentations"),
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Secure: Return PPT + DOCX items for the authenticated user.
     We now use the bridged local User (integer id).
+
+    Newest first, `limit` items per page across both types; pass the returned
+    `next_cursor` to get the next page (null on the last page). Deck `content`
+    is left out unless include_content=true; summaries are stored columns.
     """
 
     user_id = current_user.id  # integer local id
+    after = _decode_cursor(cursor) if cursor else None
 
-    presentations = (
-        db.query(models.Presentation)
-        .filter(models.Presentation.owner_id == user_id)
-        .order_by(models.Presentation.created_at.desc())
-        .all()
-    )
+    presentations = []
+    if type in (None, "pptx"):
+        P = models.Presentation
+        presentations = (
+            await db.execute(
+                select(P.presentation_id, P.topic, P.created_at, P.summary)
+                .where(P.owner_id == user_id, _after_cursor(P.created_at, P.presentation_id, _KIND_PRESENTATION, after))
+                .order_by(P.created_at.desc(), P.presentation_id.desc())
+                .limit(limit + 1)
+            )
+        ).all()
+
+    projects = []
+    if type in (None, "docx"):
+        D = models.Project
+        projects = (
+            await db.execute(
+                select(D.id, D.title, D.doc_type, D.created_at, D.summary)
+                .where(D.owner_id == user_id, _after_cursor(D.created_at, D.id, _KIND_PROJECT, after))
+                .order_by(D.created_at.desc(), D.id.desc())
+                .limit(limit + 1)
+            )
+        ).all()
 
-    projects = (
-        db.query(models.Project)
-        .filter(models.Project.owner_id == user_id)
-        .order_by(models.Project.created_at.desc())
-        .all()
+    # merge both (already sorted) streams and cut the page
+    merged = sorted(
+        [(p.created_at, _KIND_PRESENTATION, p.presentation_id, p) for p in presentations]
+        + [(pr.created_at, _KIND_PROJECT, pr.id, pr) for pr in projects],
+        key=lambda item: item[:3],
+        reverse=True,
     )
+    page = merged[:limit]
+    next_cursor = _encode_cursor(*page[-1][:3]) if len(merged) > limit else None
 
-    return {
-        "presentations": [
-            {
-                "id": p.presentation_id,
-                "title": p.topic,
-                "summary": _make_summary_from_presentation(p),
+    decks = {}
+    if include_content:
+        # one query for the slides of every deck on this page
+        decks = await slides.load_decks(
+            db, [row.presentation_id for _, kind, _, row in page if kind == _KIND_PRESENTATION]
+        )
+
+    out_presentations = []
+    out_projects = []
+    for _, kind, _, row in page:
+        if kind == _KIND_PRESENTATION:
+            item = {
+                "id": row.presentation_id,
+                "title": row.topic,
+                "summary": row.summary or f"Presentation #{row.presentation_id}",
                 "type": "pptx",
-                "created_at": p.created_at,
-                "download_endpoint": f"/api/v1/presentations/{p.presentation_id}/download",
-                "content": p.content,
+                "created_at": row.created_at,
+                "download_endpoint": f"/api/v1/presentations/{row.presentation_id}/download",
             }
-            for p in presentations
-        ],
-        "projects": [
-            {
-                "id": pr.id,
-                "title": pr.title,
-                "summary": (pr.title or "")[:280],
-                "type": (pr.doc_type or "").lower(),
-                "created_at": pr.created_at,
-                "download_endpoint": f"/api/v1/documents/{pr.id}/export",
-            }
-            for pr in projects
-        ],
+            if include_content:
+                item["content"] = decks[row.presentation_id]
+            out_presentations.append(item)
+        else:
+            out_projects.append(
+                {
+                    "id": row.id,
+                    "title": row.title,
+                    "summary": row.summary or "",
+                    "type": (row.doc_type or "").lower(),
+                    "created_at": row.created_at,
+                    "download_endpoint": f"/api/v1/documents/{row.id}/export",
+                }
+            )
+
+    return {
+        "presentations": out_presentations,
+        "projects": out_projects,
+        "next_cursor": next_cursor,
     }
+
+
 @router.get("/debug")
-def debug_dashboard(
+async def debug_dashboard(
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     user_id = current_user.id
-    ppt_count = db.query(models.Presentation).filter(models.Presentation.owner_id == user_id).count()
-    doc_count = db.query(models.Project).filter(models.Project.owner_id == user_id).count()
+    counters = await db.get(models.UserCounter, user_id)
 
     return {
         "user_id": user_id,
         "email": current_user.email,
-        "ppt_count": ppt_count,
-        "doc_count": doc_count,
+        "ppt_count": counters.presentations if counters else 0,
+        "doc_count": counters.projects if counters else 0,
     }
@@ -1,10 +1,12 @@
-from typing import List, Dict
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from typing import List, Dict, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
-from core.dbutils import get_db
+from core.dbutils import get_async_db
 from .auth_bridge import get_current_user
 
 from models import models, schemas, enums
@@ -12,7 +14,9 @@ from services.content_generator import (
     generate_word_sections_with_gemini,
     refine_word_section_with_gemini,
 )
-from services.docx_generator import build_docx_file
+from services.docx_export import iter_project_docx
+from services import scheduler, idempotency, section_history, section_text
+from services.circuit_breaker import CircuitOpenError
 
 logger = logging.getLogger(__name__)
 
@@ -21,16 +25,21 @@ router = APIRouter(tags=["Documents"])
 
 
 @router.post("/", response_model=schemas.ProjectOut)
-def create_word_project(
+async def create_word_project(
     project_in: schemas.ProjectCreate,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None),
 ):
     """
     Create a new Word (.docx) project and generate initial content.
 
     NOTE: we return a plain JSON-friendly dict (not raw ORM object) so the frontend
     always receives 'sections' as a flat list with page_number / order_index.
+
+    Honours an `Idempotency-Key` header: a retry with the same key waits for /
+    replays the first call instead of generating a second document.
     """
     if project_in.doc_type != enums.DocumentType.DOCX:
         raise HTTPException(
@@ -38,293 +47,407 @@ def create_word_project(
             detail="doc_type must be 'docx' for this endpoint",
         )
 
-    # ---- Create project row ----
-    project = models.Project(
-        owner_id=current_user.id,
-        title=project_in.title,
-        topic=project_in.topic,
-        doc_type=project_in.doc_type,
-        num_pages=project_in.num_pages,
-    )
-    db.add(project)
-    db.flush()  # assign project.id for FK use
-
-    # helper to build response later
-    def build_response_dict(proj_id: int):
-        # query sections for this project (ordered)
-        secs = (
-            db.query(models.Section)
-            .filter(models.Section.project_id == proj_id)
-            .order_by(
-                models.Section.page_number,
-                models.Section.section_index,
-                models.Section.order_index,
-            )
-            .all()
-        )
+    replay = await idempotency.begin(current_user.id, idempotency_key, "POST /documents", project_in)
+    if replay is not None:
+        response.headers["Idempotent-Replayed"] = "true"
+        return replay
 
-        sections_list = []
-        for s in secs:
-            sections_list.append(
-                {
-                    "id": s.id,
-                    # ProjectOut / frontend expects 'title' for each section
-                    "title": s.title,
-                    # keep 'heading' as alias for backward compatibility if needed
-                    "heading": s.title,
-                    "content": s.content or "",
-                    "page_number": s.page_number or 1,
-                    "order_index": s.order_index or 0,
-                }
-            )
+    try:
+        result = await _create_word_project(project_in, db, current_user)
+    except BaseException:
+        # also on cancellation (client gone), so a retry doesn't wait on a dead marker
+        await idempotency.abandon(current_user.id, idempotency_key)
+        raise
+    await idempotency.complete(current_user.id, idempotency_key, result)
+    return result
 
-        return {
-            "id": proj_id,
-            "title": project.title,
-            "topic": project.topic,
-            # include doc_type field (matches schemas.ProjectOut)
-            "doc_type": project.doc_type,
-            "num_pages": project.num_pages or 1,
-            "sections": sections_list,
-            # frontend expects a download endpoint; use full API path
-            "download_url": f"/api/v1/documents/{proj_id}/export",
-        }
 
-    try:
-        # 1️⃣ NEW PAGE-BASED MODE (pages provided)
-        if project_in.pages and project_in.num_pages:
-            flat_headings: List[str] = []
-            for page_cfg in sorted(project_in.pages, key=lambda p: p.page_number):
-                for title in page_cfg.sections:
-                    flat_headings.append(title)
-
-            generated_sections = generate_word_sections_with_gemini(
+async def _create_word_project(
+    project_in: schemas.ProjectCreate,
+    db: AsyncSession,
+    current_user: models.User,
+) -> dict:
+    # full-document generation is bulk work: every model call queues in the bulk
+    # lane, so single-section refines from other users slip in between them
+    with scheduler.job(scheduler.BULK, current_user.id):
+        try:
+            # all Gemini calls happen before anything touches the DB, so no write
+            # transaction is held open while the model is generating
+            section_rows = await run_in_threadpool(_generate_sections, project_in)
+
+            # ---- Create project row + sections ----
+            project = models.Project(
+                owner_id=current_user.id,
+                title=project_in.title,
                 topic=project_in.topic,
-                section_headings=flat_headings,
+                doc_type=project_in.doc_type,
+                num_pages=project_in.num_pages,
             )
+            db.add(project)
+            await db.flush()
+
+            # all sections in one multi-row INSERT; RETURNING hands back exactly the
+            # columns the response needs, so nothing is paired up by position
+            inserted = (
+                await db.execute(
+                    insert(models.Section).returning(
+                        models.Section.id,
+                        models.Section.title,
+                        models.Section.content,
+                        models.Section.page_number,
+                        models.Section.section_index,
+                        models.Section.order_index,
+                    ),
+                    [
+                        {"page_number": None, "section_index": None, **row, "project_id": project.id, "version": 1}
+                        for row in section_rows
+                    ],
+                )
+            ).mappings().all()
+            # generated text is version 1 of the section history
+            await section_history.add_initial_versions(db, [(s["id"], s["content"]) for s in inserted])
+
+            await db.commit()
+            # response from the inserted rows: no re-read
+            return build_response_dict(project, inserted)
 
-            content_by_heading: Dict[str, str] = {
-                s.get("heading", s.get("title")): s.get("content", "") for s in generated_sections
+        except Exception as e:
+            await db.rollback()
+            logger.exception("Failed creating project: %s", e)
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+def _section_sort_key(section) -> tuple:
+    # same order as ORDER BY page_number, section_index, order_index (NULLs first)
+    return tuple(
+        (section[key] is not None, section[key] or 0)
+        for key in ("page_number", "section_index", "order_index")
+    )
+
+
+def build_response_dict(project: models.Project, sections) -> dict:
+    """ProjectOut payload from the project and its section rows (mappings with id/title/content/...)."""
+    sections_list = []
+    for s in sorted(sections, key=_section_sort_key):
+        sections_list.append(
+            {
+                "id": s["id"],
+                # ProjectOut / frontend expects 'title' for each section
+                "title": s["title"],
+                # keep 'heading' as alias for backward compatibility if needed
+                "heading": s["title"],
+                "content": s["content"] or "",
+                "page_number": s["page_number"] or 1,
+                "order_index": s["order_index"] or 0,
             }
+        )
 
-            global_order_index = 1
-            for page_cfg in sorted(project_in.pages, key=lambda p: p.page_number):
-                page_number = page_cfg.page_number
-                # keep up to 3 per page or whatever your UI expects
-                section_titles = page_cfg.sections[:3]
-
-                for idx, title in enumerate(section_titles, start=1):
-                    content = content_by_heading.get(title, "") or ""
-
-                    if not content.strip():
-                        content = refine_word_section_with_gemini(
-                            topic=project_in.topic,
-                            heading=title,
-                            current_content="",
-                            instruction="Write a clear, professional section for this heading.",
-                        )
-
-                    section = models.Section(
-                        project_id=project.id,
-                        title=title,
-                        order_index=global_order_index,
-                        page_number=page_number,
-                        section_index=idx,
-                        content=content,
-                        history=[
-                            {
-                                "version": 1,
-                                "content": content,
-                                "prompt": "initial generation",
-                            }
-                        ],
-                    )
-                    db.add(section)
-                    global_order_index += 1
+    return {
+        "id": project.id,
+        "title": project.title,
+        "topic": project.topic,
+        # include doc_type field (matches schemas.ProjectOut)
+        "doc_type": project.doc_type,
+        "num_pages": project.num_pages or 1,
+        "sections": sections_list,
+        # frontend expects a download endpoint; use full API path
+        "download_url": f"/api/v1/documents/{project.id}/export",
+    }
 
-            db.commit()
-            db.refresh(project)
-            return build_response_dict(project.id)
 
-        # 2️⃣ OLD FLAT SECTION MODE
-        sorted_sections = sorted(project_in.sections, key=lambda s: s.order_index)
-        headings = [s.title for s in sorted_sections]
+def _generate_sections(project_in: schemas.ProjectCreate) -> List[dict]:
+    """
+    Run the (blocking) Gemini generation for a new project.
+    Returns kwargs for models.Section rows, in insert order.
+    """
+    rows: List[dict] = []
+
+    # 1️⃣ NEW PAGE-BASED MODE (pages provided)
+    if project_in.pages and project_in.num_pages:
+        flat_headings: List[str] = []
+        for page_cfg in sorted(project_in.pages, key=lambda p: p.page_number):
+            for title in page_cfg.sections:
+                flat_headings.append(title)
 
         generated_sections = generate_word_sections_with_gemini(
             topic=project_in.topic,
-            section_headings=headings,
+            section_headings=flat_headings,
         )
 
-        content_by_heading = {s.get("heading", s.get("title")): s.get("content", "") for s in generated_sections}
+        content_by_heading: Dict[str, str] = {
+            s.get("heading", s.get("title")): s.get("content", "") for s in generated_sections
+        }
 
-        sections_db: List[models.Section] = []
-        for section_in in sorted_sections:
-            content = content_by_heading.get(section_in.title, "") or ""
+        global_order_index = 1
+        for page_cfg in sorted(project_in.pages, key=lambda p: p.page_number):
+            page_number = page_cfg.page_number
+            # keep up to 3 per page or whatever your UI expects
+            section_titles = page_cfg.sections[:3]
+
+            for idx, title in enumerate(section_titles, start=1):
+                content = content_by_heading.get(title, "") or ""
+
+                if not content.strip():
+                    content = refine_word_section_with_gemini(
+                        topic=project_in.topic,
+                        heading=title,
+                        current_content="",
+                        instruction="Write a clear, professional section for this heading.",
+                    )
 
-            if not content.strip():
-                content = refine_word_section_with_gemini(
-                    topic=project_in.topic,
-                    heading=section_in.title,
-                    current_content="",
-                    instruction="Write a clear, professional section for this heading.",
+                rows.append(
+                    {
+                        "title": title,
+                        "order_index": global_order_index,
+                        "page_number": page_number,
+                        "section_index": idx,
+                        "content": content,
+                        **section_text.normalise(project_in.title, title, content),
+                    }
                 )
+                global_order_index += 1
+        return rows
 
-            section = models.Section(
-                project_id=project.id,
-                title=section_in.title,
-                order_index=section_in.order_index,
-                content=content,
-                # default page_number/section_index left as null or 1
-            )
-            db.add(section)
-            sections_db.append(section)
+    # 2️⃣ OLD FLAT SECTION MODE
+    sorted_sections = sorted(project_in.sections, key=lambda s: s.order_index)
+    headings = [s.title for s in sorted_sections]
 
-        db.commit()
-        db.refresh(project)
+    generated_sections = generate_word_sections_with_gemini(
+        topic=project_in.topic,
+        section_headings=headings,
+    )
 
-        return build_response_dict(project.id)
+    content_by_heading = {s.get("heading", s.get("title")): s.get("content", "") for s in generated_sections}
 
-    except Exception as e:
-        db.rollback()
-        logger.exception("Failed creating project: %s", e)
-        raise HTTPException(status_code=500, detail=str(e))
+    for section_in in sorted_sections:
+        content = content_by_heading.get(section_in.title, "") or ""
+
+        if not content.strip():
+            content = refine_word_section_with_gemini(
+                topic=project_in.topic,
+                heading=section_in.title,
+                current_content="",
+                instruction="Write a clear, professional section for this heading.",
+            )
+
+        rows.append(
+            {
+                "title": section_in.title,
+                "order_index": section_in.order_index,
+                "content": content,
+                **section_text.normalise(project_in.title, section_in.title, content),
+                # default page_number/section_index left as null or 1
+            }
+        )
+    return rows
 
 
 @router.get("/{project_id}", response_model=schemas.ProjectOut)
-def get_word_project(
+async def get_word_project(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(get_current_user),
 ):
     """
     Fetch a single Word project with all its sections.
     We return a JSON-friendly dict (same shape as create route).
     """
-    project = (
-        db.query(models.Project)
-        .filter(
+    project = await db.scalar(
+        select(models.Project).where(
             models.Project.id == project_id,
             models.Project.owner_id == current_user.id,
         )
-        .first()
     )
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # Build same response shape as create endpoint
+    # Build same response shape as create endpoint (only the columns it needs)
     secs = (
-        db.query(models.Section)
-        .filter(models.Section.project_id == project.id)
-        .order_by(
-            models.Section.page_number,
-            models.Section.section_index,
-            models.Section.order_index,
+        await db.execute(
+            select(
+                models.Section.id,
+                models.Section.title,
+                models.Section.content,
+                models.Section.page_number,
+                models.Section.section_index,
+                models.Section.order_index,
+            ).where(models.Section.project_id == project.id)
         )
-        .all()
-    )
+    ).mappings().all()
+    return build_response_dict(project, secs)
 
-    sections_list = []
-    for s in secs:
-        sections_list.append(
-            {
-                "id": s.id,
-                # ProjectOut expects 'title'
-                "title": s.title,
-                # keep heading as alias for backward compatibility
-                "heading": s.title,
-                "content": s.content or "",
-                "page_number": s.page_number or 1,
-                "order_index": s.order_index or 0,
-            }
+
+@router.post("/{project_id}/sections/{section_id}/refine", response_model=schemas.SectionOut)
+async def refine_section(
+    project_id: int,
+    section_id: int,
+    refine_in: schemas.SectionRefineRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Rewrite a single section with the user's prompt and record it in the section history.
+    Runs in the interactive lane, so it never queues behind full-document generations.
+    """
+    section, topic, doc_title = await _get_section(db, project_id, section_id, current_user.id)
+
+    try:
+        with scheduler.job(scheduler.INTERACTIVE, current_user.id):
+            refined = await run_in_threadpool(
+                refine_word_section_with_gemini,
+                topic=topic,
+                heading=section.title,
+                current_content=section.content or "",
+                instruction=refine_in.prompt,
+                fail_fast=True,
+            )
+    except CircuitOpenError as e:
+        # open, or half-open with the probe taken: refine would just echo the current content back
+        raise HTTPException(
+            status_code=503,
+            detail="AI provider is temporarily unavailable. Please retry shortly.",
+            headers={"Retry-After": str(int(e.retry_after))},
         )
 
+    try:
+        await section_history.record(db, section, refined, refine_in.prompt)
+    except section_history.VersionConflict:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Section was changed by another edit")
+    section_text.store(section, doc_title)
+    await db.commit()
+    await db.refresh(section)
+    return section
+
+
+async def _get_section(db: AsyncSession, project_id: int, section_id: int, owner_id: int):
+    """(section, project topic, project title) for a section of one of the user's projects, else 404."""
+    found = (
+        await db.execute(
+            select(models.Section, models.Project.topic, models.Project.title)
+            .join(models.Project, models.Section.project_id == models.Project.id)
+            .where(
+                models.Section.id == section_id,
+                models.Section.project_id == project_id,
+                models.Project.owner_id == owner_id,
+            )
+        )
+    ).first()
+    if not found:
+        raise HTTPException(status_code=404, detail="Section not found")
+    return found
+
+
+# -----------------------
+# Section history (services/section_history.py)
+# -----------------------
+@router.get("/{project_id}/sections/{section_id}/history")
+async def get_section_history(
+    project_id: int,
+    section_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Versions of a section (number, prompt, time) without their text."""
+    section, _, _ = await _get_section(db, project_id, section_id, current_user.id)
     return {
-        "id": project.id,
-        "title": project.title,
-        "topic": project.topic,
-        "doc_type": project.doc_type,
-        "num_pages": project.num_pages or 1,
-        "sections": sections_list,
-        "download_url": f"/api/v1/documents/{project.id}/export",
+        "section_id": section.id,
+        "current_version": section.version,
+        "versions": await section_history.list_versions(db, section.id),
+    }
+
+
+@router.get("/{project_id}/sections/{section_id}/history/{version}")
+async def get_section_version(
+    project_id: int,
+    section_id: int,
+    version: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Text of one version, rebuilt from the nearest snapshot."""
+    section, _, _ = await _get_section(db, project_id, section_id, current_user.id)
+    content = await section_history.load_text(db, section.id, version)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Version not found")
+    return {"section_id": section.id, "version": version, "content": content}
+
+
+@router.get("/{project_id}/sections/{section_id}/diff")
+async def diff_section_versions(
+    project_id: int,
+    section_id: int,
+    from_version: Optional[int] = Query(None, alias="from"),
+    to_version: Optional[int] = Query(None, alias="to"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Unified diff between two versions (default: previous -> current)."""
+    section, _, _ = await _get_section(db, project_id, section_id, current_user.id)
+    if not section.version:
+        raise HTTPException(status_code=404, detail="Section has no history")
+    to_version = to_version or section.version
+    from_version = from_version or max(to_version - 1, 1)
+
+    old = await section_history.load_text(db, section.id, from_version)
+    new = await section_history.load_text(db, section.id, to_version)
+    if old is None or new is None:
+        raise HTTPException(status_code=404, detail="Version not found")
+    return {
+        "section_id": section.id,
+        "from": from_version,
+        "to": to_version,
+        "diff": section_history.unified_diff(old, new, f"v{from_version}", f"v{to_version}"),
     }
 
 
+@router.post("/{project_id}/sections/{section_id}/undo", response_model=schemas.SectionOut)
+async def undo_section(
+    project_id: int,
+    section_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Revert the latest refine: restores the previous version and drops the latest one."""
+    section, _, doc_title = await _get_section(db, project_id, section_id, current_user.id)
+    try:
+        undone = await section_history.undo(db, section)
+    except section_history.VersionConflict:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Section was changed by another edit")
+    if undone is None:
+        raise HTTPException(status_code=409, detail="Nothing to undo")
+    section_text.store(section, doc_title)
+    await db.commit()
+    await db.refresh(section)
+    return section
+
+
 # -----------------------
 # Export endpoint (DOCX)
 # -----------------------
 @router.get("/{project_id}/export")
-def export_word_project(
+async def export_word_project(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(get_current_user),
 ):
     """
-    Build a .docx from DB sections and return as FileResponse.
-    This reads sections from DB (so it always uses persisted content, not request payload).
+    Stream a .docx built from the DB sections (so it always uses persisted content, not request payload).
+    The zip is produced while the sections are read (services/docx_export.py): memory stays flat
+    and the download starts before the whole document is rendered.
     """
     # fetch project & permission check
-    project = (
-        db.query(models.Project)
-        .filter(models.Project.id == project_id, models.Project.owner_id == current_user.id)
-        .first()
+    project = await db.scalar(
+        select(models.Project).where(
+            models.Project.id == project_id, models.Project.owner_id == current_user.id
+        )
     )
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # fetch sections (ordered)
-    secs = (
-        db.query(models.Section)
-        .filter(models.Section.project_id == project.id)
-        .order_by(
-            models.Section.page_number,
-            models.Section.section_index,
-            models.Section.order_index,
-        )
-        .all()
+    return StreamingResponse(
+        iter_project_docx(project.id, project.title, project.num_pages, current_user.id),
+        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        headers={"Content-Disposition": f'attachment; filename="project_{project.id}.docx"'},
     )
-
-    # convert to simple list of dicts expected by docx helper
-    sections = []
-    for s in secs:
-        sections.append({
-            "heading": s.title,
-            "content": s.content or "",
-            # keep numeric page info if present; docx helper will distribute if missing
-            "page_number": s.page_number or None,
-            "order_index": s.order_index or 0,
-        })
-
-    # import helpers from docx generator
-    try:
-        from services.docx_generator import distribute_sections_across_pages, build_docx_file
-    except Exception:
-        logger.exception("Failed importing docx generator helpers")
-        raise HTTPException(status_code=500, detail="Server misconfiguration")
-
-    # Ensure num_pages has a reasonable fallback
-    num_pages = project.num_pages if project.num_pages and project.num_pages > 0 else 1
-    pages = distribute_sections_across_pages(sections, num_pages)
-
-    # debug: log per-page content lengths
-    try:
-        page_debug = {p: [len(s.get("content", "")) for s in secs] for p, secs in pages.items()}
-        logger.debug("Export pages for project %s: %s", project.id, page_debug)
-    except Exception:
-        pass
-
-    try:
-        file_path = build_docx_file(project.id, project.title, pages)
-    except Exception as e:
-        logger.exception("Failed building docx file: %s", e)
-        raise HTTPException(status_code=500, detail="Failed generating DOCX")
-
-    # Return the file to the user
-    try:
-        return FileResponse(
-            path=str(file_path),
-            filename=file_path.name,
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        )
-    except Exception as e:
-        logger.exception("Failed returning FileResponse: %s", e)
-        raise HTTPException(status_code=500, detail="Failed returning DOCX file")
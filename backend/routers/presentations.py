@@ -1,15 +1,21 @@
-from typing import Optional, List
+from typing import Any, Dict, List, Literal, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
-from core.dbutils import get_db
+from core.dbutils import get_async_db
 from models.models import Presentation, User
 from models.schemas import PresentationCreate, PresentationOut, ConfigurationUpdate
 from services.content_generator import generate_content_with_gemini
-from services.pptx_generator import build_pptx
+from services.pptx_cache import iter_file, key_for, pptx_cache
+from services.pptx_decks import deck_store
+from services.prerender import prerenderer
+from services import scheduler, idempotency, slides, deck_patch
+from services.circuit_breaker import CircuitOpenError
 
 # ✅ your real auth dependency (same style as documents.py)
 from .auth_bridge import get_current_user
@@ -28,6 +34,30 @@ class SlideUpdate(BaseModel):
     left: Optional[str] = None
     right: Optional[str] = None
     image_url: Optional[str] = None
+    columns: Optional[List[str]] = None
+    rows: Optional[List[List[str]]] = None
+
+
+# ---------- SlideMove schema (reorder one slide) ----------
+class SlideMove(BaseModel):
+    to_index: int
+
+
+# ---------- PATCH schemas (batch edits, see services/deck_patch.py) ----------
+class SlideOp(BaseModel):
+    op: Literal["update", "insert", "delete", "move"]
+    index: int
+    fields: Optional[Dict[str, Any]] = None  # update
+    slide: Optional[Dict[str, Any]] = None   # insert
+    to_index: Optional[int] = None           # move
+
+
+class PresentationPatch(BaseModel):
+    # version the edits were made against (or send an If-Match header)
+    version: Optional[int] = None
+    # either slide ops or an RFC 6902 patch
+    ops: Optional[List[SlideOp]] = None
+    patch: Optional[List[Dict[str, Any]]] = None
 
 
 # ---------- PresentationUpdate schema (for editing whole deck) ----------
@@ -134,10 +164,12 @@ def _sanitize_generated_content(content: list | None, original_prompt: str | Non
 
 
 @router.post("/", response_model=PresentationOut, summary="Create a new presentation")
-def create_presentation(
+async def create_presentation(
     presentation: PresentationCreate,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None),
 ):
     """
     Create a new PPT presentation for the current user.
@@ -145,15 +177,79 @@ def create_presentation(
     If `custom_content` is provided from the frontend, we trust that content
     (e.g. user-edited slides) and store it directly. Otherwise we call Gemini.
     This endpoint sanitizes model output to avoid storing the original prompt text inside slides.
+
+    Honours an `Idempotency-Key` header: a retry with the same key waits for /
+    replays the first call instead of generating a second deck.
     """
+    replay = await idempotency.begin(current_user.id, idempotency_key, "POST /presentations", presentation)
+    if replay is not None:
+        response.headers["Idempotent-Replayed"] = "true"
+        return replay
+
+    try:
+        result = await _create_presentation(presentation, db, current_user)
+        result = PresentationOut.model_validate(result).model_dump(mode="json")
+    except BaseException:
+        # also on cancellation (client gone), so a retry doesn't wait on a dead marker
+        await idempotency.abandon(current_user.id, idempotency_key)
+        raise
+    await idempotency.complete(current_user.id, idempotency_key, result)
+    return result
+
+
+async def _presentation_out(db: AsyncSession, presentation: Presentation) -> dict:
+    """PresentationOut payload: the deck is assembled from the slides table (one query)."""
+    return {
+        "presentation_id": presentation.presentation_id,
+        "topic": presentation.topic,
+        "content": await slides.load_deck(db, presentation.presentation_id),
+        "configuration": presentation.configuration,
+        "version": presentation.version,
+    }
+
+
+async def _edited_out(db: AsyncSession, presentation: Presentation) -> dict:
+    """_presentation_out of a version just written; queues its background render (services/prerender.py)."""
+    out = await _presentation_out(db, presentation)
+    prerenderer.schedule(
+        presentation.presentation_id, presentation.owner_id, out["version"], out["content"], out["configuration"] or {}
+    )
+    return out
+
+
+async def _get_owned(db: AsyncSession, presentation_id: int, owner_id: int) -> Presentation:
+    presentation = await db.scalar(
+        select(Presentation).where(
+            Presentation.presentation_id == presentation_id,
+            Presentation.owner_id == owner_id,
+        )
+    )
+    if not presentation:
+        raise HTTPException(status_code=404, detail="Presentation not found")
+    return presentation
+
+
+async def _create_presentation(presentation: PresentationCreate, db: AsyncSession, current_user: User) -> dict:
     if presentation.custom_content:
         raw_content = [slide.dict() for slide in presentation.custom_content]
     else:
         # If Gemini fails (429 etc.), generate_content_with_gemini must raise and be handled by caller
-        raw_content = generate_content_with_gemini(
-            presentation.topic,
-            presentation.num_slides,
-        )
+        # full-deck generation is bulk work: it yields to interactive edits
+        with scheduler.job(scheduler.BULK, current_user.id):
+            try:
+                # blocking SDK call: keep it off the event loop
+                raw_content = await run_in_threadpool(
+                    generate_content_with_gemini,
+                    presentation.topic,
+                    presentation.num_slides,
+                )
+            except CircuitOpenError as e:
+                # Gemini is down: fail in milliseconds instead of waiting for the SDK
+                raise HTTPException(
+                    status_code=503,
+                    detail="AI provider is temporarily unavailable. Please retry shortly.",
+                    headers={"Retry-After": str(int(e.retry_after))},
+                )
 
     # Sanitize the generated content to remove prompt echoes and obvious duplicates
     try:
@@ -164,13 +260,13 @@ def create_presentation(
 
     db_presentation = Presentation(
         topic=presentation.topic,
-        content=cleaned_content,
         owner_id=current_user.id,
     )
     db.add(db_presentation)
-    db.commit()
-    db.refresh(db_presentation)
-    return db_presentation
+    await db.flush()
+    await slides.replace_deck(db, db_presentation, cleaned_content)
+    await db.commit()
+    return await _edited_out(db, db_presentation)
 
 
 @router.put(
@@ -178,25 +274,17 @@ def create_presentation(
     response_model=PresentationOut,
     summary="Overwrite presentation topic/content/configuration",
 )
-def update_presentation(
+async def update_presentation(
     presentation_id: int,
     update: PresentationUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Overwrite a presentation's topic/content/configuration for the current user.
     """
-    presentation = (
-        db.query(Presentation)
-        .filter(
-            Presentation.presentation_id == presentation_id,
-            Presentation.owner_id == current_user.id,
-        )
-        .first()
-    )
-    if not presentation:
-        raise HTTPException(status_code=404, detail="Presentation not found")
+    presentation = await _get_owned(db, presentation_id, current_user.id)
+    await slides.bump_version(db, presentation)
 
     data = update.dict(exclude_unset=True)
 
@@ -205,14 +293,16 @@ def update_presentation(
 
     if "content" in data and data["content"] is not None:
         # frontend sends list[dict] with fields: layout, title, bullets, etc.
-        presentation.content = data["content"]
+        await slides.replace_deck(db, presentation, data["content"])
+    elif "topic" in data and data["topic"] is not None:
+        # summary falls back to the topic
+        await slides.refresh_summary(db, presentation)
 
     if "configuration" in data and data["configuration"] is not None:
         presentation.configuration = data["configuration"]
 
-    db.commit()
-    db.refresh(presentation)
-    return presentation
+    await db.commit()
+    return await _edited_out(db, presentation)
 
 
 @router.post(
@@ -220,30 +310,21 @@ def update_presentation(
     response_model=PresentationOut,
     summary="Configure a presentation",
 )
-def configure_presentation(
+async def configure_presentation(
     presentation_id: int,
     config: ConfigurationUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Update configuration (theme, etc.) for a PPT owned by the current user.
     """
-    presentation = (
-        db.query(Presentation)
-        .filter(
-            Presentation.presentation_id == presentation_id,
-            Presentation.owner_id == current_user.id,
-        )
-        .first()
-    )
-    if not presentation:
-        raise HTTPException(status_code=404, detail="Presentation not found")
+    presentation = await _get_owned(db, presentation_id, current_user.id)
+    await slides.bump_version(db, presentation)
 
     presentation.configuration = config.dict()
-    db.commit()
-    db.refresh(presentation)
-    return presentation
+    await db.commit()
+    return await _edited_out(db, presentation)
 
 
 @router.get(
@@ -251,25 +332,16 @@ def configure_presentation(
     response_model=PresentationOut,
     summary="Get a presentation",
 )
-def get_presentation(
+async def get_presentation(
     presentation_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Get a single PPT for the current user.
     """
-    presentation = (
-        db.query(Presentation)
-        .filter(
-            Presentation.presentation_id == presentation_id,
-            Presentation.owner_id == current_user.id,
-        )
-        .first()
-    )
-    if not presentation:
-        raise HTTPException(status_code=404, detail="Presentation not found")
-    return presentation
+    presentation = await _get_owned(db, presentation_id, current_user.id)
+    return await _presentation_out(db, presentation)
 
 
 @router.put(
@@ -277,53 +349,135 @@ def get_presentation(
     response_model=PresentationOut,
     summary="Update a single slide in the presentation",
 )
-def update_slide(
+async def update_slide(
     presentation_id: int,
     slide_index: int,
     slide_update: SlideUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Edit one slide (title/bullets/text/image) of a PPT owned by the current user.
+    Only that slide's row is written.
     """
-    presentation = (
-        db.query(Presentation)
-        .filter(
-            Presentation.presentation_id == presentation_id,
-            Presentation.owner_id == current_user.id,
-        )
-        .first()
-    )
-    if not presentation:
-        raise HTTPException(status_code=404, detail="Presentation not found")
-
-    slides = presentation.content or []
-    if slide_index < 0 or slide_index >= len(slides):
-        raise HTTPException(status_code=404, detail="Slide index out of range")
+    presentation = await _get_owned(db, presentation_id, current_user.id)
+    await slides.bump_version(db, presentation)
 
-    slide = slides[slide_index]
     update_data = slide_update.dict(exclude_unset=True)
 
     # Only overwrite fields that are provided in the request
-    for key, value in update_data.items():
-        if value is not None:
-            slide[key] = value
-
-    slides[slide_index] = slide
-    presentation.content = slides
-    db.commit()
-    db.refresh(presentation)
-    return presentation
+    fields = {key: value for key, value in update_data.items() if value is not None}
+    if await slides.update_slide_fields(db, presentation, slide_index, fields) is None:
+        raise HTTPException(status_code=404, detail="Slide index out of range")
+
+    await db.commit()
+    return await _edited_out(db, presentation)
+
+
+@router.post(
+    "/{presentation_id}/slides/{slide_index}/move",
+    response_model=PresentationOut,
+    summary="Move a slide to another position",
+)
+async def move_slide(
+    presentation_id: int,
+    slide_index: int,
+    move: SlideMove,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Reorder: the slide at `slide_index` ends up at `to_index`.
+    Only the moved slide's position is written.
+    """
+    presentation = await _get_owned(db, presentation_id, current_user.id)
+    await slides.bump_version(db, presentation)
+
+    if move.to_index < 0 or not await slides.move_slide(db, presentation, slide_index, move.to_index):
+        raise HTTPException(status_code=404, detail="Slide index out of range")
+
+    await db.commit()
+    return await _edited_out(db, presentation)
+
+
+@router.patch(
+    "/{presentation_id}",
+    summary="Apply a batch of edits (JSON Patch or slide ops) atomically",
+)
+async def patch_presentation(
+    presentation_id: int,
+    body: Union[List[Dict[str, Any]], PresentationPatch] = Body(...),
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Several edits in one round trip and one transaction.
+
+    Body is either an RFC 6902 patch (a JSON array, version in `If-Match`) or
+    {"version": n, "ops": [...]} / {"version": n, "patch": [...]} with slide ops
+    {"op": "update"|"insert"|"delete"|"move", "index": i, "fields"/"slide"/"to_index": ...}.
+
+    All operations apply or none do. If the deck is no longer at `version`
+    the request fails with 409 and the current version. Returns only the new
+    version and the executed patch (diff), not the whole deck. An empty patch
+    changes nothing and returns the current version.
+    """
+    if isinstance(body, list):
+        version, patch = None, body
+    else:
+        version = body.version
+        try:
+            patch = deck_patch.slide_ops_to_patch([op.dict() for op in body.ops or []]) + (body.patch or [])
+        except deck_patch.PatchError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    if version is None and if_match:
+        try:
+            version = int(if_match.strip().removeprefix("W/").strip('"'))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="If-Match must be a presentation version")
+    if version is None:
+        raise HTTPException(status_code=428, detail="Send the presentation version (body or If-Match)")
+
+    presentation = await _get_owned(db, presentation_id, current_user.id)
+    current_version = presentation.version
+    if not patch:
+        # nothing to apply: no new version, nothing to re-render
+        return {"presentation_id": presentation_id, "version": current_version, "diff": []}
+
+    # claim the version first: a concurrent PATCH against the same version gets 409
+    new_version = await slides.bump_version(db, presentation, expected=version)
+    if new_version is None:
+        await db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Presentation was changed by another edit", "version": current_version},
+        )
+
+    try:
+        diff = await deck_patch.apply(db, presentation, patch)
+    except deck_patch.PatchError as e:
+        await db.rollback()
+        raise HTTPException(status_code=422, detail=str(e))
+
+    await db.commit()
+    prerenderer.schedule(
+        presentation_id,
+        presentation.owner_id,
+        new_version,
+        await slides.load_deck(db, presentation_id),
+        presentation.configuration or {},
+    )
+    return {"presentation_id": presentation_id, "version": new_version, "diff": diff}
 
 
 @router.get(
     "/{presentation_id}/download",
     summary="Download the generated PPTX",
 )
-def download_pptx(
+async def download_pptx(
     presentation_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Generate & download the PPTX file for a presentation by its ID.
@@ -334,26 +488,43 @@ def download_pptx(
     """
 
     # Look up by ID only (no owner_id filter)
-    presentation = (
-        db.query(Presentation)
-        .filter(Presentation.presentation_id == presentation_id)
-        .first()
+    presentation = await db.scalar(
+        select(Presentation).where(Presentation.presentation_id == presentation_id)
     )
     if not presentation:
         raise HTTPException(status_code=404, detail="Presentation not found")
 
     # Generate PPTX with current configuration + current content
     config = presentation.configuration or {}
-    pptx_path = build_pptx(
+    content = await slides.load_deck(db, presentation.presentation_id)
+    # streamed from the deck's last build (services/pptx_decks.py) or the output cache
+    pptx = await run_in_threadpool(
+        _render_deck,
         presentation.presentation_id,
-        presentation.content,
+        content,
         config,
+        presentation.owner_id,
     )
-    presentation.pptx_path = pptx_path
-    db.commit()
 
-    return FileResponse(
-        path=pptx_path,
-        filename=f"presentation_{presentation.presentation_id}.pptx",
+    return StreamingResponse(
+        iter_file(pptx),
         media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+        headers={"Content-Disposition": f'attachment; filename="presentation_{presentation.presentation_id}.pptx"'},
     )
+
+
+def _render_deck(presentation_id: int, content: list, config: dict, owner_id: int):
+    # runs in the threadpool: waiting for a render slot must not block the event loop
+    key = key_for(content, config)
+    # built already (output cache, pre-render), or being built right now: wait for that render
+    cached = pptx_cache.open(key) or deck_store.open(presentation_id, key) or deck_store.join(presentation_id, key)
+    if cached is not None:
+        return cached
+    # queued for a pre-render: build it now instead, so it isn't built twice
+    prerenderer.claim(presentation_id, key)
+    # the user is waiting on this download -> interactive render lane
+    with scheduler.render_scheduler.slot(scheduler.INTERACTIVE, owner_id):
+        # only the slides changed since the deck's last build are rendered
+        pptx = deck_store.render(presentation_id, content, config, key)
+    pptx_cache.offer(key, pptx)
+    return pptx
@@ -0,0 +1,137 @@
+# backend/services/circuit_breaker.py
+"""
+Circuit breaker around the Gemini provider.
+
+closed    -> calls go through; N consecutive failures open the circuit
+open      -> calls fail immediately with CircuitOpenError (degraded path)
+half_open -> after the recovery timeout one probe call is let through;
+             success closes the circuit, failure opens it again
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict
+
+from core.config import Config
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the provider while the circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit is open; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def is_open(self) -> bool:
+        return self.state == OPEN
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self._state == CLOSED:
+                return 0.0
+            return max(0.0, self._opened_at + self.recovery_timeout - time.monotonic())
+
+    def reject_if_open(self) -> None:
+        """
+        Raise CircuitOpenError if before_call() would, without claiming the
+        probe: lets a caller fail fast before it queues for a slot.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED or (state == HALF_OPEN and not self._probe_in_flight):
+                return
+            retry_after = max(1.0, self._opened_at + self.recovery_timeout - time.monotonic())
+        raise CircuitOpenError(self.name, retry_after)
+
+    def before_call(self) -> bool:
+        """
+        Raise CircuitOpenError if the call must not reach the provider.
+        Returns True if this call is the half-open probe (pass it to record_failure).
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return False
+            if state == HALF_OPEN and not self._probe_in_flight:
+                # let exactly one probe through
+                self._state = HALF_OPEN
+                self._probe_in_flight = True
+                return True
+            retry_after = max(1.0, self._opened_at + self.recovery_timeout - time.monotonic())
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("%s circuit closed (provider recovered)", self.name)
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self, probe: bool = False) -> None:
+        with self._lock:
+            self._failures += 1
+            if probe:
+                self._probe_in_flight = False
+            elif self._state == HALF_OPEN:
+                # a call admitted before the circuit opened: the probe decides
+                return
+            if probe or self._failures >= self.failure_threshold:
+                # only the transition opens the window: calls that were already
+                # running when it opened must not keep pushing it back
+                if self._state != OPEN:
+                    logger.error(
+                        "%s circuit opened after %d consecutive failures",
+                        self.name, self._failures,
+                    )
+                    self._opened_at = time.monotonic()
+                self._state = OPEN
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            retry_after = 0.0
+            if state != CLOSED:
+                retry_after = max(0.0, self._opened_at + self.recovery_timeout - time.monotonic())
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "retry_after_seconds": round(retry_after, 1),
+            }
+
+    def _current_state(self) -> str:
+        # caller holds self._lock
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            return HALF_OPEN
+        return self._state
+
+
+gemini_breaker = CircuitBreaker(
+    "gemini",
+    failure_threshold=Config.GEMINI_BREAKER_FAILURES,
+    recovery_timeout=Config.GEMINI_BREAKER_RESET_SECONDS,
+)
@@ -8,6 +8,8 @@ import google.generativeai as genai
 
 from core.config import Config
 from models import enums
+from services.scheduler import model_scheduler
+from services.circuit_breaker import CircuitOpenError, gemini_breaker
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)  # adjust as needed
@@ -26,6 +28,32 @@ model = genai.GenerativeModel("gemini-2.0-flash")
 # ---------------------
 # Helpers
 # ---------------------
+def _generate(prompt: str):
+    """
+    Single entry point for Gemini calls.
+    Waits for a model slot in the caller's scheduler lane (see services/scheduler.py),
+    so bulk generations yield to interactive edits between calls.
+
+    Goes through the circuit breaker: while Gemini is down this raises
+    CircuitOpenError immediately instead of waiting for the SDK to time out.
+    The half-open probe is only admitted once a slot is held, so it never
+    sits in the queue while every other call is turned away.
+    """
+    gemini_breaker.reject_if_open()
+    with model_scheduler.slot():
+        probe = gemini_breaker.before_call()
+        try:
+            resp = model.generate_content(
+                prompt,
+                request_options={"timeout": Config.GEMINI_TIMEOUT_SECONDS},
+            )
+        except Exception:
+            gemini_breaker.record_failure(probe)
+            raise
+    gemini_breaker.record_success()
+    return resp
+
+
 def _get_raw_text_from_resp(resp) -> str:
     """
     Try multiple ways to extract textual content from the model response object.
@@ -145,6 +173,39 @@ def _fallback_generate_sections(topic: str, section_headings: List[str], target_
     return out
 
 
+def _table_slide(title: str, columns: Any, rows: Any) -> Optional[Dict[str, Any]]:
+    """
+    Normalize model table output to {"layout": "table", "title", "columns", "rows"}.
+    Rows may be lists of cells or objects keyed by column name; cells become
+    strings and every row gets exactly one cell per column. None if there is no data.
+    """
+    columns = [str(c).strip() for c in columns] if isinstance(columns, list) else []
+    records = [r for r in rows if isinstance(r, (list, dict))] if isinstance(rows, list) else []
+    if not columns and records and isinstance(records[0], dict):
+        columns = [str(k).strip() for k in records[0]]
+
+    normalized_rows = []
+    for record in records:
+        if isinstance(record, dict):
+            cells = [record.get(c, "") for c in columns]
+        else:
+            cells = list(record)
+        cells = ["" if c is None else str(c).strip() for c in cells]
+        normalized_rows.append(cells)
+    if not columns:
+        columns = [""] * max((len(r) for r in normalized_rows), default=0)
+    if not columns or not normalized_rows:
+        return None
+
+    width = len(columns)
+    return {
+        "layout": enums.SlideLayout.table.value,
+        "title": title,
+        "columns": columns,
+        "rows": [(r + [""] * width)[:width] for r in normalized_rows],
+    }
+
+
 # -------------------------------------------------------
 # 1️⃣ PPT CONTENT GENERATION  (with normalization)
 # -------------------------------------------------------
@@ -178,6 +239,7 @@ Content & layout rules:
    - Use "bullet" layout to explain concepts, lists, pros/cons, or step-by-step flows.
    - Use "two_column" layout for comparisons (Before vs After, Pros vs Cons, Concept vs Example, Theory vs Practice, etc.).
    - Use "image" layout when a diagram / workflow / architecture / chart would help.
+   - Use "table" layout for structured data: comparisons across several attributes, specs, timelines, numbers.
 4. Avoid repeating the same sentence or idea across different slides.
 5. For bullet slides:
    - Use between 3 and 6 bullet points.
@@ -189,18 +251,23 @@ Content & layout rules:
 7. For image slides:
    - Focus on writing a good, descriptive CAPTION (10–30 words) for the image.
    - The backend will choose the actual image URL.
-8. Use simple, modern, professional English. No fluff, no marketing buzzwords.
-9. Wherever useful, include:
+8. For table slides:
+   - Give "columns" (2–6 short header strings) and "rows" (a list of rows, each a list with exactly one string per column).
+   - Keep cells short (a number, a name or up to ~8 words). Use at most one or two table slides.
+9. Use simple, modern, professional English. No fluff, no marketing buzzwords.
+10. Wherever useful, include:
    - Real-world examples
    - Mini use-cases
    - Short scenarios or analogies
-10. Do NOT write things like "This slide explains..." or mention "PowerPoint" or "slide" inside the content.
+11. Do NOT write things like "This slide explains..." or mention "PowerPoint" or "slide" inside the content.
 
 Output format:
 Return ONLY a JSON array (no markdown, no backticks, no extra commentary).
+A table slide looks like:
+{{"layout": "table", "title": "...", "columns": ["Feature", "Option A", "Option B"], "rows": [["Cost", "Low", "High"], ["Speed", "Fast", "Slow"]]}}
 """
     try:
-        resp = model.generate_content(prompt)
+        resp = _generate(prompt)
         raw = _get_raw_text_from_resp(resp)
         json_clean = re.sub(r"```json|```", "", raw).strip()
         data = _safe_parse_model_json(json_clean)
@@ -249,6 +316,15 @@ Return ONLY a JSON array (no markdown, no backticks, no extra commentary).
                             "caption": slide.get("caption", slide.get("title", "")),
                         }
                     )
+                elif layout == enums.SlideLayout.table.value:
+                    table = _table_slide(slide.get("title", ""), slide.get("columns"), slide.get("rows"))
+                    if table:
+                        normalized_slides.append(table)
+                    else:
+                        # no usable cells: keep the title rather than an empty table
+                        normalized_slides.append(
+                            {"layout": enums.SlideLayout.title.value, "title": slide.get("title", "")}
+                        )
                 continue
 
             # Fallback: Gemini generic format -> our layouts
@@ -257,6 +333,13 @@ Return ONLY a JSON array (no markdown, no backticks, no extra commentary).
             image = slide.get("image")
             notes = slide.get("notes")
 
+            # List of records → Table slide
+            if isinstance(content, list) and content and all(isinstance(c, dict) for c in content):
+                table = _table_slide(title, slide.get("columns"), content)
+                if table:
+                    normalized_slides.append(table)
+                    continue
+
             # List of bullet-like strings → Bullet slide
             if isinstance(content, list):
                 bullets = [str(b).strip() for b in content if str(b).strip()]
@@ -308,6 +391,10 @@ Return ONLY a JSON array (no markdown, no backticks, no extra commentary).
 
         return normalized_slides
 
+    except CircuitOpenError:
+        # degraded mode: let the router answer fast instead of masking it as a generic failure
+        logger.warning("Gemini circuit open; skipping PPT generation for topic=%s", topic)
+        raise
     except Exception as e:
         logger.exception("Gemini PPT content generation failed: %s", e)
         raise RuntimeError("Gemini content generation failed")
@@ -382,7 +469,7 @@ Do NOT output headings again; return a JSON array of objects like:
 """
 
         logger.debug("Calling Gemini for word sections (topic=%s target=%d)", topic, target_sections)
-        resp = model.generate_content(prompt)
+        resp = _generate(prompt)
         raw_text = _get_raw_text_from_resp(resp)
         logger.debug("Gemini raw response (len=%d): %.3000s", len(raw_text), raw_text)
 
@@ -403,6 +490,9 @@ Do NOT output headings again; return a JSON array of objects like:
             logger.error("Final sections is not a list after parsing attempts; using fallback generator.")
             return _fallback_generate_sections(topic, section_headings, target_sections)
 
+    except CircuitOpenError:
+        logger.warning("Gemini circuit open; using fallback sections for topic=%s", topic)
+        return _fallback_generate_sections(topic, section_headings, target_sections)
     except Exception as e:
         logger.exception("Gemini Word content generation (initial) failed: %s", e)
         return _fallback_generate_sections(topic, section_headings, target_sections)
@@ -461,7 +551,7 @@ Please expand and rewrite this section to be more substantial:
 - Keep the meaning, add examples or practical points.
 - Output plain text only with '\\n' between paragraphs.
 """
-                resp2 = model.generate_content(expand_prompt)
+                resp2 = _generate(expand_prompt)
                 expanded_raw = _get_raw_text_from_resp(resp2)
                 expanded = re.sub(r"```json|```", "", expanded_raw).strip()
                 expanded = expanded.replace("\\n", "\n").strip()
@@ -493,9 +583,12 @@ def refine_word_section_with_gemini(
     heading: str,
     current_content: str,
     instruction: str,
+    fail_fast: bool = False,
 ) -> str:
     """
     Refine a single section; fail-safe: if Gemini fails, return current_content.
+    fail_fast: raise CircuitOpenError instead while the circuit turns calls away
+    (the refine endpoint answers 503 rather than storing the old text again).
     """
     prompt = f"""
 You are revising ONE section of a professional business Word document.
@@ -519,11 +612,16 @@ Rules:
 - Do NOT add the heading, section numbers, or any meta commentary.
 """
     try:
-        resp = model.generate_content(prompt)
+        resp = _generate(prompt)
         raw = _get_raw_text_from_resp(resp)
         refined = re.sub(r"```json|```", "", raw).strip()
         refined = refined.replace("\\n", "\n").strip()
         return refined
+    except CircuitOpenError:
+        if fail_fast:
+            raise
+        logger.warning("Gemini circuit open; keeping current content for heading '%s'", heading)
+        return current_content
     except Exception as e:
         logger.exception("Gemini Word refinement failed for heading '%s': %s", heading, e)
         # fallback: return original content unchanged (so UX doesn't break)
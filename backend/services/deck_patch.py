@@ -0,0 +1,285 @@
+# backend/services/deck_patch.py
+"""
+Batch edits for one presentation (PATCH /api/v1/presentations/{id}).
+
+The patched document is {"topic": str, "content": [slide, ...], "configuration": {...}}
+and edits are an RFC 6902 JSON Patch against it, e.g.
+
+    [{"op": "replace", "path": "/content/2/title", "value": "New title"},
+     {"op": "add", "path": "/content/-", "value": {"layout": "bullet", ...}},
+     {"op": "move", "from": "/content/0", "path": "/content/3"}]
+
+The simpler slide-op form (update / insert / delete / move by index) is
+translated to the same patch by slide_ops_to_patch().
+
+apply() executes the operations in order through services/slides.py, so a
+field edit rewrites one slide row and a move one position. It runs inside
+the caller's transaction: on PatchError the caller rolls back and nothing
+is applied. It returns the executed patch with slide positions ("-",
+moves) resolved to concrete indexes: replayed on the old deck it gives the
+new one (the diff).
+"""
+import copy
+from typing import Any, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.models import Presentation
+from services import slides
+
+MAX_OPERATIONS = 500
+_OPS = ("add", "remove", "replace", "move", "copy", "test")
+
+
+class PatchError(ValueError):
+    """The patch is malformed, points nowhere, or a `test` op failed."""
+
+
+# ---------------- JSON pointer helpers ----------------
+
+def _escape(token: str) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _parse(pointer) -> List[str]:
+    if not isinstance(pointer, str) or (pointer and not pointer.startswith("/")):
+        raise PatchError(f"Invalid JSON pointer: {pointer!r}")
+    if pointer == "":
+        return []
+    return [t.replace("~1", "/").replace("~0", "~") for t in pointer[1:].split("/")]
+
+
+def _pointer(tokens: List[Any]) -> str:
+    return "".join("/" + _escape(t) for t in tokens)
+
+
+def _index(token: str, size: int, allow_end: bool) -> int:
+    """List index token -> int; '-' (and `size` itself) only where appending is allowed."""
+    if token == "-" and allow_end:
+        return size
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise PatchError(f"Invalid array index: {token!r}")
+    idx = int(token)
+    if idx > size or (idx == size and not allow_end):
+        raise PatchError(f"Array index out of range: {idx}")
+    return idx
+
+
+def _mem_get(doc, tokens: List[str]):
+    for token in tokens:
+        if isinstance(doc, list):
+            doc = doc[_index(token, len(doc), allow_end=False)]
+        elif isinstance(doc, dict):
+            if token not in doc:
+                raise PatchError(f"Path not found: {_pointer(tokens)}")
+            doc = doc[token]
+        else:
+            raise PatchError(f"Path not found: {_pointer(tokens)}")
+    return doc
+
+
+def _mem_apply(doc: dict, name: str, tokens: List[str], value=None):
+    """add / remove / replace on a plain dict/list tree (mutates `doc`); returns the removed value."""
+    if not tokens:
+        raise PatchError("Cannot replace the root of this object")
+    parent = _mem_get(doc, tokens[:-1])
+    last = tokens[-1]
+    if isinstance(parent, list):
+        idx = _index(last, len(parent), allow_end=(name == "add"))
+        if name == "add":
+            parent.insert(idx, value)
+            return None
+        removed = parent[idx]
+        if name == "remove":
+            del parent[idx]
+        else:
+            parent[idx] = value
+        return removed
+    if not isinstance(parent, dict):
+        raise PatchError(f"Path not found: {_pointer(tokens)}")
+    if name != "add" and last not in parent:
+        raise PatchError(f"Path not found: {_pointer(tokens)}")
+    removed = parent.get(last)
+    if name == "remove":
+        del parent[last]
+    else:
+        parent[last] = value
+    return removed
+
+
+# ---------------- slide-op form ----------------
+
+def slide_ops_to_patch(ops: List[dict]) -> List[dict]:
+    """[{"op": "update"|"insert"|"delete"|"move", "index": i, ...}] -> RFC 6902 patch."""
+    patch = []
+    for op in ops:
+        kind, idx = op.get("op"), op.get("index")
+        if kind == "update":
+            for key, value in (op.get("fields") or {}).items():
+                patch.append({"op": "add", "path": _pointer(["content", idx, key]), "value": value})
+        elif kind == "insert":
+            patch.append({"op": "add", "path": _pointer(["content", idx]), "value": op.get("slide") or {}})
+        elif kind == "delete":
+            patch.append({"op": "remove", "path": _pointer(["content", idx])})
+        elif kind == "move":
+            if op.get("to_index") is None:
+                raise PatchError("move needs to_index")
+            patch.append({"op": "move", "from": _pointer(["content", idx]), "path": _pointer(["content", op["to_index"]])})
+        else:
+            raise PatchError(f"Unknown slide op: {kind!r}")
+    return patch
+
+
+# ---------------- executor ----------------
+
+async def _get_value(db: AsyncSession, presentation: Presentation, tokens: List[str]):
+    if not tokens:
+        raise PatchError("Cannot read the document root")
+    root, rest = tokens[0], tokens[1:]
+    if root == "topic" and not rest:
+        return presentation.topic
+    if root == "configuration":
+        return copy.deepcopy(_mem_get(presentation.configuration or {}, rest))
+    if root == "content":
+        if not rest:
+            return await slides.load_deck(db, presentation.presentation_id)
+        size = await slides.count_slides(db, presentation.presentation_id)
+        slide = await slides.get_slide(db, presentation.presentation_id, _index(rest[0], size, allow_end=False))
+        return copy.deepcopy(_mem_get(slide, rest[1:]))
+    raise PatchError(f"Path not found: {_pointer(tokens)}")
+
+
+async def _apply_content(db: AsyncSession, presentation: Presentation, op: dict, name: str, path: List[str], frm) -> dict:
+    pid = presentation.presentation_id
+    value = op.get("value")
+
+    if len(path) == 1:
+        # the whole deck
+        if name == "test":
+            if await slides.load_deck(db, pid) != value:
+                raise PatchError("test failed at /content")
+        elif name in ("add", "replace"):
+            if not isinstance(value, list):
+                raise PatchError("/content must be a list of slides")
+            await slides.replace_deck(db, presentation, value)
+        elif name == "remove":
+            await slides.replace_deck(db, presentation, [])
+        else:
+            raise PatchError(f"{name} is not supported on /content")
+        return op
+
+    size = await slides.count_slides(db, pid)
+
+    if len(path) == 2:
+        # one slide
+        if name == "move" and frm is not None and frm[:1] == ["content"] and len(frm) == 2:
+            from_idx = _index(frm[1], size, allow_end=False)
+            # the target index counts in the list without the moved slide
+            to_idx = _index(path[1], size - 1, allow_end=True)
+            await slides.move_slide(db, presentation, from_idx, to_idx)
+            return {"op": "move", "from": _pointer(["content", from_idx]), "path": _pointer(["content", to_idx])}
+
+        if name in ("move", "copy"):
+            value = await _get_value(db, presentation, frm)
+            if name == "move":
+                await _apply_one(db, presentation, {"op": "remove", "path": op["from"]})
+                size = await slides.count_slides(db, pid)
+            name = "add"
+
+        idx = _index(path[1], size, allow_end=(name == "add"))
+        if name == "add":
+            if not isinstance(value, dict):
+                raise PatchError("A slide must be an object")
+            await slides.insert_slide(db, presentation, idx, value)
+            return {"op": "add", "path": _pointer(["content", idx]), "value": value}
+        if name == "remove":
+            await slides.delete_slide(db, presentation, idx)
+        elif name == "replace":
+            if not isinstance(value, dict):
+                raise PatchError("A slide must be an object")
+            await slides.replace_slide(db, presentation, idx, value)
+        elif name == "test":
+            if await slides.get_slide(db, pid, idx) != value:
+                raise PatchError(f"test failed at {op['path']}")
+        return {**op, "path": _pointer(["content", idx])}
+
+    # inside one slide: edit a copy of that slide, then write the one row back
+    idx = _index(path[1], size, allow_end=False)
+    slide = copy.deepcopy(await slides.get_slide(db, pid, idx))
+    inner = path[2:]
+
+    if name == "test":
+        if _mem_get(slide, inner) != value:
+            raise PatchError(f"test failed at {op['path']}")
+        return op
+    if name in ("move", "copy"):
+        if frm[:2] == path[:2]:
+            value = copy.deepcopy(_mem_get(slide, frm[2:]))
+            if name == "move":
+                _mem_apply(slide, "remove", frm[2:])
+        else:
+            value = await _get_value(db, presentation, frm)
+            if name == "move":
+                await _apply_one(db, presentation, {"op": "remove", "path": op["from"]})
+                slide = copy.deepcopy(await slides.get_slide(db, pid, idx))
+        name = "add"
+
+    _mem_apply(slide, name, inner, value)
+    if not await slides.replace_slide(db, presentation, idx, slide):
+        raise PatchError(f"Path not found: {op['path']}")
+    return op
+
+
+async def _apply_one(db: AsyncSession, presentation: Presentation, op: dict) -> dict:
+    if not isinstance(op, dict) or op.get("op") not in _OPS:
+        raise PatchError(f"Invalid operation: {op!r}")
+    name = op["op"]
+    if name in ("add", "replace", "test") and "value" not in op:
+        raise PatchError(f"{name} needs a value")
+    path = _parse(op.get("path"))
+    frm = _parse(op.get("from")) if name in ("move", "copy") else None
+    if not path:
+        raise PatchError("Cannot patch the document root")
+
+    root = path[0]
+    if root == "topic" and len(path) == 1:
+        if name == "test":
+            if presentation.topic != op["value"]:
+                raise PatchError("test failed at /topic")
+            return op
+        if name not in ("add", "replace"):
+            raise PatchError(f"{name} is not supported on /topic")
+        presentation.topic = str(op["value"])
+        await slides.refresh_summary(db, presentation)
+        return op
+
+    if root == "configuration":
+        doc = {"configuration": copy.deepcopy(presentation.configuration or {})}
+        if name == "test":
+            if _mem_get(doc, path) != op["value"]:
+                raise PatchError(f"test failed at {op['path']}")
+            return op
+        value = op.get("value")
+        if name in ("move", "copy"):
+            value = await _get_value(db, presentation, frm)
+            if name == "move":
+                if frm[:1] == ["configuration"]:
+                    _mem_apply(doc, "remove", frm)
+                else:
+                    await _apply_one(db, presentation, {"op": "remove", "path": op["from"]})
+            name = "add"
+        _mem_apply(doc, name, path, value)
+        presentation.configuration = doc.get("configuration")
+        return op
+
+    if root == "content":
+        return await _apply_content(db, presentation, op, name, path, frm)
+
+    raise PatchError(f"Path not found: {op.get('path')}")
+
+
+async def apply(db: AsyncSession, presentation: Presentation, patch: List[dict]) -> List[dict]:
+    """Apply every operation or raise PatchError; returns the executed (normalised) patch."""
+    if len(patch) > MAX_OPERATIONS:
+        raise PatchError(f"At most {MAX_OPERATIONS} operations per request")
+    return [await _apply_one(db, presentation, op) for op in patch]
@@ -0,0 +1,128 @@
+# backend/services/docx_fragments.py
+"""
+Rendered WordprocessingML per section, cached by content.
+
+A section renders to a run of <w:p> elements (heading + body paragraphs)
+that depends only on its heading, its content and the paragraph styles /
+sizes of its page. The bytes are cached under a hash of those, so after a
+refine only the changed section is rendered again; docx_generator splices
+the fragments into word/document.xml.
+
+The markup is what python-docx's add_paragraph / add_heading produce:
+  <w:p><w:pPr><w:pStyle w:val="..."/></w:pPr><w:r><w:rPr><w:sz w:val="24"/></w:rPr><w:t>text</w:t></w:r></w:p>
+with pPr / rPr only when a style / size is set, tabs as <w:tab/>.
+
+At most DOCX_FRAGMENT_CACHE_BYTES of fragments are kept, least recently used evicted first.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+from xml.sax.saxutils import escape
+
+from core.config import Config
+
+PAGE_BREAK = b'<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+
+# characters XML 1.0 does not allow (python-docx refuses them)
+_INVALID_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+class PageStyle(NamedTuple):
+    """How the paragraphs of one page are formatted: style ids and/or run sizes (half-points)."""
+    heading_style: Optional[str]
+    heading_size: Optional[int]
+    body_style: Optional[str]
+    body_size: Optional[int]
+
+
+def _text(piece: str) -> str:
+    if piece.strip() != piece:
+        return f'<w:t xml:space="preserve">{escape(piece)}</w:t>'
+    return f"<w:t>{escape(piece)}</w:t>"
+
+
+def paragraph(text: str, style_id: Optional[str] = None, size: Optional[int] = None) -> str:
+    ppr = f'<w:pPr><w:pStyle w:val="{style_id}"/></w:pPr>' if style_id else ""
+    if not text:
+        return f"<w:p>{ppr}</w:p>"
+    rpr = f'<w:rPr><w:sz w:val="{size}"/></w:rPr>' if size else ""
+    pieces = _INVALID_XML.sub("", text).split("\t")
+    content = "<w:tab/>".join(_text(piece) if piece else "" for piece in pieces)
+    return f"<w:p>{ppr}<w:r>{rpr}{content}</w:r></w:p>"
+
+
+def render_section(heading: str, content: str, style: PageStyle) -> bytes:
+    parts = []
+    if heading:
+        parts.append(paragraph(heading, style.heading_style, style.heading_size))
+    for line in (content or "").split("\n"):
+        if line.strip():
+            parts.append(paragraph(line.strip(), style.body_style, style.body_size))
+    return "".join(parts).encode("utf-8")
+
+
+def fragment_key(heading: str, content: str, style: PageStyle) -> str:
+    digest = hashlib.sha256(repr(tuple(style)).encode())
+    for value in (heading, content):
+        data = (value or "").encode("utf-8")
+        # length-prefixed so ("ab", "c") and ("a", "bc") differ
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class FragmentCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return fragment
+
+    def put(self, key: str, fragment: bytes) -> None:
+        if len(fragment) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = fragment
+            self._size += len(fragment)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._size, "hits": self.hits, "misses": self.misses}
+
+
+fragment_cache = FragmentCache(max_bytes=Config.DOCX_FRAGMENT_CACHE_BYTES)
+
+
+def section_fragment(heading: str, content: str, style: PageStyle) -> bytes:
+    """Cached render_section()."""
+    key = fragment_key(heading, content, style)
+    fragment = fragment_cache.get(key)
+    if fragment is None:
+        fragment = render_section(heading, content, style)
+        fragment_cache.put(key, fragment)
+    return fragment
@@ -1,95 +1,14 @@
-from pathlib import Path
 from typing import Dict, List
+import heapq
 import re
-import logging
 
 from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
 from docx.shared import Pt
 
-logger = logging.getLogger(__name__)
-
-# base storage dir (like you do for pptx)
-BASE_DIR = Path(__file__).resolve().parent.parent
-DOC_STORAGE_DIR = BASE_DIR / "storage" / "docs"
-DOC_STORAGE_DIR.mkdir(parents=True, exist_ok=True)
-
-
-def _clean_section_content(doc_title: str, heading: str, raw: str) -> str:
-    """
-    Post-process Gemini text so that:
-
-    - Leading lines like:
-        * "Electric Vehicle Market in India 2025" (doc title)
-        * "Page 1 – Section 1", "Page 2 - Section 3", etc.
-        * "Section 2: Growth Drivers"
-        * a repeat of the heading, or "Heading: ..."
-      are removed (and we keep stripping such lines until the
-      first "normal" paragraph).
-    - Literal '\\n' are converted to real newlines.
-    - Extra empty lines at the start/end are removed.
-    """
-    if not raw:
-        return ""
-
-    # Normalise newlines
-    text = raw.replace("\r\n", "\n").replace("\r", "\n")
-
-    # Convert escaped '\n' from the model into real paragraph breaks
-    text = text.replace("\\n", "\n")
-
-    lines = [l.strip() for l in text.split("\n")]
-
-    doc_title_low = (doc_title or "").strip().lower()
-    heading_low = (heading or "").strip().lower()
-
-    # Strip meta lines at the TOP until we hit a normal paragraph
-    while lines:
-        first = lines[0].strip()
-        if not first:
-            # blank line at top – just drop it
-            lines.pop(0)
-            continue
-
-        f_low = first.lower()
-
-        is_doc_title = f_low == doc_title_low
-        is_page_section = f_low.startswith("page ") and "section" in f_low
-        is_section_prefix = f_low.startswith("section ")
-        is_heading_exact = f_low == heading_low
-        is_heading_with_colon = heading_low and f_low.startswith(heading_low + ":")
-
-        # Only strip the meta line if there *is* more content after it.
-        # This prevents removing the only paragraph in cases where model output
-        # matches the heading/title but there's no further text.
-        if (is_doc_title or is_page_section or is_section_prefix or is_heading_exact or is_heading_with_colon):
-            # If there's another non-empty line after this, pop current meta line
-            if len(lines) > 1 and any(l.strip() for l in lines[1:]):
-                lines.pop(0)
-                continue
-            else:
-                # don't strip if it's the only content left
-                break
-
-        # First "normal" line reached – stop stripping
-        break
-
-    # Collapse duplicate blank lines
-    cleaned: List[str] = []
-    for line in lines:
-        if not line:
-            if cleaned and cleaned[-1] == "":
-                continue
-            cleaned.append("")
-        else:
-            cleaned.append(line)
-
-    # Trim blank lines at start/end
-    while cleaned and cleaned[0] == "":
-        cleaned.pop(0)
-    while cleaned and cleaned[-1] == "":
-        cleaned.pop()
-
-    return "\n".join(cleaned).strip()
+from services.docx_fragments import PageStyle
+from services.ooxml_package import PackageZipWriter, write_docx_parts
+from services.section_text import paragraphs as split_paragraphs, word_count
 
 
 # ----------------------------
@@ -98,19 +17,16 @@ def _clean_section_content(doc_title: str, heading: str, raw: str) -> str:
 
 def split_section_into_parts(section: Dict[str, str], parts: int) -> List[Dict[str, str]]:
     """
-    Split a single section's content into `parts` pieces by paragraph boundaries.
-    Returns a list of section-like dicts with headings suffixed (only when needed).
-    Each returned dict has keys: {"heading": ..., "content": ...}
+    Split a single section's (already normalised) content into `parts` pieces by
+    paragraph boundaries. Returns a list of section-like dicts with headings
+    suffixed (only when needed), each with its own "word_count".
     """
     heading = section.get("heading", "") or ""
-    raw = section.get("content", "") or ""
-    # Use existing cleaner to normalise before splitting
-    content = _clean_section_content("", heading, raw)
-    paragraphs = [p.strip() for p in content.split("\n") if p.strip()]
+    paragraphs = split_paragraphs(section.get("content", "")) if section.get("paragraph_count", 1) else []
 
     if not paragraphs:
         # empty section: return empty parts
-        return [{"heading": heading, "content": ""} for _ in range(parts)]
+        return [{"heading": heading, "content": "", "word_count": 0} for _ in range(parts)]
 
     # If paragraphs < parts, try split paragraphs into smaller chunks by sentences
     if len(paragraphs) < parts:
@@ -138,7 +54,7 @@ def split_section_into_parts(section: Dict[str, str], parts: int) -> List[Dict[s
         leftover = sentences[idx:]
         if leftover:
             out[-1]["content"] = (out[-1]["content"] + " " + " ".join(leftover)).strip()
-        return out
+        return _with_word_counts(out)
 
     # Otherwise distribute paragraphs evenly
     base = len(paragraphs) // parts
@@ -153,18 +69,108 @@ def split_section_into_parts(section: Dict[str, str], parts: int) -> List[Dict[s
             "heading": f"{heading}" if i == 0 else f"{heading} (cont.)",
             "content": "\n".join(chunk_paras).strip()
         })
-    return out
+    return _with_word_counts(out)
+
+
+def _with_word_counts(parts: List[Dict]) -> List[Dict]:
+    for part in parts:
+        part["word_count"] = word_count(part["content"])
+    return parts
+
+
+def _section_words(section: Dict) -> int:
+    # stored with the section (services/section_text.py), never recounted here
+    return section.get("word_count") or 0
+
+
+def _balance_by_count(sections: List[Dict], num_pages: int) -> List[List[Dict]]:
+    """Equal section counts per page, the remainder going to the first pages."""
+    base, rem = divmod(len(sections), num_pages)
+    groups, idx = [], 0
+    for p in range(num_pages):
+        take = base + (1 if p < rem else 0)
+        groups.append(sections[idx: idx + take])
+        idx += take
+    return groups
+
+
+def _balance_by_words(sections: List[Dict], num_pages: int) -> List[List[Dict]]:
+    """
+    Consecutive runs of sections, each as close as possible to the words still
+    to place divided by the pages still to fill (every page gets at least one).
+    """
+    groups: List[List[Dict]] = []
+    remaining = sum(_section_words(s) for s in sections)
+    idx, total = 0, len(sections)
+    for p in range(num_pages):
+        pages_left = num_pages - p
+        if pages_left == 1:
+            groups.append(sections[idx:])
+            break
+        target = remaining / pages_left
+        group = [sections[idx]]
+        words = _section_words(sections[idx])
+        idx += 1
+        # take the next section while that lands closer to the target
+        while total - idx > pages_left - 1 and words + _section_words(sections[idx]) / 2 <= target:
+            words += _section_words(sections[idx])
+            group.append(sections[idx])
+            idx += 1
+        groups.append(group)
+        remaining -= words
+    return groups
+
+
+def _fill_by_splitting(sections: List[Dict], num_pages: int) -> List[List[Dict]]:
+    """
+    Fewer sections than pages: one section per page, longest first, then keep
+    halving the longest page into the next empty one. Page weights live in a
+    max-heap, so each split is O(log pages) plus the split itself.
+    """
+    ordered = sorted(sections, key=_section_words, reverse=True)
+    pages_list: List[List[Dict]] = [[sec] for sec in ordered] + [[] for _ in range(num_pages - len(ordered))]
+
+    # (-words, page index): the longest page first, the lowest index on ties
+    heap = [(-_section_words(sec), i) for i, sec in enumerate(ordered)]
+    heapq.heapify(heap)
+    next_empty = len(ordered)
+
+    while next_empty < num_pages and heap:
+        neg_words, idx = heapq.heappop(heap)
+        if neg_words >= 0:
+            # only empty sections left: nothing to split
+            break
+        first, second = split_section_into_parts(pages_list[idx][0], 2)
+        pages_list[idx] = [first]
+        pages_list[next_empty] = [second]
+        heapq.heappush(heap, (-first["word_count"], idx))
+        heapq.heappush(heap, (-second["word_count"], next_empty))
+        next_empty += 1
+
+    return pages_list
+
+
+def plan_page_sizes(word_counts: List[int], num_pages: int, balance: str = "sections") -> List[int]:
+    """
+    Sections per page when there are at least as many sections as pages: the
+    layout distribute_sections_across_pages gives, from the stored counts only.
+    """
+    sections = [{"word_count": wc} for wc in word_counts]
+    groups = (_balance_by_words if balance == "words" else _balance_by_count)(sections, max(num_pages, 1))
+    return [len(group) for group in groups]
 
 
 def distribute_sections_across_pages(
     sections: List[Dict[str, str]],
-    num_pages: int
+    num_pages: int,
+    balance: str = "sections",
 ) -> Dict[int, List[Dict[str, str]]]:
     """
     Distribute the flat list 'sections' into num_pages pages.
 
     Behavior:
-    - If len(sections) >= num_pages: distribute sections as evenly as possible (some pages may have 1 extra).
+    - If len(sections) >= num_pages: consecutive sections per page, balanced by
+      section count (balance="sections") or by stored word count (balance="words").
     - If len(sections) < num_pages: split the longest section(s) into parts so each page has something to show.
     - Returns pages dict: {1: [...], 2: [...], ...}
     """
@@ -172,173 +178,121 @@ def distribute_sections_across_pages(
         num_pages = 1
 
     pages: Dict[int, List[Dict[str, str]]] = {i: [] for i in range(1, num_pages + 1)}
-    total_sections = len(sections)
 
-    if total_sections == 0:
+    if not sections:
         # nothing to distribute -> return empty pages
         return pages
 
-    if total_sections >= num_pages:
-        # Balanced distribution: base per page + remainder assigned to first pages
-        base = total_sections // num_pages
-        rem = total_sections % num_pages
-        idx = 0
-        for p in range(1, num_pages + 1):
-            take = base + (1 if p <= rem else 0)
-            pages[p] = sections[idx: idx + take]
-            idx += take
-        return pages
+    if len(sections) >= num_pages:
+        groups = (_balance_by_words if balance == "words" else _balance_by_count)(sections, num_pages)
+    else:
+        groups = _fill_by_splitting(sections, num_pages)
 
-    # total_sections < num_pages -> we need to split some sections
-    # strategy: find the longest sections by word count and split them to fill pages
-    # compute word counts
-    def word_count(s):
-        return len(re.findall(r"\w+", s.get("content", "") or ""))
+    for idx, page in enumerate(groups):
+        pages[idx + 1] = page
+    return pages
 
-    # Sort sections descending by word count (longest first)
-    sections_sorted = sorted(sections, key=word_count, reverse=True)
 
-    # Create an array of page buckets (will convert to dict later)
-    pages_list: List[List[Dict[str, str]]] = [[] for _ in range(num_pages)]
+# ----------------------------
+# DOCX rendering
+# ----------------------------
 
-    # Place each original section into the first available pages (one per page up to number of sections)
-    for i, sec in enumerate(sections_sorted):
-        if i < num_pages:
-            pages_list[i].append(sec)
-        else:
-            # should not happen because total_sections < num_pages here, but safe fallback:
-            pages_list[0].append(sec)
-
-    # Now fill empty pages by splitting the longest sections iteratively
-    filled_pages = sum(1 for p in pages_list if p)
-    empty_slots = num_pages - filled_pages
-
-    # While there are empty slots, split the currently longest section available
-    while empty_slots > 0:
-        # find index of page with the longest total word count
-        longest_page_idx = None
-        longest_wc = 0
-        for i, page in enumerate(pages_list):
-            if not page:
-                continue
-            wc = sum(word_count(sec) for sec in page)
-            if wc > longest_wc:
-                longest_wc = wc
-                longest_page_idx = i
-
-        if longest_page_idx is None:
-            # nothing left to split
-            break
+# font sizes by number of sections on a page: (paragraph pt, heading pt)
+_PAGE_FONT_SIZES = {1: (12, 16), 2: (11, 14), 3: (10, 13)}
 
-        # pop the first section from that page to split it
-        sec_to_split = pages_list[longest_page_idx].pop(0)
-        # Split it into 2 parts
-        parts = split_section_into_parts(sec_to_split, 2)
-        # Put first part back into original page, second part into next empty slot
-        pages_list[longest_page_idx].append(parts[0])
-
-        # find next empty slot
-        next_empty = None
-        for j, pg in enumerate(pages_list):
-            if not pg:
-                next_empty = j
-                break
-        if next_empty is None:
-            # no empty slot found (shouldn't happen)
-            break
 
-        pages_list[next_empty].append(parts[1])
-        empty_slots -= 1
+def _page_font_sizes(num_sections: int):
+    # 3 sections or more -> slightly smaller text
+    return _PAGE_FONT_SIZES[min(max(num_sections, 1), 3)]
 
-    # Convert pages_list to dict with page numbers preserved in original order
-    for idx, page in enumerate(pages_list):
-        pages[idx + 1] = page
 
-    return pages
+def _default_font_size(doc):
+    """Size a plain Normal paragraph already has (Normal style, else docDefaults)."""
+    size = doc.styles["Normal"].font.size
+    if size is None:
+        sz = doc.styles.element.xpath("w:docDefaults/w:rPrDefault/w:rPr/w:sz/@w:val")
+        size = Pt(int(sz[0]) / 2) if sz else None
+    return size
 
 
-# ----------------------------
-# Original build_docx_file (unchanged aside from helpers above)
-# ----------------------------
+def _page_style(doc, cache: dict, num_sections: int, render_mode: str) -> PageStyle:
+    """
+    Paragraph formatting for a page with `num_sections` sections.
 
-def build_docx_file(
-    project_id: int,
-    title: str,
-    pages: Dict[int, List[Dict[str, str]]],  # {1: [...], 2: [...], ...}
-) -> Path:
+    "runs": Heading 1 / Normal with the size written on every run.
+    "styles": styles defined once per document in styles.xml, based on
+    Normal / Heading 1 with only the size changed, so a paragraph carries a
+    style reference instead of its own run properties. A paragraph size equal
+    to the document default needs no style at all.
     """
-    pages = {
-      1: [
-        {"heading": "Introduction", "content": "...."},
-        {"heading": "Context", "content": "...."},
-      ],
-      2: [
-        {"heading": "Market Analysis", "content": "...."},
-      ],
-      ...
-    }
-
-    - Each key is a page number (1-based).
-    - Each value is a list of sections for that page.
+    para_pt, heading_pt = _page_font_sizes(num_sections)
+    if render_mode == "runs":
+        return PageStyle("Heading1", heading_pt * 2, None, para_pt * 2)
+    if para_pt not in cache:
+        body_id = None
+        if Pt(para_pt) != cache.setdefault("default", _default_font_size(doc)):
+            body = doc.styles.add_style(f"Body {para_pt}pt", WD_STYLE_TYPE.PARAGRAPH)
+            body.base_style = doc.styles["Normal"]
+            body.font.size = Pt(para_pt)
+            body_id = body.style_id
+        heading = doc.styles.add_style(f"Section Heading {heading_pt}pt", WD_STYLE_TYPE.PARAGRAPH)
+        heading.base_style = doc.styles["Heading 1"]
+        heading.font.size = Pt(heading_pt)
+        cache[para_pt] = PageStyle(heading.style_id, None, body_id, None)
+    return cache[para_pt]
+
+
+def docx_skeleton(title: str, page_sizes: List[int], render_mode: str = "styles"):
+    """
+    python-docx document with the title page and the styles for pages holding
+    `page_sizes` sections each; returns (doc, [PageStyle per page]).
     """
-
-    # debug: show lengths of content per page
-    try:
-        page_debug = {p: [len(s.get("content", "")) for s in secs] for p, secs in pages.items()}
-        logger.debug("Building DOCX for project %s — pages content lengths: %s", project_id, page_debug)
-    except Exception:
-        pass
-
     doc = Document()
-
     # Title page (Word will handle its own pagination)
     doc.add_heading(title, level=0)
+    style_cache: dict = {}
+    # Simple font size logic based on how many sections in the page
+    return doc, [_page_style(doc, style_cache, size, render_mode) for size in page_sizes]
+
+
+class _SkeletonWriter(PackageZipWriter):
+    """Holds word/document.xml back so it can be written last, body included."""
 
-    first_page = True
-
-    for page_num in sorted(pages.keys()):
-        # For the first *content* page after the title we don't add a break.
-        # For every later content page we insert an explicit page break.
-        if not first_page:
-            doc.add_page_break()
-        first_page = False
-
-        page_sections = pages[page_num]
-        num_sections = len(page_sections)
-
-        # Simple font size logic based on how many sections in the page
-        if num_sections <= 1:
-            para_size = Pt(12)
-            heading_size = Pt(16)
-        elif num_sections == 2:
-            para_size = Pt(11)
-            heading_size = Pt(14)
+    document = None
+
+    def write(self, pack_uri, blob: bytes) -> None:
+        if pack_uri.membername == "word/document.xml":
+            self.document = blob
         else:
-            # 3 sections -> slightly smaller text
-            para_size = Pt(10)
-            heading_size = Pt(13)
-
-        for section in page_sections:
-            heading = section.get("heading", "") or ""
-            raw_content = section.get("content", "") or ""
-
-            # Clean up Gemini text (remove doc title / Page X / Section X lines, handle \n)
-            content = _clean_section_content(title, heading, raw_content)
-
-            if heading:
-                h = doc.add_heading(heading, level=1)
-                for run in h.runs:
-                    run.font.size = heading_size
-
-            if content:
-                for para_text in content.split("\n"):
-                    if para_text.strip():
-                        p = doc.add_paragraph(para_text.strip())
-                        for run in p.runs:
-                            run.font.size = para_size
-
-    file_name = f"project_{project_id}.docx"
-    file_path = DOC_STORAGE_DIR / file_name
-    doc.save(file_path)
-
-    return file_path
+            super().write(pack_uri, blob)
+
+
+class DocxPackageWriter:
+    """
+    Writes the package of `doc` to `fileobj` (a file, or a non-seekable sink)
+    with the body of word/document.xml supplied piece by piece through write().
+
+    Every other part is written straight from the skeleton's parts first
+    (services/ooxml_package.py: media stored, XML at PACKAGE_DEFLATE_LEVEL);
+    document.xml is the last zip entry and is deflated as it is written, so
+    only the skeleton and zlib's window are ever held in memory.
+    """
+
+    def __init__(self, doc, fileobj):
+        self._writer = _SkeletonWriter(fileobj)
+        write_docx_parts(doc, self._writer)
+        document = self._writer.document
+        # body goes before the final sectPr
+        cut = document.rindex(b"<w:sectPr")
+        self._tail = document[cut:]
+        self._document = self._writer.open("word/document.xml")
+        self._document.write(document[:cut])
+
+    def write(self, body_xml: bytes) -> None:
+        self._document.write(body_xml)
+
+    def close(self) -> None:
+        self._document.write(self._tail)
+        self._document.close()
+        self._writer.close()
+
@@ -0,0 +1,236 @@
+# backend/services/idempotency.py
+"""
+Idempotency-Key support for the expensive create endpoints.
+
+    replay = await idempotency.begin(user_id, key, "POST /presentations", payload)
+    if replay is not None:
+        return replay                      # stored response, no model call
+    try:
+        result = ...                       # the real work
+    except BaseException:                  # cancellation included
+        await idempotency.abandon(user_id, key)  # let the client retry for real
+        raise
+    await idempotency.complete(user_id, key, result)
+
+- first call with a key inserts an "in_progress" row (committed right away)
+- a retry while that call is running waits for it, then replays its result
+- a retry after completion replays the stored result until the TTL expires
+- the same key with a different payload is rejected with 422
+- an expired key, or an in_progress marker older than IDEMPOTENCY_STALE_SECONDS
+  (its worker crashed), is taken over by the next call; purge_expired() clears
+  the rest at startup
+
+Bookkeeping uses its own short sessions, so the marker is visible to other
+requests independently of the route's transaction.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from core.config import Config
+from core.dbutils import AsyncSessionLocal
+from models import models
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+_POLL_INTERVAL = 0.25
+
+# (user_id, key) -> Event set when the in-flight call in this process finishes
+_inflight: Dict[Tuple[int, str], asyncio.Event] = {}
+
+
+def _request_hash(endpoint: str, payload: Any) -> str:
+    body = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{endpoint}\n{body}".encode("utf-8")).hexdigest()
+
+
+def _dead(row: models.IdempotencyKey, now: datetime) -> bool:
+    """Expired, or an in_progress marker left behind by a crashed worker."""
+    stale_before = now - timedelta(seconds=Config.IDEMPOTENCY_STALE_SECONDS)
+    return row.expires_at <= now or (row.status == "in_progress" and row.created_at < stale_before)
+
+
+async def _try_claim(user_id: int, key: str, endpoint: str, request_hash: str):
+    """
+    Insert the in_progress marker.
+    Returns (True, None) if we own the key now, else (False, existing_row_snapshot).
+    """
+    async with AsyncSessionLocal() as db:
+        now = datetime.now()
+        db.add(
+            models.IdempotencyKey(
+                owner_id=user_id,
+                key=key,
+                endpoint=endpoint,
+                request_hash=request_hash,
+                status="in_progress",
+                created_at=now,
+                expires_at=now + timedelta(seconds=Config.IDEMPOTENCY_TTL_SECONDS),
+            )
+        )
+        try:
+            await db.commit()
+            return True, None
+        except IntegrityError:
+            await db.rollback()
+
+        row = await db.scalar(
+            select(models.IdempotencyKey).where(
+                models.IdempotencyKey.owner_id == user_id,
+                models.IdempotencyKey.key == key,
+            )
+        )
+        if row is None:
+            # abandoned between our insert and lookup -> caller retries the claim
+            return False, None
+        if _dead(row, now):
+            # only this key's row; the next claim takes the key over
+            await db.execute(
+                delete(models.IdempotencyKey).where(models.IdempotencyKey.id == row.id)
+            )
+            await db.commit()
+            return False, None
+        return False, {
+            "request_hash": row.request_hash,
+            "status": row.status,
+            "response": row.response,
+        }
+
+
+async def begin(user_id: int, key: Optional[str], endpoint: str, payload: Any) -> Optional[Any]:
+    """
+    Claim `key` for this call, or return the stored response of an earlier call.
+    Returns None when the caller should do the work (also when no key was sent).
+    """
+    if not key:
+        return None
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail="Idempotency-Key is too long")
+
+    request_hash = _request_hash(endpoint, payload)
+    deadline = time.monotonic() + Config.IDEMPOTENCY_WAIT_SECONDS
+
+    while True:
+        claimed, existing = await _try_claim(user_id, key, endpoint, request_hash)
+        if claimed:
+            _inflight[(user_id, key)] = asyncio.Event()
+            return None
+
+        if existing is not None:
+            if existing["request_hash"] != request_hash:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key was already used with a different request",
+                )
+            if existing["status"] == "completed":
+                logger.info("Replaying stored response for idempotency key %s (user %s)", key, user_id)
+                return existing["response"]
+
+            # original call still running: wait for it, then look again
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise HTTPException(
+                    status_code=409,
+                    detail="A request with this Idempotency-Key is still in progress",
+                )
+            event = _inflight.get((user_id, key))
+            if event is not None:
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                # owned by another worker process: poll the row
+                await asyncio.sleep(min(_POLL_INTERVAL, remaining))
+
+
+async def complete(user_id: int, key: Optional[str], response: Any) -> None:
+    """Store the final response for replay and wake up waiting retries."""
+    if not key:
+        return
+    await _shielded(_complete(user_id, key, response))
+
+
+async def _complete(user_id: int, key: str, response: Any) -> None:
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(models.IdempotencyKey)
+                .where(
+                    models.IdempotencyKey.owner_id == user_id,
+                    models.IdempotencyKey.key == key,
+                )
+                .values(status="completed", response=jsonable_encoder(response))
+            )
+            await db.commit()
+    finally:
+        _release(user_id, key)
+
+
+async def abandon(user_id: int, key: Optional[str]) -> None:
+    """The call failed or was cancelled: forget the key so a retry runs the work again."""
+    if not key:
+        return
+    await _shielded(_abandon(user_id, key))
+
+
+async def _abandon(user_id: int, key: str) -> None:
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                delete(models.IdempotencyKey).where(
+                    models.IdempotencyKey.owner_id == user_id,
+                    models.IdempotencyKey.key == key,
+                    models.IdempotencyKey.status == "in_progress",
+                )
+            )
+            await db.commit()
+    except Exception:
+        logger.exception("Failed to release idempotency key %s", key)
+    finally:
+        _release(user_id, key)
+
+
+async def _shielded(coro) -> None:
+    """
+    Run the bookkeeping in its own task: the caller may be cancelled (client
+    disconnected) while it runs, and the marker must still be updated.
+    """
+    await asyncio.shield(asyncio.ensure_future(coro))
+
+
+async def purge_expired() -> None:
+    """Drop every dead key (startup; a claim on a dead key removes just that row)."""
+    now = datetime.now()
+    stale_before = now - timedelta(seconds=Config.IDEMPOTENCY_STALE_SECONDS)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            delete(models.IdempotencyKey).where(
+                or_(
+                    models.IdempotencyKey.expires_at <= now,
+                    and_(
+                        models.IdempotencyKey.status == "in_progress",
+                        models.IdempotencyKey.created_at < stale_before,
+                    ),
+                )
+            )
+        )
+        await db.commit()
+    if result.rowcount:
+        logger.info("Purged %d expired idempotency keys", result.rowcount)
+
+
+def _release(user_id: int, key: str) -> None:
+    event = _inflight.pop((user_id, key), None)
+    if event is not None:
+        event.set()
@@ -0,0 +1,108 @@
+# backend/services/ooxml_package.py
+"""
+Zip writer for .pptx / .docx packages.
+
+python-pptx and python-docx deflate every part at zlib's default level,
+including JPEG / PNG media that is already compressed (the template images
+in ppt_templates, downloaded slide pictures): most of the save time for no
+size gain. This writer plugs into both libraries' package serialisation
+(content types, rels and part blobs are still produced by them) and
+
+- stores parts with an already-compressed extension as is (ZIP_STORED),
+  unless a level-1 probe of their first 64 KiB shrinks by 10 % or more
+  (some PNGs in the templates are barely compressed and deflate 30:1)
+- deflates everything else (XML, rels, EMF / WMF, fonts) at
+  PACKAGE_DEFLATE_LEVEL, a fast level by default
+
+Run benchmarks/bench_package_save.py to compare levels on the templates.
+"""
+import posixpath
+import zipfile
+import zlib
+from typing import IO, Optional
+
+from docx.opc.pkgwriter import PackageWriter as _DocxPackageWriter
+from pptx.opc.serialized import PackageWriter as _PptxPackageWriter
+
+from core.config import Config
+
+# media formats that are normally compressed already
+STORED_EXTENSIONS = frozenset(
+    {"jpg", "jpeg", "jpe", "png", "gif", "tif", "tiff", "wdp", "jxr", "webp",
+     "mp3", "m4a", "mp4", "m4v", "mov", "wma", "wmv", "avi", "zip"}
+)
+_PROBE_BYTES = 64 * 1024
+
+
+def is_precompressed(name: str) -> bool:
+    return posixpath.splitext(name)[1][1:].lower() in STORED_EXTENSIONS
+
+
+def _store(name: str, blob: bytes) -> bool:
+    if not is_precompressed(name):
+        return False
+    probe = blob[:_PROBE_BYTES]
+    return len(zlib.compress(probe, 1)) >= 0.9 * len(probe)
+
+
+class PackageZipWriter:
+    """Physical package writer: the `write(pack_uri, blob)` both libraries call."""
+
+    def __init__(self, fileobj: IO[bytes], deflate_level: Optional[int] = None):
+        self.deflate_level = Config.PACKAGE_DEFLATE_LEVEL if deflate_level is None else deflate_level
+        self._zip = zipfile.ZipFile(
+            fileobj, "w", zipfile.ZIP_DEFLATED, compresslevel=self.deflate_level, strict_timestamps=False
+        )
+
+    def write(self, pack_uri, blob: bytes) -> None:
+        name = pack_uri.membername
+        if _store(name, blob):
+            self._zip.writestr(name, blob, compress_type=zipfile.ZIP_STORED)
+        else:
+            self._zip.writestr(name, blob)
+
+    def open(self, name: str) -> IO[bytes]:
+        """A deflated member written piece by piece (must be closed before the next write)."""
+        return self._zip.open(name, "w")
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def __enter__(self) -> "PackageZipWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class _PptxWriter(_PptxPackageWriter):
+    def __init__(self, phys_writer: PackageZipWriter, pkg_rels, parts):
+        super().__init__(None, pkg_rels, parts)
+        self._phys_writer = phys_writer
+
+    def _write(self) -> None:
+        self._write_content_types_stream(self._phys_writer)
+        self._write_pkg_rels(self._phys_writer)
+        self._write_parts(self._phys_writer)
+
+
+def write_pptx_parts(prs, writer: PackageZipWriter) -> None:
+    """Every part of a python-pptx Presentation, as Presentation.save() would write them."""
+    package = prs.part.package
+    _PptxWriter(writer, package._rels, tuple(package.iter_parts()))._write()
+
+
+def write_docx_parts(doc, writer: PackageZipWriter) -> None:
+    """Every part of a python-docx Document, as Document.save() would write them."""
+    package = doc.part.package
+    for part in package.parts:
+        part.before_marshal()
+    _DocxPackageWriter._write_content_types_stream(writer, package.parts)
+    _DocxPackageWriter._write_pkg_rels(writer, package.rels)
+    _DocxPackageWriter._write_parts(writer, package.parts)
+
+
+def save_pptx(prs, fileobj: IO[bytes], deflate_level: Optional[int] = None) -> None:
+    """Presentation.save() with stored media and the configured DEFLATE level."""
+    with PackageZipWriter(fileobj, deflate_level) as writer:
+        write_pptx_parts(prs, writer)
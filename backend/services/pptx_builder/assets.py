@@ -0,0 +1,60 @@
+# backend/services/pptx_builder/assets.py
+"""
+Images of a deck, fetched before any slide is built.
+
+Every strategy lists the image URLs its slide needs (SlideStrategy.image_urls);
+the distinct ones are fetched at once, remote ones in parallel with a
+timeout, so a deck with N pictures waits about as long as its slowest one
+instead of the sum. Strategies then read SlideContext.assets:
+
+    url -> absolute path (local file) | bytes (downloaded) | the exception raised
+"""
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Union
+
+import requests
+
+from core.config import Config
+
+_HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; PPTGenerator/1.0)"}
+
+
+def clean_url(url) -> Optional[str]:
+    """Model output often wraps URLs in brackets / punctuation or breaks them over lines."""
+    if not url:
+        return None
+    return re.sub(r"\s+", "", str(url)).strip("()[]{}.,;")
+
+
+def _fetch(url: str) -> Union[str, bytes]:
+    # Local path
+    if not url.startswith("http"):
+        if not os.path.isfile(url):
+            raise RuntimeError(f"Local image not found: {url}")
+        return os.path.abspath(url)
+
+    # Remote URL
+    resp = requests.get(url, headers=_HEADERS, timeout=Config.PPTX_IMAGE_TIMEOUT_SECONDS)
+    resp.raise_for_status()
+    return resp.content
+
+
+def _fetch_or_error(url: str):
+    try:
+        return _fetch(url)
+    except Exception as e:
+        return e
+
+
+def prefetch(urls: Iterable[str]) -> Dict[str, object]:
+    distinct = list(dict.fromkeys(u for u in urls if u))
+    remote = [u for u in distinct if u.startswith("http")]
+    assets = {u: _fetch_or_error(u) for u in distinct if not u.startswith("http")}
+    if len(remote) == 1:
+        assets[remote[0]] = _fetch_or_error(remote[0])
+    elif remote:
+        with ThreadPoolExecutor(max_workers=min(Config.PPTX_IMAGE_FETCH_WORKERS, len(remote))) as pool:
+            assets.update(zip(remote, pool.map(_fetch_or_error, remote)))
+    return assets
@@ -1,22 +1,48 @@
-from models import enums
-from services.pptx_builder.slides.title import TitleSlideStrategy
-from services.pptx_builder.slides.bullet import BulletSlideStrategy
-from services.pptx_builder.slides.two_column import TwoColumnSlideStrategy
-from services.pptx_builder.slides.image import ImageSlideStrategy
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from services.pptx_builder.assets import prefetch
+from services.pptx_builder.registry import SlideContext, strategy_for
+
+
+class BuiltSlide(NamedTuple):
+    count: int          # slides added (a table can continue over several)
+    complete: bool      # False if one of its images could not be fetched
 
 
 class SlideGenerator:
-    def __init__(self):
-        self.strategies = {
-            enums.SlideLayout.title.value: TitleSlideStrategy(),
-            enums.SlideLayout.bullet.value: BulletSlideStrategy(),
-            enums.SlideLayout.two_column.value: TwoColumnSlideStrategy(),
-            enums.SlideLayout.image.value: ImageSlideStrategy(),
+    """Builds a deck's slides through the layout strategies (services/pptx_builder/registry.py)."""
+
+    def add_slides(
+        self, prs, entry: dict, slides: list, reuse: Optional[Dict[int, Callable[[], None]]] = None
+    ) -> List[BuiltSlide]:
+        """
+        entry: the template's manifest entry (services/template_manifest.py).
+        reuse: {index in slides: callback adding that slide's copies from a previous build}
+        (services/pptx_builder/reuse.py); those slides are not built and their images not fetched.
+
+        Returns a BuiltSlide per input slide.
+        """
+        reuse = reuse or {}
+        plan = {
+            i: (strategy_for(slide_data.get("layout", "title")), slide_data)
+            for i, slide_data in enumerate(slides)
+            if i not in reuse
         }
+        assets = prefetch(url for strategy, slide_data in plan.values() for url in strategy.image_urls(slide_data))
+        ctx = SlideContext(prs, entry, assets)
+        sldIdLst = prs.part._element.get_or_add_sldIdLst()
+        built = []
+        for i in range(len(slides)):
+            before = len(sldIdLst)
+            complete = True
+            if i in reuse:
+                reuse[i]()
+            else:
+                strategy, slide_data = plan[i]
+                strategy.add_slide(ctx, slide_data)
+                complete = not any(isinstance(assets.get(url), Exception) for url in strategy.image_urls(slide_data))
+            built.append(BuiltSlide(len(sldIdLst) - before, complete))
+        return built
+
 
-    def add_slide(self, prs, slide_data, config, **kwargs):
-        layout = slide_data.get("layout", enums.SlideLayout.title.value)
-        strategy = self.strategies.get(layout)
-        if not strategy:
-            raise ValueError(f"No strategy for layout: {layout}")
-        return strategy.add_slide(prs, slide_data, config, **kwargs)
\ No newline at end of file
+slide_generator = SlideGenerator()
@@ -0,0 +1,76 @@
+# backend/services/pptx_builder/registry.py
+"""
+Slide layout strategies, keyed by the "layout" field of a slide dict.
+
+A strategy is a class registered with @register("name"). It gets a
+SlideContext (the presentation, the template's manifest entry and the
+prefetched images) plus the slide dict, and fills one slide. Any module in
+services/pptx_builder/slides is imported on first use, so a new layout is
+one new module there; the dispatcher (generator.SlideGenerator) is not
+touched. Unknown layouts use the "default" strategy.
+"""
+from typing import Any, Dict, List, NamedTuple, Optional
+
+_strategies: Dict[str, "SlideStrategy"] = {}
+DEFAULT_LAYOUT = "default"
+
+
+class NewSlide(NamedTuple):
+    slide: Any
+    title: Optional[Any]        # title placeholder (idx 0), if the layout has one
+    content: List[Any]          # every non-TITLE placeholder, in shape order
+    layout: dict                # the layout's manifest entry (geometry etc.)
+
+
+class SlideContext:
+    """What every strategy of one build shares: resolved once per deck."""
+
+    def __init__(self, prs, entry: dict, assets: Dict[str, Any]):
+        self.prs = prs
+        self.entry = entry
+        # image url -> path / bytes / the exception the fetch raised (services/pptx_builder/assets.py)
+        self.assets = assets
+
+    def new_slide(self, role: str) -> NewSlide:
+        """New slide on the template's layout for `role`, placeholders picked by manifest position."""
+        layout = self.entry["layouts"][self.entry["roles"][role]]
+        slide = self.prs.slides.add_slide(self.prs.slide_layouts[layout["index"]])
+        # a new slide holds exactly the layout's cloned placeholders, in manifest order
+        shapes = list(slide.shapes)
+        title = shapes[layout["title"]] if layout["title"] is not None else None
+        return NewSlide(slide, title, [shapes[pos] for pos in layout["content"]], layout)
+
+
+class SlideStrategy:
+    # template layout role (see services/template_manifest.py)
+    role = DEFAULT_LAYOUT
+
+    def image_urls(self, slide_data: dict) -> List[str]:
+        """Images this slide needs, fetched for the whole deck before any slide is built."""
+        return []
+
+    def add_slide(self, ctx: SlideContext, slide_data: dict):
+        raise NotImplementedError
+
+
+def register(layout: str):
+    def decorator(cls):
+        _strategies[layout] = cls()
+        return cls
+    return decorator
+
+
+def _load() -> None:
+    if not _strategies:
+        # importing the package imports (and so registers) every strategy module
+        import services.pptx_builder.slides  # noqa: F401
+
+
+def strategy_for(layout: Optional[str]) -> SlideStrategy:
+    _load()
+    return _strategies.get(layout) or _strategies[DEFAULT_LAYOUT]
+
+
+def layouts() -> List[str]:
+    _load()
+    return sorted(_strategies)
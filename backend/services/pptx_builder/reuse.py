@@ -0,0 +1,132 @@
+# backend/services/pptx_builder/reuse.py
+"""
+Slides copied from a previous build of the same deck.
+
+PreviousDeck opens the last .pptx built for a deck (services/pptx_decks.py)
+and adds some of its slides to a new Presentation opened on the same
+template: the slide XML is taken over as an opaque blob (never parsed),
+its relationships are re-pointed at the new package's layout parts, and
+the pictures it shows are copied from the old package as they are. The
+new deck is then saved by python-pptx as usual, so presentation.xml, the
+slide ids, the content types and the slide part names come out as if
+every slide had been built.
+
+Only valid when both packages come from the same template file: anything
+a copied slide points at is either one of the template's parts (same name
+in both) or a leaf part of its own (media). Anything else raises
+NotReusable and the caller builds the deck from scratch.
+"""
+import re
+import zipfile
+
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.constants import RELATIONSHIP_TARGET_MODE as RTM
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.oxml import CT_Relationships
+from pptx.opc.package import Part, PartFactory, _ContentTypeMap
+from pptx.opc.packuri import PackURI
+from pptx.oxml import parse_xml
+from pptx.parts.image import ImagePart
+
+_NUMBERED = re.compile(r"\d+(\.\w+)$")
+
+
+class NotReusable(Exception):
+    """The previous package can't be patched; build the whole deck."""
+
+
+class PreviousDeck:
+    def __init__(self, path: str, prs):
+        self.prs = prs
+        self._zip = zipfile.ZipFile(path)
+        self._content_types = _ContentTypeMap.from_xml(self._zip.read("[Content_Types].xml"))
+        package = prs.part.package
+        # the template's own parts, before any slide is added (slides may add media under any free name)
+        self._base = {part.partname: part for part in package.iter_parts()}
+        # old partname -> part the copied slides point at (a part copied from the old package,
+        # or the same picture a rebuilt slide added)
+        self._copied = {}
+        self._own = []
+
+    def _read(self, partname: str) -> bytes:
+        try:
+            return self._zip.read(partname[1:])
+        except KeyError:
+            raise NotReusable(f"{partname} is missing from the previous build")
+
+    def _rels(self, partname: PackURI) -> CT_Relationships:
+        name = partname.rels_uri[1:]
+        if name not in self._zip.NameToInfo:
+            return CT_Relationships.new()
+        return parse_xml(self._zip.read(name))
+
+    def _target(self, partname: PackURI):
+        part = self._base.get(partname) or self._copied.get(partname)
+        if part is not None:
+            return part
+        if partname.rels_uri[1:] in self._zip.NameToInfo:
+            raise NotReusable(f"{partname} has relationships of its own")
+        try:
+            content_type = self._content_types[partname]
+        except KeyError:
+            raise NotReusable(f"no content type for {partname}")
+        package = self.prs.part.package
+        part = PartFactory(partname, content_type, package, self._read(partname))
+        # a rebuilt slide may have added the same picture already
+        same = package._image_parts._find_by_sha1(part.sha1) if isinstance(part, ImagePart) else None
+        if same is None:
+            self._own.append(part)
+        self._copied[partname] = same or part
+        return self._copied[partname]
+
+    def copy_slides(self, first: int, count: int) -> None:
+        """Append the old slides `first` .. `first + count - 1` (1-based, as in slideN.xml)."""
+        package = self.prs.part.package
+        sldIdLst = self.prs.part._element.get_or_add_sldIdLst()
+        for number in range(first, first + count):
+            old_partname = PackURI(f"/ppt/slides/slide{number}.xml")
+            xml_rels = self._rels(old_partname)
+            targets = {}
+            for rel in xml_rels.relationship_lst:
+                if rel.targetMode != RTM.EXTERNAL:
+                    target = PackURI.from_rel_ref(old_partname.baseURI, rel.target_ref)
+                    targets[target] = self._target(target)
+            # named like python-pptx's next slide; every slide is renamed by position on save
+            partname = PackURI(f"/ppt/slides/slide{len(sldIdLst) + 1}.xml")
+            slide_part = Part(partname, CT.PML_SLIDE, package, self._read(old_partname))
+            slide_part.load_rels_from_xml(xml_rels, targets)
+            # a new part can't be related already: skip relate_to()'s search of every rel, and
+            # add_sldId()'s scan of every id (ids only grow, the last one is the largest)
+            rId = self.prs.part.rels._add_relationship(RT.SLIDE, slide_part)
+            sldIdLst._add_sldId(id=sldIdLst[-1].id + 1 if len(sldIdLst) else 256, rId=rId)
+
+    def finish(self) -> None:
+        """
+        Rename copied parts whose name a newly built slide took meanwhile (a
+        picture added before the copy that already used image3.png), and put
+        the slide part names in order.
+        """
+        package = self.prs.part.package
+        copied = set(map(id, self._own))
+        names = {}
+        for part in package.iter_parts():
+            names.setdefault(part.partname, []).append(part)
+        for partname, parts in names.items():
+            if len(parts) < 2:
+                continue
+            if not _NUMBERED.search(partname):
+                raise NotReusable(f"two parts named {partname}")
+            for part in parts:
+                if id(part) in copied:
+                    part.partname = package.next_partname(_NUMBERED.sub(r"%d\1", partname))
+        # renames every slide part after its position
+        self.prs.slides
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def __enter__(self) -> "PreviousDeck":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1 +1,6 @@
- 
\ No newline at end of file
+# every module here registers its strategies (services/pptx_builder/registry.py)
+import importlib
+import pkgutil
+
+for _module in pkgutil.iter_modules(__path__):
+    importlib.import_module(f"{__name__}.{_module.name}")
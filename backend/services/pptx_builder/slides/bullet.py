@@ -1,12 +1,17 @@
-from services.pptx_builder.utils import set_slide_title_and_style
-
-class BulletSlideStrategy:
-    def add_slide(self, prs, slide_data, config, **kwargs):
-        slide = prs.slides.add_slide(prs.slide_layouts[1])
-        set_slide_title_and_style(slide, slide_data, config.get("background_color", "#FFFFFF"), config.get("font_name", "Arial"), config.get("font_color", "#000000"))
-        body = slide.placeholders[1].text_frame
-        for bullet in slide_data.get("bullets", []):
-            p = body.add_paragraph()
-            p.text = bullet
-            p.level = 0
-        return slide 
\ No newline at end of file
+from services.pptx_builder.registry import SlideStrategy, register
+from services.pptx_builder.text import write_paragraphs
+
+
+@register("bullet")
+class BulletSlideStrategy(SlideStrategy):
+    role = "bullet"
+
+    def add_slide(self, ctx, slide_data):
+        new = ctx.new_slide(self.role)
+        if new.title is not None:
+            new.title.text = slide_data.get("title", "") or ""
+
+        bullets = slide_data.get("bullets", []) or []
+        if new.content:
+            write_paragraphs(new.content[0].text_frame, bullets)
+        return new.slide
@@ -0,0 +1,13 @@
+from services.pptx_builder.registry import DEFAULT_LAYOUT, SlideStrategy, register
+
+
+@register(DEFAULT_LAYOUT)
+class DefaultSlideStrategy(SlideStrategy):
+    """Unknown layouts: a title-only slide on the first layout."""
+    role = DEFAULT_LAYOUT
+
+    def add_slide(self, ctx, slide_data):
+        new = ctx.new_slide(self.role)
+        if new.title is not None:
+            new.title.text = slide_data.get("title", "") or "Slide"
+        return new.slide
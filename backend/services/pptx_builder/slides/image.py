@@ -1,42 +1,92 @@
-from pptx.util import Inches
-from pptx.enum.shapes import MSO_SHAPE
-import requests
+import logging
 from io import BytesIO
-from services.pptx_builder.utils import set_slide_title_and_style
-
-class ImageSlideStrategy:
-    def add_slide(self, prs, slide_data, config, **kwargs):
-        slide = prs.slides.add_slide(prs.slide_layouts[5])
-        set_slide_title_and_style(slide, slide_data, config.get("background_color", "#FFFFFF"), config.get("font_name", "Arial"), config.get("font_color", "#000000"))
-        image_url = slide_data.get("image_url")
-        logger = kwargs.get("logger")
-        if image_url:
+
+from services.pptx_builder.assets import clean_url
+from services.pptx_builder.registry import SlideStrategy, register
+from services.pptx_builder.text import write_paragraphs
+
+logger = logging.getLogger(__name__)
+
+
+def _split_into_paragraphs(text: str, max_sentences_per_para: int = 3):
+    """Split a long caption into smaller paragraphs (by sentence) for better layout."""
+    if not text:
+        return []
+    parts = [p.strip() for p in text.replace("\n", " ").split(".") if p.strip()]
+    paragraphs = []
+    buf = []
+    for i, p in enumerate(parts):
+        buf.append(p + ".")
+        if (i + 1) % max_sentences_per_para == 0:
+            paragraphs.append(" ".join(buf).strip())
+            buf = []
+    if buf:
+        paragraphs.append(" ".join(buf).strip())
+    return paragraphs
+
+
+@register("image")
+class ImageSlideStrategy(SlideStrategy):
+    """Picture in the first content placeholder, caption in the second (two-content layout)."""
+    role = "image"
+
+    def image_urls(self, slide_data):
+        url = clean_url(slide_data.get("image_url"))
+        return [url] if url else []
+
+    def add_slide(self, ctx, slide_data):
+        new = ctx.new_slide(self.role)
+        prs, slide = ctx.prs, new.slide
+        title_text = slide_data.get("title", "")
+        if new.title is not None:
+            new.title.text = title_text or ""
+
+        img_placeholder = new.content[0] if len(new.content) >= 1 else None
+        text_placeholder = new.content[1] if len(new.content) >= 2 else None
+
+        img_url = clean_url(slide_data.get("image_url"))
+        caption = slide_data.get("caption") or slide_data.get("description") or ""
+        text_to_use = caption or title_text or ""
+
+        # IMAGE (fetched before the build started)
+        if img_url:
             try:
-                response = requests.get(image_url)
-                image_stream = BytesIO(response.content)
-                slide.shapes.add_picture(
-                    image_stream,
-                    Inches(2), Inches(2),
-                    width=Inches(6)
-                )
-            except Exception as e:
-                if logger:
-                    logger.error(f"Failed to add image: {str(e)}")
+                image = ctx.assets[img_url]
+                if isinstance(image, Exception):
+                    raise image
+                if isinstance(image, bytes):
+                    image = BytesIO(image)
+
+                if img_placeholder is not None:
+                    # geometry resolved (layout -> master) when the manifest was built
+                    geometry = new.layout["placeholders"][new.layout["content"][0]]
+                    slide.shapes.add_picture(
+                        image, geometry["left"], geometry["top"], width=geometry["width"], height=geometry["height"]
+                    )
+                    try:
+                        img_placeholder.text = ""
+                    except Exception:
+                        pass
                 else:
-                    print(f"Failed to add image: {str(e)}")
-                slide.shapes.add_shape(
-                    MSO_SHAPE.RECTANGLE,
-                    Inches(2), Inches(2),
-                    Inches(6), Inches(4)
-                )
+                    left = int(prs.slide_width * 0.08)
+                    top = int(prs.slide_height * 0.25)
+                    width = int(prs.slide_width * 0.4)
+                    slide.shapes.add_picture(image, left, top, width=width)
+
+            except Exception as e:
+                text_to_use = f"{caption or title_text or ''}\n\n(Image failed to load: {img_url})"
+                logger.warning("Image download/insert failed for %s: %s", img_url, e)
+
+        # TEXT
+        paragraphs = _split_into_paragraphs(text_to_use, max_sentences_per_para=2)
+
+        if text_placeholder is not None:
+            write_paragraphs(text_placeholder.text_frame, paragraphs or [text_to_use])
         else:
-            if logger:
-                logger.warning(f"No image URL provided for slide: {slide_data.get('title')}")
-            else:
-                print(f"No image URL provided for slide: {slide_data.get('title')}")
-            slide.shapes.add_shape(
-                MSO_SHAPE.RECTANGLE,
-                Inches(2), Inches(2),
-                Inches(6), Inches(4)
-            )
-        return slide 
\ No newline at end of file
+            left = int(prs.slide_width * 0.55)
+            top = int(prs.slide_height * 0.25)
+            width = int(prs.slide_width * 0.35)
+            height = int(prs.slide_height * 0.5)
+            caption_box = slide.shapes.add_textbox(left, top, width, height)
+            write_paragraphs(caption_box.text_frame, paragraphs or [text_to_use])
+        return slide
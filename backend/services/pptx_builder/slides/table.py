@@ -0,0 +1,166 @@
+"""
+Table slides: {"layout": "table", "title": ..., "columns": [...], "rows": [[...], ...]}
+
+The whole <p:graphicFrame> / <a:tbl> (grid, header row, every cell) is
+built as one XML string and parsed once, instead of python-pptx's
+add_table() + cell.text per cell. It takes the place and size of the
+layout's content placeholder.
+
+Row heights are estimated from the text (characters per line at the table
+font size, explicit line breaks); rows that don't fit go on continuation
+slides with the header row repeated and "(cont.)" after the title.
+"""
+import math
+from typing import List
+
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
+
+from services.pptx_builder.registry import SlideStrategy, register
+from services.pptx_builder.text import runs_xml
+
+EMU_PER_PT = 12700
+FONT_PT = 12
+# narrower columns: smaller text
+FONT_PT_WIDE = 10
+WIDE_COLUMNS = 6
+# python-pptx's default table style (Medium Style 2 - Accent 1), built into PowerPoint
+TABLE_STYLE_ID = "{5C22544A-7EE6-4342-B048-85BDC9FD1C3A}"
+GRAPHIC_DATA_URI_TABLE = "http://schemas.openxmlformats.org/drawingml/2006/table"
+
+# default cell insets (tcPr marL / marR, marT / marB)
+_MARGIN_X = 91440
+_MARGIN_Y = 45720
+_LINE_SPACING = 1.2
+# average glyph width as a fraction of the font size
+_CHAR_WIDTH = 0.5
+# a column's share of the width follows its longest cell, within these bounds (characters)
+_MIN_WEIGHT, _MAX_WEIGHT = 4, 40
+
+
+def _cell(value) -> str:
+    return "" if value is None else str(value)
+
+
+def normalise(columns, rows) -> tuple:
+    """(header, rows) as strings, every row padded / cut to the header width."""
+    header = [_cell(c) for c in (columns or [])]
+    body = [[_cell(v) for v in row] for row in (rows or []) if isinstance(row, (list, tuple))]
+    width = len(header) or max((len(row) for row in body), default=0)
+    if not header:
+        header = [""] * width
+    return header, [(row + [""] * width)[:width] for row in body]
+
+
+def column_widths(header: List[str], rows: List[List[str]], width: int) -> List[int]:
+    weights = []
+    for col in range(len(header)):
+        longest = max((len(line) for row in [header, *rows] for line in row[col].split("\n")), default=0)
+        weights.append(min(max(longest, _MIN_WEIGHT), _MAX_WEIGHT))
+    total = sum(weights)
+    widths = [width * w // total for w in weights]
+    # last column absorbs the rounding
+    widths[-1] = width - sum(widths[:-1])
+    return widths
+
+
+def row_height(cells: List[str], widths: List[int], font_pt: int) -> int:
+    char_emu = font_pt * _CHAR_WIDTH * EMU_PER_PT
+    lines = 1
+    for text, width in zip(cells, widths):
+        per_line = max(int((width - 2 * _MARGIN_X) / char_emu), 1)
+        lines = max(lines, sum(max(math.ceil(len(line) / per_line), 1) for line in text.split("\n")))
+    return int(lines * font_pt * _LINE_SPACING * EMU_PER_PT) + 2 * _MARGIN_Y
+
+
+def paginate(header_h: int, heights: List[int], available: int) -> List[range]:
+    """Consecutive row ranges that fit under the header; at least one row per slide."""
+    pages, start, used = [], 0, header_h
+    for i, h in enumerate(heights):
+        if i > start and used + h > available:
+            pages.append(range(start, i))
+            start, used = i, header_h
+        used += h
+    pages.append(range(start, len(heights)))
+    return pages
+
+
+def _row_xml(cells: List[str], height: int, rpr: str, end: str) -> str:
+    tcs = []
+    for text in cells:
+        # like cell.text: one paragraph per line
+        paragraphs = "".join(
+            f"<a:p>{runs_xml(line, rpr)}</a:p>" if line else f"<a:p>{end}</a:p>" for line in text.split("\n")
+        )
+        tcs.append(f"<a:tc><a:txBody><a:bodyPr/><a:lstStyle/>{paragraphs}</a:txBody><a:tcPr/></a:tc>")
+    return f'<a:tr h="{height}">{"".join(tcs)}</a:tr>'
+
+
+def table_frame_xml(shape_id: int, x: int, y: int, widths: List[int], rows_xml: str, height: int) -> str:
+    grid = "".join(f'<a:gridCol w="{w}"/>' for w in widths)
+    return (
+        f"<p:graphicFrame {nsdecls('a', 'p')}>"
+        f'<p:nvGraphicFramePr><p:cNvPr id="{shape_id}" name="Table {shape_id - 1}"/>'
+        f'<p:cNvGraphicFramePr><a:graphicFrameLocks noGrp="1"/></p:cNvGraphicFramePr><p:nvPr/></p:nvGraphicFramePr>'
+        f'<p:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{sum(widths)}" cy="{height}"/></p:xfrm>'
+        f'<a:graphic><a:graphicData uri="{GRAPHIC_DATA_URI_TABLE}">'
+        f'<a:tbl><a:tblPr firstRow="1" bandRow="1"><a:tableStyleId>{TABLE_STYLE_ID}</a:tableStyleId></a:tblPr>'
+        f"<a:tblGrid>{grid}</a:tblGrid>{rows_xml}</a:tbl>"
+        f"</a:graphicData></a:graphic></p:graphicFrame>"
+    )
+
+
+@register("table")
+class TableSlideStrategy(SlideStrategy):
+    role = "table"
+
+    def add_slide(self, ctx, slide_data):
+        header, rows = normalise(slide_data.get("columns"), slide_data.get("rows"))
+        title_text = slide_data.get("title", "") or ""
+        if not header:
+            new = ctx.new_slide(self.role)
+            self._take_frame(ctx, new)
+            if new.title is not None:
+                new.title.text = title_text
+            return new.slide
+
+        probe = ctx.new_slide(self.role)
+        x, y, width, available = self._take_frame(ctx, probe)
+        font_pt = FONT_PT_WIDE if len(header) >= WIDE_COLUMNS else FONT_PT
+        widths = column_widths(header, rows, width)
+        header_h = row_height(header, widths, font_pt)
+        heights = [row_height(row, widths, font_pt) for row in rows]
+        rpr = f'<a:rPr lang="en-US" sz="{font_pt * 100}" dirty="0"/>'
+        end = f'<a:endParaRPr lang="en-US" sz="{font_pt * 100}" dirty="0"/>'
+        header_xml = _row_xml(header, header_h, rpr, end)
+
+        slide = None
+        for page, span in enumerate(paginate(header_h, heights, available)):
+            new = probe if page == 0 else ctx.new_slide(self.role)
+            if page:
+                self._take_frame(ctx, new)
+            if new.title is not None:
+                new.title.text = f"{title_text} (cont.)" if page else title_text
+            rows_xml = header_xml + "".join(_row_xml(rows[i], heights[i], rpr, end) for i in span)
+            height = header_h + sum(heights[i] for i in span)
+            shapes = new.slide.shapes
+            frame = parse_xml(table_frame_xml(shapes._next_shape_id, x, y, widths, rows_xml, height))
+            shapes._spTree.insert_element_before(frame, "p:extLst")
+            slide = new.slide
+        return slide
+
+    @staticmethod
+    def _take_frame(ctx, new):
+        """Drop the content placeholder; (x, y, width, height) for the table."""
+        if new.content:
+            new.content[0]._element.getparent().remove(new.content[0]._element)
+            geometry = new.layout["placeholders"][new.layout["content"][0]]
+            if None not in (geometry["left"], geometry["top"], geometry["width"], geometry["height"]):
+                return geometry["left"], geometry["top"], geometry["width"], geometry["height"]
+        prs = ctx.prs
+        return (
+            int(prs.slide_width * 0.08),
+            int(prs.slide_height * 0.25),
+            int(prs.slide_width * 0.84),
+            int(prs.slide_height * 0.65),
+        )
@@ -0,0 +1,69 @@
+# backend/services/pptx_builder/text.py
+"""
+Bulk text frame writer.
+
+write_paragraphs(text_frame, texts) gives the same XML as
+
+    tf.clear()
+    tf.paragraphs[0].text = texts[0]
+    for text in texts[1:]:
+        tf.add_paragraph().text = text
+
+but builds the <a:p> elements as one XML string parsed by a single lxml
+call, instead of a paragraph proxy, a run proxy and several element
+lookups per line. The first paragraph keeps its <a:pPr> / <a:endParaRPr>
+(what clear() preserves); the others are bare <a:p>, so every line keeps
+the formatting the placeholder inherits from the layout and master.
+
+Text is split and escaped the way python-pptx does it: "\\n" and "\\v"
+become <a:br/> between runs, empty runs are left out and control
+characters are written as _xHHHH_.
+"""
+import re
+from typing import Iterable
+from xml.sax.saxutils import escape
+
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+
+_BREAKS = re.compile("\n|\v")
+_CTRL = re.compile(r"([\x00-\x08\x0B-\x1F])")
+_CONTENT = (qn("a:r"), qn("a:br"), qn("a:fld"))
+
+
+def runs_xml(text: str, rpr: str = "") -> str:
+    """<a:r> / <a:br/> markup for one paragraph's text; `rpr` (an <a:rPr/>) goes into every run."""
+    parts = []
+    for idx, run in enumerate(_BREAKS.split(text)):
+        # breaks only between runs, runs that would be empty are not added
+        if idx > 0:
+            parts.append("<a:br/>")
+        if run:
+            run = _CTRL.sub(lambda m: "_x%04X_" % ord(m.group(1)), run)
+            parts.append(f"<a:r>{rpr}<a:t>{escape(run)}</a:t></a:r>")
+    return "".join(parts)
+
+
+def write_paragraphs(text_frame, texts: Iterable[str]) -> None:
+    """Replace the text frame's paragraphs with one paragraph per string."""
+    texts = list(texts) or [""]
+    txBody = text_frame._txBody
+    paragraphs = txBody.p_lst
+    first = paragraphs[0]
+    for p in paragraphs[1:]:
+        txBody.remove(p)
+    for child in list(first):
+        if child.tag in _CONTENT:
+            first.remove(child)
+
+    # one parse for every new run and paragraph: <a:p> 0 is a carrier for the first paragraph's runs
+    body = "".join(f"<a:p>{runs_xml(text)}</a:p>" for text in texts)
+    carrier, *new_paragraphs = parse_xml(f"<a:txBody {nsdecls('a')}>{body}</a:txBody>")
+
+    end = first.find(qn("a:endParaRPr"))
+    for child in list(carrier):
+        if end is not None:
+            end.addprevious(child)
+        else:
+            first.append(child)
+    txBody.extend(new_paragraphs)
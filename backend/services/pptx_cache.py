@@ -0,0 +1,198 @@
+# backend/services/pptx_cache.py
+"""
+Output cache for PPTX downloads (GET /api/v1/presentations/{id}/download).
+
+Each deck keeps its own last build (services/pptx_decks.py); this cache is
+keyed by content, not by deck, so identical decks share one file. A
+finished deck is only written to the cache directory when it is likely to
+be asked for again:
+
+- the key is a hash of the slides, the configuration and the template file
+  (path, size, mtime), so any edit gives a new key and nothing needs
+  invalidating
+- a key is admitted on its second build within the doorkeeper window; a deck
+  downloaded once never costs a disk write
+- entries live PPTX_CACHE_TTL_SECONDS (remote images are only keyed by URL)
+- at most PPTX_CACHE_BYTES on disk, least recently used evicted first
+
+Files are written under a unique temp name and renamed into place, so
+concurrent builds of the same deck never see a half-written file. Files left
+by a previous process are adopted at start-up.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from core.config import Config
+from services.pptx_generator import PPT_STORAGE_DIR, template_path
+
+logger = logging.getLogger(__name__)
+
+CHUNK_BYTES = 64 * 1024
+# keys remembered for admission (a key only, not the file)
+_DOORKEEPER_KEYS = 4096
+
+
+def template_stamp(config: dict) -> str:
+    """The deck's template file as path:size:mtime ("" for python-pptx's default)."""
+    template = template_path(config)
+    if not template:
+        return ""
+    stat = os.stat(template)
+    return f"{template}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def key_for(slides: list, config: dict) -> str:
+    digest = hashlib.sha256(
+        json.dumps({"slides": slides, "config": config}, sort_keys=True, default=str).encode("utf-8")
+    )
+    digest.update(template_stamp(config).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class PptxOutputCache:
+    def __init__(self, directory: Path, max_bytes: int, ttl: float):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # key -> (size, stored_at wall clock)
+        self._entries: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        if self.max_bytes > 0:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._adopt()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.pptx"
+
+    def _adopt(self) -> None:
+        files = []
+        for path in self.directory.glob("*.pptx"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, path.stem, stat.st_size))
+        with self._lock:
+            for stored_at, key, size in sorted(files):
+                self._entries[key] = (size, stored_at)
+                self._size += size
+            self._evict()
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        """The cached deck opened for reading, or None."""
+        if self.max_bytes <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] + self.ttl <= time.time():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            try:
+                # opened under the lock: eviction can't unlink it first
+                fileobj = open(self._path(key), "rb")
+            except OSError:
+                self._drop(key)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return fileobj
+
+    def offer(self, key: str, fileobj: BinaryIO) -> bool:
+        """
+        Keep a copy of a freshly built deck if it is admitted. fileobj is read
+        from the start and left at position 0. True if it was stored.
+        """
+        if self.max_bytes <= 0:
+            return False
+        with self._lock:
+            if key in self._entries:
+                return False
+            if key not in self._seen:
+                # first sighting: remember the key only
+                self._seen[key] = None
+                while len(self._seen) > _DOORKEEPER_KEYS:
+                    self._seen.popitem(last=False)
+                return False
+
+        fileobj.seek(0)
+        try:
+            with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as tmp:
+                shutil.copyfileobj(fileobj, tmp, CHUNK_BYTES)
+                size = tmp.tell()
+            if size > self.max_bytes:
+                os.unlink(tmp.name)
+                return False
+            os.replace(tmp.name, self._path(key))
+        except OSError:
+            logger.exception("Could not store PPTX %s in the output cache", key)
+            return False
+        finally:
+            fileobj.seek(0)
+
+        with self._lock:
+            self._seen.pop(key, None)
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[0]
+            self._entries[key] = (size, time.time())
+            self._size += size
+            self._evict()
+        return True
+
+    def _drop(self, key: str) -> None:
+        size, _ = self._entries.pop(key)
+        self._size -= size
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and self._entries:
+            self._drop(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+            self._seen.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._size, "hits": self.hits, "misses": self.misses}
+
+
+def iter_file(fileobj: BinaryIO) -> Iterator[bytes]:
+    """Chunks of an open file, closed when done (sync: Starlette iterates it in the threadpool)."""
+    try:
+        while True:
+            chunk = fileobj.read(CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        fileobj.close()
+
+
+pptx_cache = PptxOutputCache(
+    directory=Path(Config.PPTX_CACHE_DIR) if Config.PPTX_CACHE_DIR else PPT_STORAGE_DIR / "cache" / "pptx",
+    max_bytes=Config.PPTX_CACHE_BYTES,
+    ttl=Config.PPTX_CACHE_TTL_SECONDS,
+)
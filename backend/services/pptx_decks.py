@@ -0,0 +1,282 @@
+# backend/services/pptx_decks.py
+"""
+Last build of every deck, so a download after an edit re-renders only the
+slides that changed (GET /api/v1/presentations/{id}/download).
+
+Next to each deck's last .pptx a small JSON state records the build's key
+(pptx_cache.key_for), its base (configuration + template file) and, per
+slide, a fingerprint of the slide dict and how many slides it produced.
+The next render of the deck:
+
+- same key: the last build is streamed as is
+- same base: slides whose fingerprint is in the last build are copied
+  from it (services/pptx_builder/reuse.py); only the others are built and
+  only their images fetched, so the cost follows the edit, not the deck
+- otherwise (new theme, template file changed, no usable last build) the
+  whole deck is built
+
+Files are {id}.json and {id}-{key prefix}.pptx. The .pptx is renamed into
+place before the state that points at it, and renders of one deck are
+serialised, so a state never names a half-written file. Beyond
+PPTX_DECKS_BYTES the least recently used decks are dropped.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional
+
+from core.config import Config
+from services.ooxml_package import save_pptx
+from services.pptx_builder.generator import slide_generator
+from services.pptx_builder.reuse import NotReusable, PreviousDeck
+from services.pptx_cache import template_stamp
+from services.pptx_generator import PPT_STORAGE_DIR, open_template, render_pptx
+
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 1
+
+
+def _digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def fingerprint(slide: dict) -> str:
+    """Same fingerprint, same slide XML (remote images are only keyed by URL, as in pptx_cache)."""
+    return _digest(slide)
+
+
+def base_key(config: dict) -> str:
+    return _digest({"config": config, "template": template_stamp(config)})
+
+
+class _DeckLock:
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # holders + waiters
+        self.users = 0
+
+
+class DeckStore:
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._deck_locks: Dict[int, _DeckLock] = {}
+        # presentation_id -> key being rendered right now
+        self._rendering: Dict[int, str] = {}
+        # presentation_id -> size of its last build, least recently used first
+        self._sizes: "OrderedDict[int, int]" = OrderedDict()
+        self._size = 0
+        self.patched = 0
+        self.full = 0
+        if self.enabled:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._adopt()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _state_path(self, presentation_id: int) -> Path:
+        return self.directory / f"{presentation_id}.json"
+
+    def _read_state(self, presentation_id: int) -> Optional[dict]:
+        try:
+            with open(self._state_path(presentation_id), encoding="utf-8") as fh:
+                state = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        return state if isinstance(state, dict) and state.get("version") == STATE_VERSION else None
+
+    def _adopt(self) -> None:
+        decks = []
+        for path in self.directory.glob("*.json"):
+            try:
+                presentation_id = int(path.stem)
+                state = self._read_state(presentation_id)
+                decks.append((path.stat().st_mtime, presentation_id, (self.directory / state["file"]).stat().st_size))
+            except (ValueError, TypeError, KeyError, OSError):
+                continue
+        with self._lock:
+            for _, presentation_id, size in sorted(decks):
+                self._sizes[presentation_id] = size
+                self._size += size
+
+    @contextmanager
+    def deck_lock(self, presentation_id: int, blocking: bool = True) -> Iterator[bool]:
+        """
+        Serialise the work on one deck; yields whether the lock was taken
+        (always True when blocking). The lock is dropped again once nobody
+        holds or waits for it, so there is no entry per deck ever rendered.
+        """
+        with self._lock:
+            entry = self._deck_locks.setdefault(presentation_id, _DeckLock())
+            entry.users += 1
+        acquired = entry.lock.acquire(blocking)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                entry.lock.release()
+            with self._lock:
+                entry.users -= 1
+                if not entry.users:
+                    del self._deck_locks[presentation_id]
+
+    def open(self, presentation_id: int, key: str) -> Optional[BinaryIO]:
+        """The deck's last build if it is `key`, opened for reading; else None."""
+        if not self.enabled:
+            return None
+        state = self._read_state(presentation_id)
+        if state is None or state.get("key") != key:
+            return None
+        try:
+            fileobj = open(self.directory / state["file"], "rb")
+        except OSError:
+            return None
+        with self._lock:
+            if presentation_id in self._sizes:
+                self._sizes.move_to_end(presentation_id)
+        return fileobj
+
+    def join(self, presentation_id: int, key: str) -> Optional[BinaryIO]:
+        """
+        If `key` is being rendered for the deck right now (a pre-render, another
+        download), wait for that render and return its result; else None.
+        """
+        with self._lock:
+            if self._rendering.get(presentation_id) != key:
+                return None
+        with self.deck_lock(presentation_id):
+            return self.open(presentation_id, key)
+
+    def render(self, presentation_id: int, slides: list, config: dict, key: str) -> BinaryIO:
+        """The deck built from its last build where possible, opened at position 0. Caller closes it."""
+        if not self.enabled:
+            return render_pptx(presentation_id, slides, config)
+
+        with self.deck_lock(presentation_id):
+            # a render of the same version may have finished while this one waited
+            fileobj = self.open(presentation_id, key)
+            if fileobj is not None:
+                return fileobj
+            with self._lock:
+                self._rendering[presentation_id] = key
+            try:
+                return self._render(presentation_id, slides, config, key)
+            finally:
+                with self._lock:
+                    self._rendering.pop(presentation_id, None)
+
+    def _render(self, presentation_id: int, slides: list, config: dict, key: str) -> BinaryIO:
+        fingerprints = [fingerprint(slide) for slide in slides]
+        base = base_key(config)
+        previous = self._read_state(presentation_id)
+        prs = None
+        if previous is not None and previous.get("base") == base:
+            try:
+                prs, built = self._patch(presentation_id, previous, slides, config, fingerprints)
+            except (NotReusable, OSError, KeyError, zipfile.BadZipFile) as e:
+                logger.warning("Deck %s: last build not reusable (%s), building every slide", presentation_id, e)
+        if prs is None:
+            prs, entry = open_template(config)
+            built = slide_generator.add_slides(prs, entry, slides)
+            self.full += 1
+
+        state = {
+            "version": STATE_VERSION,
+            "key": key,
+            "base": base,
+            "file": f"{presentation_id}-{key[:16]}.pptx",
+            # a slide missing a picture (fetch failed) is built again next time
+            "slides": [[fp if b.complete else None, b.count] for fp, b in zip(fingerprints, built)],
+        }
+        try:
+            return self._store(presentation_id, prs, state, previous)
+        except OSError:
+            logger.exception("Could not keep the build of deck %s", presentation_id)
+            out = tempfile.SpooledTemporaryFile(max_size=Config.PPTX_SPOOL_BYTES)
+            save_pptx(prs, out)
+            out.seek(0)
+            return out
+
+    def _patch(self, presentation_id: int, previous: dict, slides: list, config: dict, fingerprints: list):
+        # fingerprint -> (first slide number, slide count) in the last build
+        copies, number = {}, 1
+        for fp, count in previous["slides"]:
+            if fp is not None:
+                copies.setdefault(fp, (number, count))
+            number += count
+
+        prs, entry = open_template(config)
+        with PreviousDeck(str(self.directory / previous["file"]), prs) as last:
+            reuse = {i: partial(last.copy_slides, *copies[fp]) for i, fp in enumerate(fingerprints) if fp in copies}
+            result = slide_generator.add_slides(prs, entry, slides, reuse)
+            last.finish()
+        self.patched += 1
+        logger.info("Deck %s: rebuilt %d of %d slides", presentation_id, len(slides) - len(reuse), len(slides))
+        return prs, result
+
+    def _store(self, presentation_id: int, prs, state: dict, previous: Optional[dict]) -> BinaryIO:
+        path = self.directory / state["file"]
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as tmp:
+            save_pptx(prs, tmp)
+            size = tmp.tell()
+        os.replace(tmp.name, path)
+        fileobj = open(path, "rb")
+
+        with tempfile.NamedTemporaryFile("w", dir=self.directory, suffix=".tmp", delete=False, encoding="utf-8") as tmp:
+            json.dump(state, tmp)
+        os.replace(tmp.name, self._state_path(presentation_id))
+        if previous is not None and previous.get("file") != state["file"]:
+            try:
+                (self.directory / previous["file"]).unlink()
+            except OSError:
+                pass
+
+        with self._lock:
+            self._size += size - self._sizes.pop(presentation_id, 0)
+            self._sizes[presentation_id] = size
+        self._evict(keep=presentation_id)
+        return fileobj
+
+    def _evict(self, keep: int) -> None:
+        for presentation_id in list(self._sizes):
+            if self._size <= self.max_bytes:
+                break
+            if presentation_id == keep:
+                continue
+            with self.deck_lock(presentation_id, blocking=False) as locked:
+                # a deck being rendered right now is not dropped
+                if locked:
+                    self._drop(presentation_id)
+
+    def _drop(self, presentation_id: int) -> None:
+        for path in (self._state_path(presentation_id), *self.directory.glob(f"{presentation_id}-*.pptx")):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        with self._lock:
+            self._size -= self._sizes.pop(presentation_id, 0)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"decks": len(self._sizes), "bytes": self._size, "patched": self.patched, "full": self.full}
+
+
+deck_store = DeckStore(
+    directory=Path(Config.PPTX_DECKS_DIR) if Config.PPTX_DECKS_DIR else PPT_STORAGE_DIR / "cache" / "decks",
+    max_bytes=Config.PPTX_DECKS_BYTES,
+)
@@ -0,0 +1,144 @@
+# backend/services/prerender.py
+"""
+Write-behind PPTX renders after edits.
+
+Users download right after editing, so every edit of a deck (create,
+update, configure, slide edits) schedules a render of the new version
+PRERENDER_DELAY_SECONDS later, in the bulk render lane. An edit arriving
+within the delay replaces the pending version and pushes the render back:
+a burst of edits costs one render (with services/pptx_decks.py, usually
+of the changed slides only).
+
+The result lands in the deck store, so a download of that version is
+served from disk (DeckStore.open). A download arriving while it is being
+built waits for it (DeckStore.join) instead of building it a second time;
+one arriving while it is still queued takes it off the queue (claim) and
+builds it right away in the interactive lane.
+
+Routers hand over the deck they have just written (it is in their
+response anyway), so no database read happens here.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, NamedTuple, Optional
+
+from core.config import Config
+from services import scheduler
+from services.pptx_cache import key_for
+from services.pptx_decks import deck_store
+
+logger = logging.getLogger(__name__)
+
+
+class _Pending(NamedTuple):
+    due: float          # time.monotonic() deadline
+    owner_id: Any
+    version: int
+    key: str            # pptx_cache.key_for(slides, config)
+    slides: list
+    config: dict
+
+
+class Prerenderer:
+    def __init__(self, delay: float, workers: int):
+        self.delay = delay
+        self.workers = max(1, workers)
+        self._cond = threading.Condition()
+        # presentation_id -> latest version waiting for its deadline
+        self._pending: Dict[int, _Pending] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.scheduled = 0
+        self.collapsed = 0
+        self.claimed = 0
+        self.rendered = 0
+        self.skipped = 0
+        self.failed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.delay >= 0 and deck_store.enabled
+
+    def schedule(self, presentation_id: int, owner_id: Any, version: int, slides: list, config: dict) -> None:
+        """Render this version of the deck once it has gone `delay` seconds without another edit."""
+        if not self.enabled:
+            return
+        with self._cond:
+            pending = self._pending.get(presentation_id)
+            if pending is not None:
+                if pending.version > version:
+                    # edits committed in one order can be scheduled in the other
+                    return
+                self.collapsed += 1
+            config = config or {}
+            self._pending[presentation_id] = _Pending(
+                time.monotonic() + self.delay, owner_id, version, key_for(slides, config), slides, config
+            )
+            self.scheduled += 1
+            if self._thread is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="prerender")
+                self._thread = threading.Thread(target=self._dispatch, name="prerender-dispatch", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def claim(self, presentation_id: int, key: str) -> bool:
+        """
+        A download wants `key` now: take its queued render off the queue, the
+        download builds it right away in the interactive lane instead of
+        waiting out the delay. True if such a render was queued.
+        """
+        with self._cond:
+            pending = self._pending.get(presentation_id)
+            if pending is None or pending.key != key:
+                return False
+            del self._pending[presentation_id]
+            self.claimed += 1
+            return True
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                due = [pid for pid, pending in self._pending.items() if pending.due <= now]
+                if not due:
+                    deadline = min((pending.due for pending in self._pending.values()), default=None)
+                    self._cond.wait(None if deadline is None else deadline - now)
+                    continue
+                jobs = [(pid, self._pending.pop(pid)) for pid in due]
+            for presentation_id, pending in jobs:
+                self._pool.submit(self._render, presentation_id, pending)
+
+    def _render(self, presentation_id: int, pending: _Pending) -> None:
+        try:
+            pptx = deck_store.open(presentation_id, pending.key)
+            if pptx is not None:
+                # a download already built this version
+                outcome = "skipped"
+            else:
+                with scheduler.render_scheduler.slot(scheduler.BULK, pending.owner_id):
+                    pptx = deck_store.render(presentation_id, pending.slides, pending.config, pending.key)
+                outcome = "rendered"
+            pptx.close()
+        except Exception:
+            outcome = "failed"
+            logger.exception("Pre-render of deck %s (version %s) failed", presentation_id, pending.version)
+        # workers finish concurrently: counters only change under the lock
+        with self._cond:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "scheduled": self.scheduled,
+                "collapsed": self.collapsed,
+                "claimed": self.claimed,
+                "rendered": self.rendered,
+                "skipped": self.skipped,
+                "failed": self.failed,
+            }
+
+
+prerenderer = Prerenderer(delay=Config.PRERENDER_DELAY_SECONDS, workers=Config.PRERENDER_WORKERS)
@@ -0,0 +1,230 @@
+# backend/services/scheduler.py
+"""
+Priority lanes in front of Gemini calls and render jobs.
+
+Every model call / render acquires a slot from a LaneScheduler:
+
+- two lanes: "interactive" (single-section refine, single-slide edits,
+  downloads the user is waiting on) and "bulk" (full deck / full document
+  generation, background renders)
+- weighted fair sharing between lanes (stride scheduling on the weights)
+- per-user round robin inside a lane, so one user's batch can't starve others
+- bulk can never take the reserved interactive slots, so a refine only waits
+  for another *interactive* call, never for a long batch (with fewer slots
+  than reserve + 1, the reserve runs on top of the configured slots)
+
+Bulk jobs are preemptible at call boundaries: a full document generation is
+many model calls, and each one queues separately, so interactive work slips in
+between them.
+"""
+import contextvars
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from core.config import Config
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+LANES = (INTERACTIVE, BULK)
+
+# (lane, user_id) of the job running in the current thread / task
+_current_job: contextvars.ContextVar = contextvars.ContextVar(
+    "scheduler_job", default=(BULK, None)
+)
+
+
+@contextmanager
+def job(lane: str, user_id: Any = None):
+    """
+    Tag everything inside the block (model calls, renders) with a lane + user.
+
+        with scheduler.job(scheduler.INTERACTIVE, current_user.id):
+            refine_word_section_with_gemini(...)
+    """
+    if lane not in LANES:
+        raise ValueError(f"Unknown scheduler lane: {lane}")
+    token = _current_job.set((lane, user_id))
+    try:
+        yield
+    finally:
+        _current_job.reset(token)
+
+
+class _Ticket:
+    __slots__ = ("lane", "user_id", "granted", "enqueued_at")
+
+    def __init__(self, lane: str, user_id: Any):
+        self.lane = lane
+        self.user_id = user_id
+        self.granted = False
+        self.enqueued_at = time.monotonic()
+
+
+class _Lane:
+    def __init__(self, weight: int):
+        self.weight = max(1, weight)
+        # user_id -> deque of waiting tickets; order of keys = round-robin order
+        self.users: "OrderedDict[Any, deque]" = OrderedDict()
+        self.waiting = 0
+        self.running = 0
+        # stride scheduling "virtual time"
+        self.pass_value = 0.0
+
+    def push(self, ticket: _Ticket) -> None:
+        self.users.setdefault(ticket.user_id, deque()).append(ticket)
+        self.waiting += 1
+
+    def pop(self) -> _Ticket:
+        user_id, queue = self.users.popitem(last=False)
+        ticket = queue.popleft()
+        if queue:
+            # user still has work -> back of the round-robin line
+            self.users[user_id] = queue
+        self.waiting -= 1
+        return ticket
+
+
+class LaneScheduler:
+    """Slot pool with an interactive and a bulk lane (see module docstring)."""
+
+    def __init__(
+        self,
+        name: str,
+        slots: int,
+        reserved_interactive: int = 1,
+        interactive_weight: int = 4,
+        bulk_weight: int = 1,
+    ):
+        self.name = name
+        self.slots = max(1, slots)
+        self.reserved_interactive = max(0, reserved_interactive)
+        # bulk keeps at least one slot; if that eats into the reserve (slots=1),
+        # the reserved slots are added on top instead of being dropped, so an
+        # interactive call never waits behind a batch
+        self.bulk_slots = max(1, self.slots - self.reserved_interactive)
+        self.capacity = max(self.slots, self.bulk_slots + self.reserved_interactive)
+        if self.capacity > self.slots:
+            logger.warning(
+                "%s scheduler: %d slot(s) can't hold %d reserved interactive slot(s) plus bulk; "
+                "running up to %d jobs at once",
+                name, self.slots, self.reserved_interactive, self.capacity,
+            )
+        self._cond = threading.Condition()
+        self._lanes: Dict[str, _Lane] = {
+            INTERACTIVE: _Lane(interactive_weight),
+            BULK: _Lane(bulk_weight),
+        }
+        self._running = 0
+
+    # ---------- public API ----------
+
+    @contextmanager
+    def slot(self, lane: Optional[str] = None, user_id: Any = None):
+        """Block until a slot is granted; lane/user default to the current job()."""
+        if lane is None:
+            lane, job_user = _current_job.get()
+            if user_id is None:
+                user_id = job_user
+        ticket = self._acquire(lane, user_id)
+        try:
+            yield
+        finally:
+            self._release(ticket)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "slots": self.slots,
+                "capacity": self.capacity,
+                "reserved_interactive": self.reserved_interactive,
+                "running": self._running,
+                "lanes": {
+                    name: {"running": l.running, "waiting": l.waiting}
+                    for name, l in self._lanes.items()
+                },
+            }
+
+    # ---------- internals ----------
+
+    def _acquire(self, lane: str, user_id: Any) -> _Ticket:
+        if lane not in self._lanes:
+            raise ValueError(f"Unknown scheduler lane: {lane}")
+        ticket = _Ticket(lane, user_id)
+        with self._cond:
+            l = self._lanes[lane]
+            if l.waiting == 0 and l.running == 0:
+                # a lane waking up from idle doesn't get credit for the idle time
+                l.pass_value = max(l.pass_value, self._min_active_pass())
+            l.push(ticket)
+            self._dispatch()
+            while not ticket.granted:
+                self._cond.wait()
+
+        waited = time.monotonic() - ticket.enqueued_at
+        if lane == INTERACTIVE and waited > 1.0:
+            logger.warning(
+                "%s scheduler: interactive job for user %s queued %.2fs",
+                self.name, user_id, waited,
+            )
+        return ticket
+
+    def _release(self, ticket: _Ticket) -> None:
+        with self._cond:
+            self._running -= 1
+            self._lanes[ticket.lane].running -= 1
+            self._dispatch()
+
+    def _min_active_pass(self) -> float:
+        active = [l.pass_value for l in self._lanes.values() if l.waiting or l.running]
+        return min(active) if active else 0.0
+
+    def _eligible(self, name: str) -> bool:
+        lane = self._lanes[name]
+        if not lane.waiting:
+            return False
+        if name == BULK:
+            return lane.running < self.bulk_slots
+        return lane.running < self.slots
+
+    def _dispatch(self) -> None:
+        """Grant free slots to waiters. Caller must hold self._cond."""
+        granted = False
+        while self._running < self.capacity:
+            candidates = [n for n in LANES if self._eligible(n)]
+            if not candidates:
+                break
+            # stride scheduling: lowest pass wins, interactive breaks ties
+            name = min(candidates, key=lambda n: (self._lanes[n].pass_value, LANES.index(n)))
+            lane = self._lanes[name]
+            ticket = lane.pop()
+            lane.pass_value += 1.0 / lane.weight
+            lane.running += 1
+            self._running += 1
+            ticket.granted = True
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+
+# Shared instances: one pool for Gemini calls, one for PPTX/DOCX renders
+model_scheduler = LaneScheduler(
+    "model",
+    slots=Config.MODEL_CONCURRENCY,
+    reserved_interactive=Config.INTERACTIVE_RESERVED_SLOTS,
+    interactive_weight=Config.INTERACTIVE_WEIGHT,
+    bulk_weight=Config.BULK_WEIGHT,
+)
+
+render_scheduler = LaneScheduler(
+    "render",
+    slots=Config.RENDER_CONCURRENCY,
+    reserved_interactive=Config.INTERACTIVE_RESERVED_SLOTS,
+    interactive_weight=Config.INTERACTIVE_WEIGHT,
+    bulk_weight=Config.BULK_WEIGHT,
+)
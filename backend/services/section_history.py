@@ -0,0 +1,202 @@
+# backend/services/section_history.py
+"""
+Version history of document sections, stored in `section_versions`.
+
+Each version is either a full `snapshot` of the text or a `delta` against
+the previous version. Deltas work on word/whitespace tokens and are a list of
+
+    n (int > 0)   keep the next n tokens of the previous text
+    -n            skip the next n tokens
+    "text"        insert text
+
+so a refine that rewords one sentence stores that sentence, not the whole
+section again. Version 1, every SNAPSHOT_EVERY-th version and any version
+whose delta would not be smaller than the text itself are snapshots, which
+bounds how many deltas a reconstruction replays.
+
+Old versions are only rebuilt when asked for (history / diff / undo); the
+Section row itself carries just the current text and version number.
+"""
+import difflib
+import json
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from models.models import Section, SectionVersion
+
+SNAPSHOT_EVERY = 20
+INITIAL_PROMPT = "initial generation"
+
+_TOKEN = re.compile(r"\s+|\S+")
+
+
+# ---------------- delta encoding ----------------
+
+def make_delta(old: str, new: str) -> list:
+    a, b = _TOKEN.findall(old), _TOKEN.findall(new)
+    delta: list = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            delta.append(i2 - i1)
+            continue
+        if i2 > i1:
+            delta.append(-(i2 - i1))
+        if j2 > j1:
+            delta.append("".join(b[j1:j2]))
+    return delta
+
+
+def apply_delta(old: str, delta: list) -> str:
+    tokens = _TOKEN.findall(old)
+    out: List[str] = []
+    pos = 0
+    for op in delta:
+        if isinstance(op, str):
+            out.append(op)
+        elif op > 0:
+            out.extend(tokens[pos:pos + op])
+            pos += op
+        else:
+            pos -= op
+    return "".join(out)
+
+
+def encode(version: int, previous: Optional[str], text: str) -> Tuple[Optional[str], Optional[list]]:
+    """(snapshot, delta) to store for `version`; exactly one is set."""
+    if previous is None or version == 1 or version % SNAPSHOT_EVERY == 0:
+        return text, None
+    delta = make_delta(previous, text)
+    if len(json.dumps(delta)) >= len(text):
+        return text, None
+    return None, delta
+
+
+# ---------------- writes ----------------
+
+class VersionConflict(Exception):
+    """Another refine / undo moved the section to a new version meanwhile."""
+
+
+async def _move_version(db: AsyncSession, section: Section, new: int) -> None:
+    """
+    section.version -> new as one conditional UPDATE (as slides.bump_version),
+    so of two concurrent writers on the same version only one gets through.
+    """
+    expected = section.version or 0
+    current = Section.version == expected
+    if not expected:
+        current = or_(Section.version.is_(None), current)
+    result = await db.execute(
+        update(Section)
+        .where(Section.id == section.id, current)
+        .values(version=new)
+        .execution_options(synchronize_session=False)
+    )
+    if not result.rowcount:
+        raise VersionConflict(f"section {section.id} is no longer at version {expected}")
+    # already written: record it on the instance without marking it dirty
+    set_committed_value(section, "version", new)
+
+
+async def add_initial_versions(db: AsyncSession, sections: List[Tuple[int, str]]) -> None:
+    """Version 1 for many new sections at once: [(section_id, content), ...] in one executemany."""
+    if sections:
+        await db.execute(
+            insert(SectionVersion),
+            [
+                {"section_id": sid, "version": 1, "prompt": INITIAL_PROMPT, "snapshot": content or ""}
+                for sid, content in sections
+            ],
+        )
+
+
+async def record(db: AsyncSession, section: Section, content: str, prompt: Optional[str]) -> int:
+    """
+    Set the section's text to `content` and store it as the next version.
+    Raises VersionConflict if the section changed version since it was loaded.
+    """
+    previous = section.content or ""
+    legacy = not section.version and previous
+    # sections from before history was kept: the current text becomes version 1
+    version = 2 if legacy else (section.version or 0) + 1
+    await _move_version(db, section, version)
+    if legacy:
+        db.add(SectionVersion(section_id=section.id, version=1, prompt=INITIAL_PROMPT, snapshot=previous))
+
+    snapshot, delta = encode(version, previous if version > 1 else None, content)
+    db.add(SectionVersion(section_id=section.id, version=version, prompt=prompt, snapshot=snapshot, delta=delta))
+    section.content = content
+    return version
+
+
+async def undo(db: AsyncSession, section: Section) -> Optional[int]:
+    """
+    Drop the latest version and restore the one before it. None if there is
+    nothing to undo; VersionConflict as in record().
+    """
+    if not section.version or section.version < 2:
+        return None
+    latest = section.version
+    await _move_version(db, section, latest - 1)
+    previous = await load_text(db, section.id, latest - 1)
+    await db.execute(
+        delete(SectionVersion).where(
+            SectionVersion.section_id == section.id,
+            SectionVersion.version == latest,
+        )
+    )
+    section.content = previous
+    return section.version
+
+
+# ---------------- reads ----------------
+
+async def load_text(db: AsyncSession, section_id: int, version: int) -> Optional[str]:
+    """Rebuild one version: nearest snapshot at or before it, then the deltas after that."""
+    base = (
+        select(func.max(SectionVersion.version))
+        .where(
+            SectionVersion.section_id == section_id,
+            SectionVersion.version <= version,
+            SectionVersion.snapshot.is_not(None),
+        )
+        .scalar_subquery()
+    )
+    rows = (
+        await db.execute(
+            select(SectionVersion.version, SectionVersion.snapshot, SectionVersion.delta)
+            .where(
+                SectionVersion.section_id == section_id,
+                SectionVersion.version >= base,
+                SectionVersion.version <= version,
+            )
+            .order_by(SectionVersion.version)
+        )
+    ).all()
+    if not rows or rows[-1].version != version:
+        return None
+
+    text = ""
+    for row in rows:
+        text = row.snapshot if row.snapshot is not None else apply_delta(text, row.delta or [])
+    return text
+
+
+async def list_versions(db: AsyncSession, section_id: int) -> List[dict]:
+    """Version metadata only (no text)."""
+    rows = await db.execute(
+        select(SectionVersion.version, SectionVersion.prompt, SectionVersion.created_at)
+        .where(SectionVersion.section_id == section_id)
+        .order_by(SectionVersion.version)
+    )
+    return [{"version": v, "prompt": prompt, "created_at": created_at} for v, prompt, created_at in rows]
+
+
+def unified_diff(old: str, new: str, old_label: str, new_label: str) -> str:
+    return "\n".join(
+        difflib.unified_diff(old.splitlines(), new.splitlines(), old_label, new_label, lineterm="")
+    )
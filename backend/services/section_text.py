@@ -0,0 +1,115 @@
+# backend/services/section_text.py
+"""
+Normalised section text for DOCX export.
+
+Generated / refined section content is cleaned once when it is written
+(creation, refine, undo) and stored on the section row together with its
+paragraph and word counts, so export reads finished text and page
+distribution works from stored integers.
+"""
+import re
+from typing import List
+
+_WORD = re.compile(r"\w+")
+
+
+def clean_section_content(doc_title: str, heading: str, raw: str) -> str:
+    """
+    Post-process Gemini text so that:
+
+    - Leading lines like:
+        * "Electric Vehicle Market in India 2025" (doc title)
+        * "Page 1 – Section 1", "Page 2 - Section 3", etc.
+        * "Section 2: Growth Drivers"
+        * a repeat of the heading, or "Heading: ..."
+      are removed (and we keep stripping such lines until the
+      first "normal" paragraph).
+    - Literal '\\n' are converted to real newlines.
+    - Extra empty lines at the start/end are removed.
+    """
+    if not raw:
+        return ""
+
+    # Normalise newlines
+    text = raw.replace("\r\n", "\n").replace("\r", "\n")
+
+    # Convert escaped '\n' from the model into real paragraph breaks
+    text = text.replace("\\n", "\n")
+
+    lines = [l.strip() for l in text.split("\n")]
+
+    doc_title_low = (doc_title or "").strip().lower()
+    heading_low = (heading or "").strip().lower()
+
+    # Strip meta lines at the TOP until we hit a normal paragraph
+    while lines:
+        first = lines[0].strip()
+        if not first:
+            # blank line at top – just drop it
+            lines.pop(0)
+            continue
+
+        f_low = first.lower()
+
+        is_doc_title = f_low == doc_title_low
+        is_page_section = f_low.startswith("page ") and "section" in f_low
+        is_section_prefix = f_low.startswith("section ")
+        is_heading_exact = f_low == heading_low
+        is_heading_with_colon = heading_low and f_low.startswith(heading_low + ":")
+
+        # Only strip the meta line if there *is* more content after it.
+        # This prevents removing the only paragraph in cases where model output
+        # matches the heading/title but there's no further text.
+        if (is_doc_title or is_page_section or is_section_prefix or is_heading_exact or is_heading_with_colon):
+            # If there's another non-empty line after this, pop current meta line
+            if len(lines) > 1 and any(l.strip() for l in lines[1:]):
+                lines.pop(0)
+                continue
+            else:
+                # don't strip if it's the only content left
+                break
+
+        # First "normal" line reached – stop stripping
+        break
+
+    # Collapse duplicate blank lines
+    cleaned: List[str] = []
+    for line in lines:
+        if not line:
+            if cleaned and cleaned[-1] == "":
+                continue
+            cleaned.append("")
+        else:
+            cleaned.append(line)
+
+    # Trim blank lines at start/end
+    while cleaned and cleaned[0] == "":
+        cleaned.pop(0)
+    while cleaned and cleaned[-1] == "":
+        cleaned.pop()
+
+    return "\n".join(cleaned).strip()
+
+
+def paragraphs(text: str) -> List[str]:
+    return [p.strip() for p in (text or "").split("\n") if p.strip()]
+
+
+def word_count(text: str) -> int:
+    return len(_WORD.findall(text or ""))
+
+
+def normalise(doc_title: str, heading: str, raw: str) -> dict:
+    """Section column values derived from `raw`: clean_content, paragraph_count, word_count."""
+    clean = clean_section_content(doc_title, heading, raw or "")
+    return {
+        "clean_content": clean,
+        "paragraph_count": len(paragraphs(clean)),
+        "word_count": word_count(clean),
+    }
+
+
+def store(section, doc_title: str) -> None:
+    """Recompute the stored values after section.content changed."""
+    for key, value in normalise(doc_title, section.title, section.content).items():
+        setattr(section, key, value)
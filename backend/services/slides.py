@@ -0,0 +1,250 @@
+# backend/services/slides.py
+"""
+Per-slide storage for presentations (models.Slide).
+
+A deck is the rows of one presentation ordered by `position`. Positions are
+floats so an insert or a move only writes the one row involved (it gets the
+midpoint of its new neighbours); when two neighbours get too close the deck
+is renumbered 1..n, which is rare and the only O(n) write.
+
+Slide indexes in the API stay 0-based list indexes, as with the old JSON
+`Presentation.content` column. Every write flushes (sessions don't
+autoflush), so the next index lookup sees it.
+"""
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from models.models import Presentation, Slide
+from services.summaries import presentation_summary
+
+DEFAULT_LAYOUT = "bullet"
+# below this gap between neighbours the midpoint loses precision -> renumber
+_MIN_GAP = 1e-9
+
+
+def split_slide(slide) -> tuple:
+    """slide dict (or legacy plain string) -> (layout, payload without layout)."""
+    if not isinstance(slide, dict):
+        return DEFAULT_LAYOUT, {"title": "", "bullets": [str(slide)]}
+    payload = dict(slide)
+    layout = payload.pop("layout", None) or DEFAULT_LAYOUT
+    return str(getattr(layout, "value", layout)), payload
+
+
+def join_slide(layout: str, payload: Optional[dict]) -> dict:
+    return {"layout": layout, **(payload or {})}
+
+
+def new_rows(presentation_id: int, slides: list, start: float = 1.0) -> List[Slide]:
+    rows = []
+    for i, slide in enumerate(slides):
+        layout, payload = split_slide(slide)
+        rows.append(Slide(presentation_id=presentation_id, position=start + i, layout=layout, payload=payload))
+    return rows
+
+
+async def load_deck(db: AsyncSession, presentation_id: int) -> List[dict]:
+    """The whole deck in order, with one query."""
+    rows = await db.execute(
+        select(Slide.layout, Slide.payload)
+        .where(Slide.presentation_id == presentation_id)
+        .order_by(Slide.position)
+    )
+    return [join_slide(layout, payload) for layout, payload in rows]
+
+
+async def load_decks(db: AsyncSession, presentation_ids: List[int]) -> Dict[int, List[dict]]:
+    """Several decks with one query (dashboard include_content)."""
+    decks: Dict[int, List[dict]] = {pid: [] for pid in presentation_ids}
+    if not presentation_ids:
+        return decks
+    rows = await db.execute(
+        select(Slide.presentation_id, Slide.layout, Slide.payload)
+        .where(Slide.presentation_id.in_(presentation_ids))
+        .order_by(Slide.presentation_id, Slide.position)
+    )
+    for pid, layout, payload in rows:
+        decks[pid].append(join_slide(layout, payload))
+    return decks
+
+
+async def slide_at(db: AsyncSession, presentation_id: int, index: int) -> Optional[Slide]:
+    if index < 0:
+        return None
+    return await db.scalar(
+        select(Slide)
+        .where(Slide.presentation_id == presentation_id)
+        .order_by(Slide.position)
+        .offset(index)
+        .limit(1)
+    )
+
+
+async def count_slides(db: AsyncSession, presentation_id: int) -> int:
+    return await db.scalar(select(func.count()).select_from(Slide).where(Slide.presentation_id == presentation_id))
+
+
+async def get_slide(db: AsyncSession, presentation_id: int, index: int) -> Optional[dict]:
+    row = await slide_at(db, presentation_id, index)
+    return join_slide(row.layout, row.payload) if row is not None else None
+
+
+async def bump_version(db: AsyncSession, presentation: Presentation, expected: Optional[int] = None) -> Optional[int]:
+    """
+    version += 1 as one UPDATE (so concurrent writers serialise on it).
+    With `expected`, only if the stored version still is that; returns None on mismatch.
+    """
+    query = update(Presentation).where(Presentation.presentation_id == presentation.presentation_id)
+    if expected is not None:
+        query = query.where(Presentation.version == expected)
+    result = await db.execute(
+        query.values(version=Presentation.version + 1).execution_options(synchronize_session=False)
+    )
+    if not result.rowcount:
+        return None
+    version = await db.scalar(
+        select(Presentation.version).where(Presentation.presentation_id == presentation.presentation_id)
+    )
+    # already written: record it on the instance without marking it dirty
+    set_committed_value(presentation, "version", version)
+    return version
+
+
+async def refresh_summary(db: AsyncSession, presentation: Presentation) -> None:
+    """Recompute the stored dashboard summary (only the first slide matters)."""
+    first = (
+        await db.execute(
+            select(Slide.layout, Slide.payload)
+            .where(Slide.presentation_id == presentation.presentation_id)
+            .order_by(Slide.position)
+            .limit(1)
+        )
+    ).first()
+    presentation.summary = presentation_summary(presentation.topic, [join_slide(*first)] if first else [])
+
+
+async def replace_deck(db: AsyncSession, presentation: Presentation, slides: list) -> None:
+    """Full overwrite (create / PUT with content). The presentation must have an id (flushed)."""
+    await db.execute(delete(Slide).where(Slide.presentation_id == presentation.presentation_id))
+    db.add_all(new_rows(presentation.presentation_id, slides))
+    await db.flush()
+    await refresh_summary(db, presentation)
+
+
+async def update_slide_fields(db: AsyncSession, presentation: Presentation, index: int, fields: dict) -> Optional[Slide]:
+    """Overwrite the given fields of one slide: a single row write. None if index is out of range."""
+    row = await slide_at(db, presentation.presentation_id, index)
+    if row is None:
+        return None
+    payload = dict(row.payload or {})
+    for key, value in fields.items():
+        if key == "layout":
+            row.layout = str(getattr(value, "value", value))
+        else:
+            payload[key] = value
+    # new dict, so the JSON change is picked up
+    row.payload = payload
+    await db.flush()
+    if index == 0:
+        await refresh_summary(db, presentation)
+    return row
+
+
+async def replace_slide(db: AsyncSession, presentation: Presentation, index: int, slide) -> bool:
+    """Overwrite one slide (layout + payload) in place. False if index is out of range."""
+    row = await slide_at(db, presentation.presentation_id, index)
+    if row is None:
+        return False
+    row.layout, row.payload = split_slide(slide)
+    await db.flush()
+    if index == 0:
+        await refresh_summary(db, presentation)
+    return True
+
+
+async def _neighbour_positions(db: AsyncSession, presentation_id: int, index: int, exclude_id: Optional[int] = None):
+    """Positions of the slides that would sit right before / after a slide placed at `index`."""
+    query = select(Slide.position).where(Slide.presentation_id == presentation_id)
+    if exclude_id is not None:
+        query = query.where(Slide.id != exclude_id)
+    query = query.order_by(Slide.position)
+    if index <= 0:
+        before = None
+        after = await db.scalar(query.limit(1))
+    else:
+        pair = (await db.scalars(query.offset(index - 1).limit(2))).all()
+        before = pair[0] if pair else None
+        after = pair[1] if len(pair) > 1 else None
+        if before is None:
+            # index past the end: append
+            before = await db.scalar(query.order_by(None).order_by(Slide.position.desc()).limit(1))
+    return before, after
+
+
+async def _renumber(db: AsyncSession, presentation_id: int) -> None:
+    ids = (
+        await db.scalars(
+            select(Slide.id).where(Slide.presentation_id == presentation_id).order_by(Slide.position)
+        )
+    ).all()
+    for i, slide_id in enumerate(ids, start=1):
+        await db.execute(update(Slide).where(Slide.id == slide_id).values(position=float(i)))
+
+
+async def _position_for(db: AsyncSession, presentation_id: int, index: int, exclude_id: Optional[int] = None) -> float:
+    before, after = await _neighbour_positions(db, presentation_id, index, exclude_id)
+    if before is not None and after is not None and after - before < _MIN_GAP:
+        await _renumber(db, presentation_id)
+        before, after = await _neighbour_positions(db, presentation_id, index, exclude_id)
+    if before is None and after is None:
+        return 1.0
+    if before is None:
+        return after - 1.0
+    if after is None:
+        return before + 1.0
+    return (before + after) / 2
+
+
+async def insert_slide(db: AsyncSession, presentation: Presentation, index: int, slide: dict) -> Slide:
+    """Insert so the new slide ends up at `index` (clamped to the end)."""
+    pid = presentation.presentation_id
+    layout, payload = split_slide(slide)
+    row = Slide(
+        presentation_id=pid,
+        position=await _position_for(db, pid, index),
+        layout=layout,
+        payload=payload,
+    )
+    db.add(row)
+    await db.flush()
+    if index <= 0:
+        await refresh_summary(db, presentation)
+    return row
+
+
+async def delete_slide(db: AsyncSession, presentation: Presentation, index: int) -> bool:
+    row = await slide_at(db, presentation.presentation_id, index)
+    if row is None:
+        return False
+    await db.delete(row)
+    await db.flush()
+    if index == 0:
+        await refresh_summary(db, presentation)
+    return True
+
+
+async def move_slide(db: AsyncSession, presentation: Presentation, from_index: int, to_index: int) -> bool:
+    """Move one slide: rewrites only that slide's position (barring a renumber)."""
+    pid = presentation.presentation_id
+    row = await slide_at(db, pid, from_index)
+    if row is None:
+        return False
+    if from_index != to_index:
+        row.position = await _position_for(db, pid, to_index, exclude_id=row.id)
+        await db.flush()
+        if 0 in (from_index, to_index):
+            await refresh_summary(db, presentation)
+    return True
@@ -0,0 +1,57 @@
+# backend/services/summaries.py
+"""
+Dashboard summary text for presentations / projects.
+
+Computed on write by the ORM hooks in models/models.py and stored in the
+`summary` column, so the dashboard never walks deck content.
+"""
+import json
+
+SUMMARY_CHAR_LIMIT = 280
+
+
+def _first_slide_text(content) -> str:
+    if isinstance(content, str) and content.strip():
+        # legacy rows stored the slide list as a JSON string
+        try:
+            content = json.loads(content)
+        except Exception:
+            return content.strip()
+    if not isinstance(content, list) or not content:
+        return ""
+
+    first = content[0]
+    if isinstance(first, str):
+        return first.strip()
+    if not isinstance(first, dict):
+        return ""
+    title = (first.get("title") or "").strip()
+    if title:
+        return title
+    bullets = first.get("bullets") or []
+    if isinstance(bullets, list) and bullets:
+        return str(bullets[0]).strip()
+    return (first.get("description") or "").strip()
+
+
+def _truncate(text: str, char_limit: int = SUMMARY_CHAR_LIMIT) -> str:
+    if len(text) <= char_limit:
+        return text
+    cut = text[:char_limit]
+    last_space = cut.rfind(" ")
+    if last_space > int(char_limit * 0.5):
+        cut = cut[:last_space]
+    return cut + "..."
+
+
+def presentation_summary(topic, content) -> str:
+    """First slide title / bullet / description, else the topic. "" if there is neither."""
+    try:
+        short = _first_slide_text(content)
+    except Exception:
+        short = ""
+    return _truncate((short or (topic or "")).strip())
+
+
+def project_summary(title) -> str:
+    return (title or "")[:SUMMARY_CHAR_LIMIT]
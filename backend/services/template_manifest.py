@@ -0,0 +1,194 @@
+# backend/services/template_manifest.py
+"""
+Introspection of the PowerPoint templates in services/ppt_templates.
+
+Each template is analysed once and the result kept in
+ppt_templates/manifest.json:
+
+- the theme id (file stem: ppt1 ... ppt10) -> file, size, sha256
+- slide size
+- every layout: index, name and the placeholders a new slide gets from it
+  (in slide shape order) with idx, type and resolved geometry (EMU), plus
+  the shape positions of the title and of the content placeholders
+  (every non-TITLE placeholder, which is what the builder fills)
+- roles: the layout index the builder uses for each slide type
+
+The builder (services/pptx_generator.py) looks layouts and placeholders up
+by position instead of scanning a slide's placeholders for every slide, and
+TEMPLATE_MAP is built from the manifest, so a .pptx dropped into
+ppt_templates is selectable by its file name.
+
+On start-up the manifest is checked against the files (size + sha256);
+new or changed templates are analysed again and the file rewritten.
+Rebuild it by hand with:
+    python -m services.template_manifest
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from pptx import Presentation
+from pptx.enum.shapes import PP_PLACEHOLDER
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "ppt_templates")
+MANIFEST_PATH = Path(TEMPLATE_DIR) / "manifest.json"
+# bump when the entry format or the roles change: stored entries are then analysed again
+MANIFEST_VERSION = 2
+
+_BODY_TYPE_IDS = {int(PP_PLACEHOLDER.OBJECT), int(PP_PLACEHOLDER.BODY)}
+
+
+def _placeholder(ph) -> dict:
+    fmt = ph.placeholder_format
+    return {
+        "idx": fmt.idx,
+        "type": fmt.type.name if fmt.type is not None else None,
+        "type_id": int(fmt.type) if fmt.type is not None else None,
+        "name": ph.name,
+        # resolved through the master when the layout doesn't set them
+        "left": ph.left,
+        "top": ph.top,
+        "width": ph.width,
+        "height": ph.height,
+    }
+
+
+def _layout(index: int, layout) -> dict:
+    # what add_slide() clones onto a new slide (no date / footer / slide number), in order
+    placeholders = [_placeholder(ph) for ph in layout.iter_cloneable_placeholders()]
+    title = next((pos for pos, ph in enumerate(placeholders) if ph["idx"] == 0), None)
+    content = [pos for pos, ph in enumerate(placeholders) if ph["type_id"] != int(PP_PLACEHOLDER.TITLE)]
+    return {"index": index, "name": layout.name, "placeholders": placeholders, "title": title, "content": content}
+
+
+def _first(layouts: List[dict], match: Callable[[dict], bool], *fallbacks: int) -> int:
+    """First layout that matches, else the first fallback index the template has."""
+    for layout in layouts:
+        if match(layout):
+            return layout["index"]
+    for index in fallbacks:
+        if index < len(layouts):
+            return index
+    return 0
+
+
+def _bodies(layout: dict) -> int:
+    return sum(1 for ph in layout["placeholders"] if ph["type_id"] in _BODY_TYPE_IDS)
+
+
+def _has(layout: dict, ph_type) -> bool:
+    return any(ph["type_id"] == int(ph_type) for ph in layout["placeholders"])
+
+
+def _roles(layouts: List[dict]) -> Dict[str, int]:
+    # by placeholder signature; the fallbacks are the indexes the builder used to hard-code
+    two_content = _first(layouts, lambda l: _has(l, PP_PLACEHOLDER.TITLE) and _bodies(l) == 2, 3, 1)
+    return {
+        "title": _first(layouts, lambda l: _has(l, PP_PLACEHOLDER.CENTER_TITLE), 0),
+        "bullet": _first(layouts, lambda l: _has(l, PP_PLACEHOLDER.TITLE) and _bodies(l) == 1, 1, 0),
+        "two_column": two_content,
+        "image": two_content,
+        # the table frame takes the content placeholder's place and geometry
+        "table": _first(layouts, lambda l: _has(l, PP_PLACEHOLDER.TITLE) and _bodies(l) == 1, 1, 0),
+        "default": 0,
+    }
+
+
+def introspect(prs) -> dict:
+    """Layouts, placeholders and roles of an open Presentation."""
+    layouts = [_layout(i, layout) for i, layout in enumerate(prs.slide_layouts)]
+    return {
+        "slide_width": prs.slide_width,
+        "slide_height": prs.slide_height,
+        "roles": _roles(layouts),
+        "layouts": layouts,
+    }
+
+
+def _file_entry(path: Path) -> dict:
+    data = path.read_bytes()
+    return {
+        "file": path.name,
+        "size": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        **introspect(Presentation(str(path))),
+    }
+
+
+def _theme_order(theme_id: str):
+    digits = theme_id.lstrip("abcdefghijklmnopqrstuvwxyz")
+    return (theme_id[: len(theme_id) - len(digits)], int(digits) if digits.isdigit() else -1, theme_id)
+
+
+def _template_files(template_dir: Path) -> Dict[str, Path]:
+    return {p.stem: p for p in sorted(template_dir.glob("*.pptx")) if not p.name.startswith("~$")}
+
+
+def build_manifest(template_dir: Path = Path(TEMPLATE_DIR), previous: Optional[dict] = None) -> dict:
+    """Manifest for every template; entries of `previous` whose file is unchanged are reused."""
+    known = (previous or {}).get("templates", {}) if (previous or {}).get("version") == MANIFEST_VERSION else {}
+    templates = {}
+    for theme_id, path in _template_files(template_dir).items():
+        entry = known.get(theme_id)
+        if entry and entry.get("file") == path.name and entry.get("size") == path.stat().st_size:
+            if entry.get("sha256") == hashlib.sha256(path.read_bytes()).hexdigest():
+                templates[theme_id] = entry
+                continue
+        try:
+            templates[theme_id] = _file_entry(path)
+        except Exception:
+            logger.exception("Could not read PowerPoint template %s", path)
+    ordered = {tid: templates[tid] for tid in sorted(templates, key=_theme_order)}
+    return {"version": MANIFEST_VERSION, "templates": ordered}
+
+
+def write_manifest(manifest: dict, path: Path = MANIFEST_PATH) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=1)
+        fh.write("\n")
+    # mkstemp creates the file 0600
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> dict:
+    """The stored manifest, refreshed (and rewritten) if the templates changed."""
+    try:
+        stored = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        stored = None
+    manifest = build_manifest(path.parent, stored)
+    if manifest != stored:
+        try:
+            write_manifest(manifest, path)
+        except OSError:
+            logger.warning("Could not write template manifest %s; using it from memory", path)
+    return manifest
+
+
+manifest = load_manifest()
+
+
+@lru_cache(maxsize=1)
+def default_entry() -> dict:
+    """python-pptx's built-in template, used when a theme has no template file."""
+    return introspect(Presentation())
+
+
+def template_entry(theme_id: Optional[str]) -> Optional[dict]:
+    return manifest["templates"].get(theme_id)
+
+
+if __name__ == "__main__":
+    # full rebuild: nothing reused from the stored file
+    rebuilt = build_manifest()
+    write_manifest(rebuilt)
+    print(f"wrote {MANIFEST_PATH}: {', '.join(rebuilt['templates'])}")
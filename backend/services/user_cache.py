@@ -0,0 +1,87 @@
+# backend/services/user_cache.py
+"""
+Process-local TTL + LRU cache for the auth bridge (routers/auth_bridge.py).
+
+Maps the FastAPI-Users user id (UUID from the JWT "sub") to the local
+integer users.id + email, so a request with a known token skips both the
+auth-user load and the local users lookup.
+
+- positive entries live AUTH_CACHE_TTL_SECONDS
+- negative entries (unknown / inactive auth user) live AUTH_CACHE_NEGATIVE_TTL_SECONDS,
+  so a deleted user's still-valid token is rejected without DB work
+- at most AUTH_CACHE_MAX_ENTRIES entries, least recently used evicted first
+- UserManager hooks call invalidate() on update / delete
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Optional, Tuple
+
+from core.config import Config
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    id: int
+    email: str
+
+
+class UserCache:
+    def __init__(self, ttl: float, negative_ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # key -> (expires_at, CachedUser or None for a negative entry)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Optional[CachedUser]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Optional[CachedUser]]:
+        """Returns (found, user). found=True with user=None is a cached negative."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def put(self, key: Hashable, user: CachedUser) -> None:
+        self._store(key, user, self.ttl)
+
+    def put_missing(self, key: Hashable) -> None:
+        self._store(key, None, self.negative_ttl)
+
+    def _store(self, key: Hashable, value: Optional[CachedUser], ttl: float) -> None:
+        if self.max_entries <= 0 or ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+user_cache = UserCache(
+    ttl=Config.AUTH_CACHE_TTL_SECONDS,
+    negative_ttl=Config.AUTH_CACHE_NEGATIVE_TTL_SECONDS,
+    max_entries=Config.AUTH_CACHE_MAX_ENTRIES,
+)
@@ -0,0 +1,48 @@
+# backend/tests/conftest.py
+"""
+Run from backend/:
+    pip install -r requirements.txt pytest
+    python -m pytest
+
+core/config.py reads DATABASE_URL on import, so both databases are pointed
+at a throwaway directory before any app module is imported: the tests never
+touch ppt_generator.db.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+import pytest
+
+_TMP = tempfile.mkdtemp(prefix="ppt-doc-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP}/app.db"
+os.environ["AUTH_DATABASE_URL"] = f"sqlite+aiosqlite:///{_TMP}/auth.db"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.dbutils import AsyncSessionLocal, Base, async_engine, engine  # noqa: E402
+import models.models  # noqa: E402,F401  (registers the tables)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def tables():
+    Base.metadata.create_all(bind=engine)
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def run_db():
+    """
+    run_db(fn): await fn(db) with a fresh AsyncSession on a new event loop.
+    The pool is disposed on that same loop, so no connection outlives it.
+    """
+    def run(fn):
+        async def main():
+            try:
+                async with AsyncSessionLocal() as db:
+                    return await fn(db)
+            finally:
+                await async_engine.dispose()
+        return asyncio.run(main())
+    return run
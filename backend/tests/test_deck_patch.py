@@ -0,0 +1,152 @@
+# backend/tests/test_deck_patch.py
+import copy
+import itertools
+
+import pytest
+
+from models.models import Presentation, User
+from services import slides
+from services.deck_patch import PatchError, _mem_apply, _mem_get, _parse, apply, slide_ops_to_patch
+
+_emails = itertools.count()
+
+DECK = [
+    {"layout": "title", "title": "Electric vehicles", "subtitle": "2025 outlook"},
+    {"layout": "bullet", "title": "Market", "bullets": ["Growth", "Prices"]},
+    {"layout": "bullet", "title": "Policy", "bullets": ["Subsidies"]},
+    {"layout": "two_column", "title": "Compare", "left": ["A"], "right": ["B"]},
+]
+
+
+async def _presentation(db, deck=DECK) -> Presentation:
+    user = User(email=f"deck-patch-{next(_emails)}@example.com")
+    db.add(user)
+    await db.flush()
+    presentation = Presentation(owner_id=user.id, topic="Electric vehicles", configuration={"theme": "ppt1"})
+    db.add(presentation)
+    await db.flush()
+    await slides.replace_deck(db, presentation, copy.deepcopy(deck))
+    await db.commit()
+    return presentation
+
+
+def _document(presentation: Presentation, deck: list) -> dict:
+    return {"topic": presentation.topic, "content": deck, "configuration": copy.deepcopy(presentation.configuration)}
+
+
+def _replay(doc: dict, patch: list) -> dict:
+    """Plain RFC 6902 on an in-memory document."""
+    doc = copy.deepcopy(doc)
+    for op in patch:
+        path = _parse(op["path"])
+        if op["op"] == "test":
+            assert _mem_get(doc, path) == op["value"]
+        elif op["op"] in ("move", "copy"):
+            frm = _parse(op["from"])
+            value = copy.deepcopy(_mem_get(doc, frm))
+            if op["op"] == "move":
+                _mem_apply(doc, "remove", frm)
+            _mem_apply(doc, "add", path, value)
+        else:
+            _mem_apply(doc, op["op"], path, copy.deepcopy(op.get("value")))
+    return doc
+
+
+def test_slide_ops_to_patch():
+    patch = slide_ops_to_patch([
+        {"op": "update", "index": 1, "fields": {"title": "Markets", "bullets": ["Growth"]}},
+        {"op": "insert", "index": 2, "slide": {"layout": "bullet", "title": "New"}},
+        {"op": "delete", "index": 0},
+        {"op": "move", "index": 3, "to_index": 0},
+    ])
+    assert patch == [
+        {"op": "add", "path": "/content/1/title", "value": "Markets"},
+        {"op": "add", "path": "/content/1/bullets", "value": ["Growth"]},
+        {"op": "add", "path": "/content/2", "value": {"layout": "bullet", "title": "New"}},
+        {"op": "remove", "path": "/content/0"},
+        {"op": "move", "from": "/content/3", "path": "/content/0"},
+    ]
+
+
+@pytest.mark.parametrize("ops", [[{"op": "move", "index": 0}], [{"op": "rename", "index": 0}]])
+def test_slide_ops_to_patch_rejects_bad_ops(ops):
+    with pytest.raises(PatchError):
+        slide_ops_to_patch(ops)
+
+
+PATCHES = [
+    [{"op": "replace", "path": "/content/1/title", "value": "Market size"}],
+    [{"op": "add", "path": "/content/-", "value": {"layout": "bullet", "title": "Outlook", "bullets": []}}],
+    [{"op": "move", "from": "/content/0", "path": "/content/3"}],
+    [{"op": "move", "from": "/content/3", "path": "/content/1"}],
+    [{"op": "remove", "path": "/content/2"}, {"op": "add", "path": "/content/0", "value": {"layout": "bullet", "title": "Intro"}}],
+    [{"op": "add", "path": "/content/1/bullets/-", "value": "Range"}, {"op": "move", "from": "/content/1/bullets/0", "path": "/content/1/bullets/2"}],
+    [{"op": "copy", "from": "/content/2", "path": "/content/-"}, {"op": "remove", "path": "/content/0/subtitle"}],
+    [{"op": "test", "path": "/content/2/title", "value": "Policy"}, {"op": "replace", "path": "/content/2", "value": {"layout": "bullet", "title": "Rules"}}],
+    [{"op": "replace", "path": "/topic", "value": "EVs"}, {"op": "add", "path": "/configuration/theme", "value": "ppt2"}],
+    [{"op": "replace", "path": "/content", "value": [{"layout": "bullet", "title": "Only"}]}],
+]
+
+
+@pytest.mark.parametrize("patch", PATCHES)
+def test_apply_matches_json_patch_and_returns_replayable_diff(run_db, patch):
+    async def check(db):
+        presentation = await _presentation(db)
+        before = _document(presentation, await slides.load_deck(db, presentation.presentation_id))
+
+        diff = await apply(db, presentation, copy.deepcopy(patch))
+        await db.commit()
+        after = _document(presentation, await slides.load_deck(db, presentation.presentation_id))
+
+        assert after == _replay(before, patch)
+        assert _replay(before, diff) == after
+        # slide positions come back as concrete indexes
+        assert all(_parse(op["path"])[1:] != ["-"] for op in diff)
+
+    run_db(check)
+
+
+@pytest.mark.parametrize("patch", [
+    [{"op": "replace", "path": "/content/0/title", "value": "Changed"}, {"op": "test", "path": "/content/1/title", "value": "Wrong"}],
+    [{"op": "remove", "path": "/content/1"}, {"op": "remove", "path": "/content/9"}],
+    [{"op": "replace", "path": "/content/01/title", "value": "x"}],
+    [{"op": "add", "path": "/content/1/bullets/5", "value": "x"}],
+    [{"op": "remove", "path": "/content/0/missing"}],
+    [{"op": "replace", "path": "content/0", "value": {}}],
+    [{"op": "add", "path": "/content/0", "value": "not a slide"}],
+    [{"op": "replace", "path": "/content/0/title"}],
+    [{"op": "merge", "path": "/topic", "value": "x"}],
+])
+def test_failed_patch_raises_and_rollback_keeps_the_deck(run_db, patch):
+    async def check(db):
+        presentation = await _presentation(db)
+        pid = presentation.presentation_id
+        with pytest.raises(PatchError):
+            await apply(db, presentation, patch)
+        await db.rollback()
+        assert await slides.load_deck(db, pid) == DECK
+
+    run_db(check)
+
+
+def test_too_many_operations(run_db):
+    async def check(db):
+        presentation = await _presentation(db)
+        patch = [{"op": "test", "path": "/topic", "value": "Electric vehicles"}] * 501
+        with pytest.raises(PatchError):
+            await apply(db, presentation, patch)
+
+    run_db(check)
+
+
+def test_stale_version_is_a_conflict(run_db):
+    async def check(db):
+        presentation = await _presentation(db)
+        seen = presentation.version
+        assert await slides.bump_version(db, presentation, expected=seen) == seen + 1
+        await db.commit()
+        # a second writer that also read `seen` loses
+        assert await slides.bump_version(db, presentation, expected=seen) is None
+        assert presentation.version == seen + 1
+
+    run_db(check)
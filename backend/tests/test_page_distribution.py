@@ -0,0 +1,93 @@
+# backend/tests/test_page_distribution.py
+import random
+import re
+from typing import Dict, List
+
+import pytest
+
+from services.docx_generator import distribute_sections_across_pages, plan_page_sizes, split_section_into_parts
+from services.section_text import normalise
+
+WORDS = "market growth policy battery charging demand supply vehicle price range".split()
+
+
+def _section(rng: random.Random, heading: str, paragraphs: int) -> Dict:
+    text = "\n\n".join(
+        ". ".join(" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 15))) for _ in range(rng.randint(1, 5))) + "."
+        for _ in range(paragraphs)
+    )
+    values = normalise("", heading, text)
+    return {"heading": heading, "content": values.pop("clean_content"), **values}
+
+
+def _document(rng: random.Random, count: int) -> List[Dict]:
+    return [_section(rng, f"Section {i}", rng.randint(0, 6)) for i in range(count)]
+
+
+def reference_distribute(sections: List[Dict], num_pages: int) -> Dict[int, List[Dict]]:
+    """The implementation before the heap (regex word counts, full page scan per split)."""
+    if num_pages <= 0:
+        num_pages = 1
+    pages = {i: [] for i in range(1, num_pages + 1)}
+    if not sections:
+        return pages
+    if len(sections) >= num_pages:
+        base, rem = len(sections) // num_pages, len(sections) % num_pages
+        idx = 0
+        for p in range(1, num_pages + 1):
+            take = base + (1 if p <= rem else 0)
+            pages[p] = sections[idx: idx + take]
+            idx += take
+        return pages
+
+    def word_count(s):
+        return len(re.findall(r"\w+", s.get("content", "") or ""))
+
+    pages_list: List[List[Dict]] = [[] for _ in range(num_pages)]
+    for i, sec in enumerate(sorted(sections, key=word_count, reverse=True)):
+        pages_list[i].append(sec)
+    empty_slots = num_pages - len(sections)
+    while empty_slots > 0:
+        longest_page_idx, longest_wc = None, 0
+        for i, page in enumerate(pages_list):
+            if not page:
+                continue
+            wc = sum(word_count(sec) for sec in page)
+            if wc > longest_wc:
+                longest_wc, longest_page_idx = wc, i
+        if longest_page_idx is None:
+            break
+        parts = split_section_into_parts(pages_list[longest_page_idx].pop(0), 2)
+        pages_list[longest_page_idx].append(parts[0])
+        next_empty = next(j for j, pg in enumerate(pages_list) if not pg)
+        pages_list[next_empty].append(parts[1])
+        empty_slots -= 1
+    for i, page in enumerate(pages_list):
+        pages[i + 1] = page
+    return pages
+
+
+def _shape(pages: Dict[int, List[Dict]]) -> list:
+    return [(p, [(s["heading"], s["content"]) for s in secs]) for p, secs in sorted(pages.items())]
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_same_pages_as_reference(seed):
+    rng = random.Random(seed)
+    sections = _document(rng, rng.randint(0, 12))
+    for num_pages in (0, 1, 2, 3, 5, 8, 13, 20):
+        expected = reference_distribute(sections, num_pages)
+        assert _shape(distribute_sections_across_pages(sections, num_pages)) == _shape(expected)
+
+
+@pytest.mark.parametrize("balance", ["sections", "words"])
+def test_plan_matches_distribution(balance):
+    rng = random.Random(3)
+    for _ in range(50):
+        sections = _document(rng, rng.randint(1, 30))
+        num_pages = rng.randint(1, len(sections))
+        pages = distribute_sections_across_pages(sections, num_pages, balance)
+        assert [s for p in sorted(pages) for s in pages[p]] == sections
+        assert all(pages.values())
+        sizes = plan_page_sizes([s["word_count"] for s in sections], num_pages, balance)
+        assert sizes == [len(pages[p]) for p in sorted(pages)]
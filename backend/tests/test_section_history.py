@@ -0,0 +1,69 @@
+# backend/tests/test_section_history.py
+import random
+
+import pytest
+
+from services.section_history import SNAPSHOT_EVERY, apply_delta, encode, make_delta
+
+WORDS = "market growth policy battery charging demand supply vehicle price range".split()
+
+PAIRS = [
+    ("", ""),
+    ("", "New text."),
+    ("Old text.", ""),
+    ("Same text.", "Same text."),
+    ("Prices fall as supply grows.", "Prices fall quickly as battery supply grows."),
+    ("First paragraph.\n\nSecond paragraph.", "First paragraph.\n\nInserted.\n\nSecond paragraph."),
+    ("Trailing space ", "Trailing space"),
+    ("tabs\tand  double  spaces", "tabs and double spaces\n"),
+    ("  leading", "leading  "),
+    ("Ünïcode — quotes “here”", "Ünïcode — quotes “there” ✓"),
+]
+
+
+def _mutate(rng: random.Random, text: str) -> str:
+    tokens = text.split(" ")
+    for _ in range(rng.randint(1, 6)):
+        pos = rng.randint(0, len(tokens))
+        action = rng.choice(("insert", "delete", "replace"))
+        if action == "insert" or not tokens:
+            tokens.insert(pos, rng.choice(WORDS + ["\n\n", "\t", ""]))
+        elif action == "delete":
+            del tokens[min(pos, len(tokens) - 1)]
+        else:
+            tokens[min(pos, len(tokens) - 1)] = rng.choice(WORDS)
+    return " ".join(tokens)
+
+
+@pytest.mark.parametrize("old, new", PAIRS)
+def test_round_trip(old, new):
+    assert apply_delta(old, make_delta(old, new)) == new
+
+
+def test_round_trip_random_edits():
+    rng = random.Random(11)
+    text = " ".join(rng.choice(WORDS) for _ in range(200))
+    for _ in range(200):
+        new = _mutate(rng, text)
+        assert apply_delta(text, make_delta(text, new)) == new
+        text = new
+
+
+def test_unchanged_text_is_one_copy_op():
+    text = "one two three"
+    assert make_delta(text, text) == [5]
+
+
+def test_encode_snapshots_and_deltas():
+    base = " ".join(WORDS * 10)
+    edited = base + " outlook"
+    # first version, every SNAPSHOT_EVERY-th and no previous text: full snapshot
+    assert encode(1, None, base) == (base, None)
+    assert encode(2, None, base) == (base, None)
+    assert encode(SNAPSHOT_EVERY, base, edited) == (edited, None)
+    snapshot, delta = encode(2, base, edited)
+    assert snapshot is None and apply_delta(base, delta) == edited
+
+
+def test_encode_prefers_snapshot_when_delta_is_larger():
+    assert encode(3, "a b c", "x y z") == ("x y z", None)
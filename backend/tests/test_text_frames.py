@@ -0,0 +1,66 @@
+# backend/tests/test_text_frames.py
+from lxml import etree
+from pptx import Presentation
+from pptx.util import Inches
+import pytest
+
+from services.pptx_builder.text import write_paragraphs
+from services.pptx_generator import TEMPLATE_MAP, _remove_all_slides
+from services.template_manifest import template_entry
+
+TEXTS = [
+    [],
+    [""],
+    ["One line"],
+    ["First", "", "Third"],
+    ["Line\nbreak", "Vertical\vtab", "\nleading", "trailing\n", "\n"],
+    ["Escapes & <tags> \"quotes\" 'apostrophes'"],
+    ["Control \x01 \x08 \x0b \x1f chars", "Tab\tkept"],
+    ["Ünïcode — “quotes” ✓"],
+    [f"Bullet {i}" for i in range(40)],
+]
+
+
+def legacy_fill(tf, texts) -> None:
+    """python-pptx's paragraph API, as the slide strategies used it."""
+    tf.clear()
+    for i, text in enumerate(texts):
+        p = tf.paragraphs[0] if i == 0 else tf.add_paragraph()
+        p.text = text
+
+
+def _bullet_frames(theme_id: str, count: int):
+    prs = Presentation(TEMPLATE_MAP[theme_id])
+    _remove_all_slides(prs)
+    entry = template_entry(theme_id)
+    layout = entry["layouts"][entry["roles"]["bullet"]]
+    frames = []
+    for _ in range(count):
+        slide = prs.slides.add_slide(prs.slide_layouts[layout["index"]])
+        frames.append(list(slide.shapes)[layout["content"][0]].text_frame)
+    return frames
+
+
+def _xml(tf) -> bytes:
+    return etree.tostring(tf._txBody)
+
+
+@pytest.mark.parametrize("theme_id", sorted(TEMPLATE_MAP))
+def test_same_xml_as_python_pptx(theme_id):
+    expected, actual = _bullet_frames(theme_id, len(TEXTS)), _bullet_frames(theme_id, len(TEXTS))
+    for texts, old, new in zip(TEXTS, expected, actual):
+        legacy_fill(old, texts)
+        write_paragraphs(new, texts)
+        assert _xml(new) == _xml(old), texts
+
+
+def test_overwrites_filled_frame_like_python_pptx():
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    frames = [slide.shapes.add_textbox(0, 0, Inches(4), Inches(2)).text_frame for _ in range(2)]
+    for tf in frames:
+        legacy_fill(tf, ["Old", "content", "here"])
+        tf.paragraphs[0].runs[0].font.bold = True
+    legacy_fill(frames[0], ["New\nlines", "two"])
+    write_paragraphs(frames[1], iter(["New\nlines", "two"]))
+    assert _xml(frames[1]) == _xml(frames[0])